@@ -0,0 +1,756 @@
+"""
+Copyright: MAXON Computer GmbH
+Author: Kent Barber, Maxime Adam
+
+Description:
+    - Scanline rasterizer shared by the py-sculpt_paint_brush and py-sculpt_save_mask examples.
+    - Rasterizes triangles with an incremental edge walk, interpolating attributes defined per vertex (e.g. a color).
+    - RasterBuffer writes whole spans into a row buffer and flushes each row to a bitmap with a single SetPixelCnt.
+    - RasterBuffer stores 8-bit, 16-bit or 32-bit float channels, and can dilate the drawn pixels into a gutter.
+    - TileBaker bins triangles into tiles, rasterizes the tiles on a pool of worker threads and composites them.
+      The baking can be stopped and resumed, only the tiles not finished yet are rasterized again.
+
+Notes:
+    - This is not a plugin, the folder has to be copied next to the plugins using it.
+    - Only RasterBuffer.FlushToBitmap() calls into Cinema 4D, so the rasterization can be used outside of it.
+    - Spans are written with NumPy when it is available. RasterBuffer.DrawTriangles() then rasterizes triangles whose
+      bounding box is at most SMALL_TRIANGLE_SIZE pixels wide and high all at once with edge functions, since walking
+      the few pixels of many small triangles one span at a time is dominated by the cost of each NumPy call.
+      Where triangles overlap, it is undefined which one is drawn on top.
+    - Pixels are sampled at their center, a pixel is drawn when its center is inside the triangle (top-left rule).
+    - RunBenchmark() compares RasterBuffer and TileBaker with ReferenceRasterizer, the per pixel rasterizer the
+      examples used before, on a UV layout of 2M triangles at 4K. It does not need Cinema 4D.
+
+Class/method highlighted:
+    - BaseBitmap.SetPixelCnt()
+
+"""
+import array
+import concurrent.futures
+import math
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Depths of the channels stored by a RasterBuffer
+DEPTH_8 = 8
+DEPTH_16 = 16
+DEPTH_32F = 32
+
+# Array type code, NumPy type name and maximum value of each depth
+DEPTH_FORMATS = {
+    DEPTH_8: ("B", "uint8", 255.0),
+    DEPTH_16: ("H", "uint16", 65535.0),
+    DEPTH_32F: ("f", "float32", None),
+}
+
+# Triangles with a bounding box up to this size are rasterized together by RasterBuffer.DrawTrianglesNumPy()
+SMALL_TRIANGLE_SIZE = 32
+
+# Maximum number of candidate pixels tested at once by RasterBuffer.DrawTrianglesNumPy()
+SMALL_TRIANGLE_BATCH = 1 << 22
+
+
+class Edge(object):
+    """Represents an edge walked from its upper to its lower vertex, one scanline at a time."""
+
+    __slots__ = ("x", "dx", "attr", "dattr", "yStart", "yEnd")
+
+    def __init__(self, v0, v1):
+        """Initializes the edge on the first scanline it covers.
+
+        Args:
+            v0 (tuple(float, float, tuple(float))): The upper vertex as (x, y, attributes).
+            v1 (tuple(float, float, tuple(float))): The lower vertex as (x, y, attributes).
+        """
+        x0, y0, attr0 = v0
+        x1, y1, attr1 = v1
+
+        # Scanlines covered by the edge, a scanline is covered when its center is in [y0, y1)
+        self.yStart = int(math.ceil(y0 - 0.5))
+        self.yEnd = int(math.ceil(y1 - 0.5))
+
+        dy = y1 - y0
+        invDy = 1.0 / dy if dy != 0.0 else 0.0
+        self.dx = (x1 - x0) * invDy
+        self.dattr = [(a1 - a0) * invDy for a0, a1 in zip(attr0, attr1)]
+
+        # Moves the edge to the center of its first scanline
+        prestep = self.yStart + 0.5 - y0
+        self.x = x0 + self.dx * prestep
+        self.attr = [a + d * prestep for a, d in zip(attr0, self.dattr)]
+
+    def Step(self):
+        """Moves the edge to the next scanline."""
+        self.x += self.dx
+        attr = self.attr
+        for i, d in enumerate(self.dattr):
+            attr[i] += d
+
+
+def IterateTriangleSpans(v0, v1, v2, width, height):
+    """Iterates the horizontal spans covered by a triangle, clipped to a bitmap.
+
+    The attributes change linearly across the triangle, so their step along a span is computed once.
+
+    Args:
+        v0 (tuple(float, float, tuple(float))): The first vertex as (x, y, attributes), in pixels.
+        v1 (tuple(float, float, tuple(float))): The second vertex as (x, y, attributes), in pixels.
+        v2 (tuple(float, float, tuple(float))): The third vertex as (x, y, attributes), in pixels.
+        width (int): The width of the bitmap.
+        height (int): The height of the bitmap.
+
+    Yields:
+        tuple(int, int, int, list[float], list[float]): The row, the first pixel, the pixel after the last one,
+            the attributes at the center of the first pixel and their step from one pixel to the next.
+    """
+    v0, v1, v2 = sorted((v0, v1, v2), key=lambda v: v[1])
+    (x0, y0, a0), (x1, y1, a1), (x2, y2, a2) = v0, v1, v2
+
+    # Twice the signed area, a degenerated triangle covers no pixel
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    if area == 0.0:
+        return
+
+    # Gradient of the attributes along x, constant for the whole triangle
+    invArea = 1.0 / area
+    step = [((b - a) * (y2 - y0) - (c - a) * (y1 - y0)) * invArea for a, b, c in zip(a0, a1, a2)]
+
+    longEdge = Edge(v0, v2)
+    shortEdges = (Edge(v0, v1), Edge(v1, v2))
+
+    # The long edge is on the left when the middle vertex is on its right
+    longIsLeft = area > 0.0
+
+    for shortEdge in shortEdges:
+        for y in range(shortEdge.yStart, shortEdge.yEnd):
+            if 0 <= y < height:
+                left, right = (longEdge, shortEdge) if longIsLeft else (shortEdge, longEdge)
+
+                # A pixel is drawn when its center is in [left.x, right.x)
+                xStart = int(math.ceil(left.x - 0.5))
+                xEnd = int(math.ceil(right.x - 0.5))
+
+                # Clips the span to the bitmap
+                clippedStart = max(xStart, 0)
+                clippedEnd = min(xEnd, width)
+                if clippedStart < clippedEnd:
+                    prestep = clippedStart + 0.5 - left.x
+                    start = [a + s * prestep for a, s in zip(left.attr, step)]
+                    yield y, clippedStart, clippedEnd, start, step
+
+            longEdge.Step()
+            shortEdge.Step()
+
+
+def ConvertValue(value, maxValue):
+    """Converts a value from 0.0 to 1.0 to the value stored in a channel.
+
+    Args:
+        value (float): The value to convert.
+        maxValue (Optional[float]): The maximum value of an integer channel, None for a float channel.
+
+    Returns:
+        Union[int, float]: The channel value.
+    """
+    if maxValue is None:
+        return value
+
+    return int(min(maxValue, max(0.0, value * maxValue)))
+
+
+class RasterBuffer(object):
+    """Stores rasterized pixels, tracks which ones were drawn and flushes them to a bitmap one row at a time."""
+
+    __slots__ = ("width", "height", "channels", "depth", "data", "coverage")
+
+    def __init__(self, width, height, channels=3, depth=DEPTH_8):
+        """Initializes a black buffer.
+
+        Args:
+            width (int): The width of the buffer.
+            height (int): The height of the buffer.
+            channels (int): The number of channels of each pixel (1, 3 or 4).
+            depth (int): The depth of each channel, DEPTH_8, DEPTH_16 or DEPTH_32F.
+        """
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.depth = depth
+
+        typeCode, dtype, _ = DEPTH_FORMATS[depth]
+        if numpy is not None:
+            self.data = numpy.zeros((height, width, channels), dtype=dtype)
+            self.coverage = numpy.zeros((height, width), dtype=bool)
+        else:
+            self.data = array.array(typeCode, bytes(width * height * channels * array.array(typeCode).itemsize))
+            self.coverage = bytearray(width * height)
+
+    def WriteSpan(self, y, xStart, xEnd, start, step):
+        """Writes a span of interpolated colors.
+
+        Args:
+            y (int): The row of the span.
+            xStart (int): The first pixel of the span.
+            xEnd (int): The pixel after the last one of the span.
+            start (list[float]): The color of the first pixel, each channel from 0.0 to 1.0.
+            step (list[float]): The change of the color from one pixel to the next.
+        """
+        count = xEnd - xStart
+        channels = self.channels
+        typeCode, _, maxValue = DEPTH_FORMATS[self.depth]
+
+        if numpy is not None:
+            t = numpy.arange(count, dtype=numpy.float64)[:, None]
+            values = numpy.asarray(start[:channels]) + t * numpy.asarray(step[:channels])
+            if maxValue is not None:
+                values = numpy.clip(values * maxValue, 0.0, maxValue)
+            self.data[y, xStart:xEnd] = values
+            self.coverage[y, xStart:xEnd] = True
+            return
+
+        offset = (y * self.width + xStart) * channels
+        start = start[:channels]
+        step = step[:channels]
+
+        # A constant span, such as a triangle with the same color on each vertex, is a single repeated pixel
+        if not any(step):
+            pixels = array.array(typeCode, [ConvertValue(v, maxValue) for v in start]) * count
+        else:
+            pixels = array.array(typeCode, [ConvertValue(s + d * i, maxValue)
+                                            for i in range(count) for s, d in zip(start, step)])
+
+        self.data[offset:offset + count * channels] = pixels
+        self.coverage[y * self.width + xStart:y * self.width + xEnd] = b"\x01" * count
+
+    def DrawTriangle(self, v0, v1, v2):
+        """Draws a triangle, interpolating the colors defined on each vertex.
+
+        Args:
+            v0 (tuple(float, float, tuple(float))): The first vertex as (x, y, color), in pixels.
+            v1 (tuple(float, float, tuple(float))): The second vertex as (x, y, color), in pixels.
+            v2 (tuple(float, float, tuple(float))): The third vertex as (x, y, color), in pixels.
+        """
+        for span in IterateTriangleSpans(v0, v1, v2, self.width, self.height):
+            self.WriteSpan(*span)
+
+    def DrawTriangles(self, uvs, colors, triangles, progress=None, x=0, y=0):
+        """Draws many triangles in one call.
+
+        Args:
+            uvs (list[tuple(float, float)]): The position of each vertex, in pixels.
+            colors (list[tuple(float)]): The color of each vertex, each channel from 0.0 to 1.0.
+            triangles (Iterable[tuple(int, int, int)]): The vertex indices of each triangle.
+            progress (Optional[Callable[[int, int], None]]): Called with the number of drawn and total triangles.
+            x (int): The column of the image where the buffer starts, when the buffer is a tile of a bigger image.
+            y (int): The row of the image where the buffer starts, when the buffer is a tile of a bigger image.
+        """
+        if numpy is not None and len(triangles):
+            # The small triangles are drawn at once, only the large ones are walked span by span
+            triangles = self.DrawTrianglesNumPy(uvs, colors, triangles, x, y)
+
+        width, height = self.width, self.height
+        writeSpan = self.WriteSpan
+        total = len(triangles)
+        report = max(1, total // 100)
+
+        for i, (a, b, c) in enumerate(triangles):
+            v0 = (uvs[a][0] - x, uvs[a][1] - y, colors[a])
+            v1 = (uvs[b][0] - x, uvs[b][1] - y, colors[b])
+            v2 = (uvs[c][0] - x, uvs[c][1] - y, colors[c])
+            for span in IterateTriangleSpans(v0, v1, v2, width, height):
+                writeSpan(*span)
+
+            if progress is not None and i % report == 0:
+                progress(i, total)
+
+    def DrawTrianglesNumPy(self, uvs, colors, triangles, x=0, y=0):
+        """Draws the triangles whose bounding box is at most SMALL_TRIANGLE_SIZE pixels wide and high, with NumPy.
+
+        The pixels of the bounding boxes of triangles of similar size are tested at once with the edge functions of
+        the triangles, with the same sampling rule as IterateTriangleSpans(), and the colors are interpolated with
+        the barycentric coordinates of the pixels.
+
+        Args:
+            uvs (list[tuple(float, float)]): The position of each vertex, in pixels.
+            colors (list[tuple(float)]): The color of each vertex, each channel from 0.0 to 1.0.
+            triangles (Sequence[tuple(int, int, int)]): The vertex indices of each triangle.
+            x (int): The column of the image where the buffer starts.
+            y (int): The row of the image where the buffer starts.
+
+        Returns:
+            list[tuple(int, int, int)]: The triangles not drawn because they are too large.
+        """
+        channels = self.channels
+        maxValue = DEPTH_FORMATS[self.depth][2]
+
+        # Only the vertices of the given triangles are moved into the space of the buffer, not all vertices, as a
+        # TileBaker passes the vertices of the whole image to each tile
+        positions = numpy.asarray(uvs, dtype=numpy.float64)
+        vertexColors = numpy.asarray(colors, dtype=numpy.float64)[:, :channels]
+        indices = numpy.array(triangles, dtype=numpy.int64).reshape(-1, 3)
+        origin = numpy.array((x, y), dtype=numpy.float64)
+        p0, p1, p2 = (positions[indices[:, i], :2] - origin for i in range(3))
+
+        # Orients all triangles the same way, so that the inside of each edge is where its edge function is positive
+        area = (p1[:, 0] - p0[:, 0]) * (p2[:, 1] - p0[:, 1]) - (p2[:, 0] - p0[:, 0]) * (p1[:, 1] - p0[:, 1])
+        flipped = area < 0.0
+        indices[flipped] = indices[flipped][:, ::-1]
+        p0[flipped], p2[flipped] = p2[flipped], p0[flipped]
+        area = numpy.abs(area)
+
+        # Pixels whose center is in the bounding box of each triangle, clipped to the buffer
+        corners = numpy.stack((p0, p1, p2))
+        lower = numpy.maximum(numpy.ceil(corners.min(axis=0) - 0.5), 0).astype(numpy.int64)
+        upper = numpy.minimum(numpy.ceil(corners.max(axis=0) - 0.5), (self.width, self.height)).astype(numpy.int64)
+        size = upper - lower
+
+        visible = (area > 0.0) & (size[:, 0] > 0) & (size[:, 1] > 0)
+        small = visible & (size[:, 0] <= SMALL_TRIANGLE_SIZE) & (size[:, 1] <= SMALL_TRIANGLE_SIZE)
+
+        # Groups the triangles by the power of two above their size, so that their boxes share one shape
+        buckets = 1 << numpy.ceil(numpy.log2(numpy.maximum(size, 1))).astype(numpy.int64)
+        for bucketW, bucketH in set(map(tuple, buckets[small].tolist())):
+            group = numpy.flatnonzero(small & (buckets[:, 0] == bucketW) & (buckets[:, 1] == bucketH))
+            chunk = max(1, SMALL_TRIANGLE_BATCH // (bucketW * bucketH))
+            for start in range(0, len(group), chunk):
+                self._DrawSmallTriangles(group[start:start + chunk], bucketW, bucketH, indices, p0, p1, p2, area,
+                                         lower, upper, vertexColors, maxValue)
+
+        return [triangles[i] for i in numpy.flatnonzero(visible & ~small).tolist()]
+
+    def _DrawSmallTriangles(self, group, bucketW, bucketH, indices, p0, p1, p2, area, lower, upper, vertexColors,
+                            maxValue):
+        """Draws a group of triangles whose bounding box fits in bucketW x bucketH pixels, see DrawTrianglesNumPy().
+        """
+        # Centers of the candidate pixels of each triangle, shaped (triangles, rows, columns)
+        px = lower[group, 0][:, None, None] + numpy.arange(bucketW)[None, None, :]
+        py = lower[group, 1][:, None, None] + numpy.arange(bucketH)[None, :, None]
+        inside = (px < upper[group, 0][:, None, None]) & (py < upper[group, 1][:, None, None])
+        cx, cy = px + 0.5, py + 0.5
+
+        # Edge function of each edge, the weight of the opposite vertex once divided by the area
+        weights = []
+        for a, b in ((p1, p2), (p2, p0), (p0, p1)):
+            a, b = a[group][:, None, None, :], b[group][:, None, None, :]
+
+            # An edge shared by two triangles is computed from the same vertex in both, so that rounding errors
+            # cannot leave a pixel on the edge outside of both triangles
+            swap = (b[..., 0] < a[..., 0]) | ((b[..., 0] == a[..., 0]) & (b[..., 1] < a[..., 1]))
+            origin = numpy.where(swap[..., None], b, a)
+            dx, dy = (b[..., 0] - a[..., 0]), (b[..., 1] - a[..., 1])
+            e = dx * (cy - origin[..., 1]) - dy * (cx - origin[..., 0])
+
+            # Pixels on an edge belong to the triangle on its right or below it (top-left rule)
+            topLeft = (dy < 0.0) | ((dy == 0.0) & (dx > 0.0))
+            inside &= (e > 0.0) | ((e == 0.0) & topLeft)
+            weights.append(e)
+
+        triangle, row, column = numpy.nonzero(inside)
+        if not len(triangle):
+            return
+
+        invArea = 1.0 / area[group][triangle]
+        values = numpy.zeros((len(triangle), vertexColors.shape[1]), dtype=numpy.float64)
+        for vertex, e in enumerate(weights):
+            values += (e[triangle, row, column] * invArea)[:, None] * vertexColors[indices[group[triangle], vertex]]
+        if maxValue is not None:
+            values = numpy.clip(values * maxValue, 0.0, maxValue)
+
+        ys = py[triangle, row, 0]
+        xs = px[triangle, 0, column]
+        self.data[ys, xs] = values
+        self.coverage[ys, xs] = True
+
+    def Paste(self, other, x, y):
+        """Copies another buffer, with the same channels and depth, into this one.
+
+        Args:
+            other (RasterBuffer): The buffer to copy, it has to fit in this buffer.
+            x (int): The column where the other buffer starts.
+            y (int): The row where the other buffer starts.
+        """
+        if numpy is not None:
+            self.data[y:y + other.height, x:x + other.width] = other.data
+            self.coverage[y:y + other.height, x:x + other.width] = other.coverage
+            return
+
+        channels = self.channels
+        for row in range(other.height):
+            dst = ((y + row) * self.width + x) * channels
+            src = row * other.width * channels
+            self.data[dst:dst + other.width * channels] = other.data[src:src + other.width * channels]
+
+            dst = (y + row) * self.width + x
+            src = row * other.width
+            self.coverage[dst:dst + other.width] = other.coverage[src:src + other.width]
+
+    def Dilate(self, iterations):
+        """Extends the drawn pixels into the pixels around them (gutter), so filtering does not bleed the background.
+
+        Each iteration fills the pixels not drawn yet, next to a drawn one, with the average of their drawn neighbors.
+
+        Args:
+            iterations (int): The size of the gutter, in pixels.
+        """
+        width, height, channels = self.width, self.height, self.channels
+        neighbors = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+        if numpy is not None:
+            for _ in range(iterations):
+                total = numpy.zeros((height, width, channels), dtype=numpy.float64)
+                count = numpy.zeros((height, width), dtype=numpy.int32)
+                for dy, dx in neighbors:
+                    # Views of the destination and source pixels for this neighbor direction
+                    dst = (slice(max(0, -dy), height - max(0, dy)), slice(max(0, -dx), width - max(0, dx)))
+                    src = (slice(max(0, dy), height - max(0, -dy)), slice(max(0, dx), width - max(0, -dx)))
+                    covered = self.coverage[src]
+                    total[dst] += self.data[src] * covered[:, :, None]
+                    count[dst] += covered
+
+                fill = ~self.coverage & (count > 0)
+                if not fill.any():
+                    break
+
+                self.data[fill] = total[fill] / count[fill][:, None]
+                self.coverage |= fill
+            return
+
+        data, coverage = self.data, self.coverage
+        for _ in range(iterations):
+            filled = []
+            for y in range(height):
+                for x in range(width):
+                    if coverage[y * width + x]:
+                        continue
+
+                    sources = [(y + dy) * width + x + dx for dy, dx in neighbors
+                               if 0 <= y + dy < height and 0 <= x + dx < width and coverage[(y + dy) * width + x + dx]]
+                    if sources:
+                        values = [sum(data[i * channels + c] for i in sources) / len(sources) for c in range(channels)]
+                        filled.append((y * width + x, values))
+
+            if not filled:
+                break
+
+            # Pixels filled during an iteration are only used as source by the next one
+            integer = DEPTH_FORMATS[self.depth][2] is not None
+            for index, values in filled:
+                for c, value in enumerate(values):
+                    data[index * channels + c] = int(value) if integer else value
+                coverage[index] = 1
+
+    def GetRow(self, y):
+        """Retrieves the pixels of a row.
+
+        Args:
+            y (int): The row.
+
+        Returns:
+            memoryview: The bytes of the row.
+        """
+        if numpy is not None:
+            return memoryview(self.data[y]).cast("B")
+
+        rowSize = self.width * self.channels
+        return memoryview(self.data)[y * rowSize:(y + 1) * rowSize].cast("B")
+
+    def FlushToBitmap(self, bmp, x=0, y=0):
+        """Copies the buffer into a bitmap, with a single SetPixelCnt per row.
+
+        Args:
+            bmp (c4d.bitmaps.BaseBitmap): The bitmap to write to.
+            x (int): The column of the bitmap where the buffer starts.
+            y (int): The row of the bitmap where the buffer starts.
+        """
+        import c4d
+
+        modes = {
+            (1, DEPTH_8): c4d.COLORMODE_GRAY, (3, DEPTH_8): c4d.COLORMODE_RGB, (4, DEPTH_8): c4d.COLORMODE_ARGB,
+            (1, DEPTH_16): c4d.COLORMODE_GRAYw, (3, DEPTH_16): c4d.COLORMODE_RGBw, (4, DEPTH_16): c4d.COLORMODE_ARGBw,
+            (1, DEPTH_32F): c4d.COLORMODE_GRAYf, (3, DEPTH_32F): c4d.COLORMODE_RGBf, (4, DEPTH_32F): c4d.COLORMODE_ARGBf,
+        }
+        mode = modes[(self.channels, self.depth)]
+        inc = self.channels * array.array(DEPTH_FORMATS[self.depth][0]).itemsize
+
+        for row in range(self.height):
+            bmp.SetPixelCnt(x, y + row, self.width, self.GetRow(row), inc, mode, c4d.PIXELCNT_0)
+
+
+class TileBaker(object):
+    """Rasterizes triangles into an image split in tiles, each tile being rasterized independently.
+
+    Tiles are rasterized on a pool of worker threads. Finished tiles are kept, so when Bake() stops before
+    the end, calling it again only rasterizes the remaining tiles.
+    """
+
+    def __init__(self, width, height, uvs, colors, triangles, tileSize=128, channels=3, depth=DEPTH_8):
+        """Initializes the baker and bins each triangle into the tiles its bounding box touches.
+
+        Args:
+            width (int): The width of the image.
+            height (int): The height of the image.
+            uvs (list[tuple(float, float)]): The position of each vertex, in pixels.
+            colors (list[tuple(float)]): The color of each vertex, each channel from 0.0 to 1.0.
+            triangles (list[tuple(int, int, int)]): The vertex indices of each triangle.
+            tileSize (int): The width and height of a tile.
+            channels (int): The number of channels of each pixel (1, 3 or 4).
+            depth (int): The depth of each channel, DEPTH_8, DEPTH_16 or DEPTH_32F.
+        """
+        self.width = width
+        self.height = height
+        self.uvs = uvs
+        self.colors = colors
+        self.triangles = triangles
+
+        # Converted once, instead of by each tile in RasterBuffer.DrawTrianglesNumPy()
+        if numpy is not None:
+            self.uvs = numpy.asarray(uvs, dtype=numpy.float64)
+            self.colors = numpy.asarray(colors, dtype=numpy.float64)
+        self.tileSize = tileSize
+        self.channels = channels
+        self.depth = depth
+
+        # Finished tiles, stored as (column, row) -> RasterBuffer
+        self.tiles = {}
+
+        # Triangles touching each tile, stored as (column, row) -> list of triangles
+        self.bins = {}
+        columns = (width + tileSize - 1) // tileSize
+        rows = (height + tileSize - 1) // tileSize
+        for triangle in triangles:
+            xs = [uvs[i][0] for i in triangle]
+            ys = [uvs[i][1] for i in triangle]
+
+            # Pixel centers are at +0.5, so a triangle only touches pixels from round(min) to round(max)
+            firstColumn = max(0, int(math.floor(min(xs) - 0.5)) // tileSize)
+            lastColumn = min(columns - 1, int(math.ceil(max(xs) - 0.5)) // tileSize)
+            firstRow = max(0, int(math.floor(min(ys) - 0.5)) // tileSize)
+            lastRow = min(rows - 1, int(math.ceil(max(ys) - 0.5)) // tileSize)
+
+            for row in range(firstRow, lastRow + 1):
+                for column in range(firstColumn, lastColumn + 1):
+                    self.bins.setdefault((column, row), []).append(triangle)
+
+    def GetTileRect(self, key):
+        """Retrieves the area of the image covered by a tile.
+
+        Args:
+            key (tuple(int, int)): The column and row of the tile.
+
+        Returns:
+            tuple(int, int, int, int): The x, y, width and height of the tile.
+        """
+        x = key[0] * self.tileSize
+        y = key[1] * self.tileSize
+        return x, y, min(self.tileSize, self.width - x), min(self.tileSize, self.height - y)
+
+    def RasterizeTile(self, key):
+        """Rasterizes the triangles touching a tile, called from the worker threads.
+
+        Args:
+            key (tuple(int, int)): The column and row of the tile.
+
+        Returns:
+            RasterBuffer: The rasterized tile.
+        """
+        x, y, width, height = self.GetTileRect(key)
+        tile = RasterBuffer(width, height, self.channels, self.depth)
+        tile.DrawTriangles(self.uvs, self.colors, self.bins[key], x=x, y=y)
+        return tile
+
+    def IsDone(self):
+        """Checks if all tiles are rasterized.
+
+        Returns:
+            bool: True if all tiles touched by a triangle are rasterized.
+        """
+        return len(self.tiles) == len(self.bins)
+
+    def Bake(self, workers=None, progress=None, shouldStop=None):
+        """Rasterizes the tiles not finished yet.
+
+        Args:
+            workers (Optional[int]): The number of worker threads, None to let concurrent.futures decide.
+            progress (Optional[Callable[[int, int], None]]): Called with the number of finished and total tiles.
+            shouldStop (Optional[Callable[[], bool]]): Called after each finished tile, returns True to stop.
+
+        Returns:
+            bool: True if all tiles are rasterized, False if the baking was stopped.
+        """
+        remaining = [key for key in self.bins if key not in self.tiles]
+        total = len(self.bins)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = dict((executor.submit(self.RasterizeTile, key), key) for key in remaining)
+            for future in concurrent.futures.as_completed(futures):
+                self.tiles[futures[future]] = future.result()
+
+                if progress is not None:
+                    progress(len(self.tiles), total)
+
+                if shouldStop is not None and shouldStop():
+                    # Tiles not started yet are dropped, they will be rasterized by the next call
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+            # Keeps the tiles finished while the pool was stopping
+            for future, key in futures.items():
+                if future.done() and not future.cancelled() and key not in self.tiles:
+                    self.tiles[key] = future.result()
+
+        return self.IsDone()
+
+    def Composite(self, gutter=0):
+        """Assembles the finished tiles into the image.
+
+        Args:
+            gutter (int): The size in pixels of the dilation applied around the drawn pixels, 0 to disable it.
+
+        Returns:
+            RasterBuffer: The image.
+        """
+        image = RasterBuffer(self.width, self.height, self.channels, self.depth)
+        for key, tile in self.tiles.items():
+            x, y, _, _ = self.GetTileRect(key)
+            image.Paste(tile, x, y)
+
+        # The dilation is done on the whole image, so the gutter can cross the tile borders
+        if gutter > 0:
+            image.Dilate(gutter)
+
+        return image
+
+
+class ReferenceRasterizer(object):
+    """The per pixel rasterizer formerly copied in the sculpt examples, kept as a baseline for RunBenchmark().
+
+    Colors are interpolated along each edge and span per pixel, and each pixel is written on its own, as
+    BaseBitmap.SetPixel() did, into a bytearray.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+
+    def SetPixel(self, x, y, r, g, b):
+        offset = (y * self.width + x) * 3
+        self.pixels[offset:offset + 3] = bytes((r, g, b))
+
+    def DrawSpan(self, color1, x1, color2, x2, y):
+        if x1 > x2:
+            color1, x1, color2, x2 = color2, x2, color1, x1
+
+        xdiff = math.ceil(x2) - math.floor(x1)
+        if xdiff == 0 or x1 < 0 or x2 < 0 or x1 > self.width or x2 > self.width:
+            return
+
+        factor = 0.0
+        factorStep = 1.0 / float(xdiff)
+        for x in range(int(math.floor(x1)), int(math.ceil(x2))):
+            col = [c1 + (c2 - c1) * factor for c1, c2 in zip(color1, color2)]
+            self.SetPixel(min(x, self.width - 1), y, int(col[0] * 255), int(col[1] * 255), int(col[2] * 255))
+            factor += factorStep
+
+    def DrawSpansBetweenEdges(self, e1, e2):
+        (e1c1, e1x1, e1y1, e1c2, e1x2, e1y2), (e2c1, e2x1, e2y1, e2c2, e2x2, e2y2) = e1, e2
+        e1ydiff = float(e1y2 - e1y1)
+        e2ydiff = float(e2y2 - e2y1)
+        if e1ydiff == 0.0 or e2ydiff == 0.0:
+            return
+
+        e1xdiff = float(e1x2 - e1x1)
+        e2xdiff = float(e2x2 - e2x1)
+        factor1 = float(e2y1 - e1y1) / e1ydiff
+        factorStep1 = 1.0 / e1ydiff
+        factor2 = 0.0
+        factorStep2 = 1.0 / e2ydiff
+
+        for y in range(int(e2y1), min(int(e2y2), self.height)):
+            self.DrawSpan([a + (b - a) * factor1 for a, b in zip(e1c1, e1c2)], e1x1 + int(e1xdiff * factor1),
+                          [a + (b - a) * factor2 for a, b in zip(e2c1, e2c2)], e2x1 + int(e2xdiff * factor2), y)
+            factor1 += factorStep1
+            factor2 += factorStep2
+
+    def DrawTriangle(self, v0, v1, v2):
+        """Draws a triangle, with each vertex as (x, y, color)."""
+        edges = []
+        for (xa, ya, ca), (xb, yb, cb) in ((v0, v1), (v1, v2), (v2, v0)):
+            xa, ya, xb, yb = round(xa), round(ya), round(xb), round(yb)
+            if ya < yb:
+                edges.append((ca, xa, math.floor(ya), cb, xb, math.ceil(yb)))
+            else:
+                edges.append((cb, xb, math.floor(yb), ca, xa, math.ceil(ya)))
+
+        longEdge = max(range(3), key=lambda i: edges[i][5] - edges[i][2])
+        self.DrawSpansBetweenEdges(edges[longEdge], edges[(longEdge + 1) % 3])
+        self.DrawSpansBetweenEdges(edges[longEdge], edges[(longEdge + 2) % 3])
+
+
+def CreateUVLayout(triangleCount, size):
+    """Creates a UV layout covering a square image with a grid of quads, each split in two triangles.
+
+    Args:
+        triangleCount (int): The approximate number of triangles.
+        size (int): The width and height of the image, in pixels.
+
+    Returns:
+        tuple(list[tuple(float, float)], list[tuple(float)], list[tuple(int, int, int)]): The position and color of
+            each vertex and the vertex indices of each triangle.
+    """
+    cells = max(1, int(math.sqrt(triangleCount / 2.0)))
+    step = float(size) / cells
+    uvs = [(x * step, y * step) for y in range(cells + 1) for x in range(cells + 1)]
+    colors = [(x / float(cells), y / float(cells), 0.5) for y in range(cells + 1) for x in range(cells + 1)]
+
+    triangles = []
+    for y in range(cells):
+        for x in range(cells):
+            a = y * (cells + 1) + x
+            b, c, d = a + 1, a + cells + 2, a + cells + 1
+            triangles.append((a, b, c))
+            triangles.append((a, c, d))
+    return uvs, colors, triangles
+
+
+def RunBenchmark(triangleCount=2000000, size=4096, referenceFraction=0.01):
+    """Prints the triangles per second of ReferenceRasterizer, RasterBuffer and TileBaker.
+
+    The reference is only timed on a fraction of the triangles, its time for all triangles is extrapolated.
+
+    Args:
+        triangleCount (int): The approximate number of triangles of the UV layout.
+        size (int): The width and height of the image, in pixels.
+        referenceFraction (float): The fraction of the triangles drawn by the reference rasterizer.
+    """
+    uvs, colors, triangles = CreateUVLayout(triangleCount, size)
+    count = len(triangles)
+    timings = []
+
+    reference = ReferenceRasterizer(size, size)
+    subset = triangles[:max(1, int(count * referenceFraction))]
+    t = time.perf_counter()
+    for a, b, c in subset:
+        reference.DrawTriangle((uvs[a][0], uvs[a][1], colors[a]), (uvs[b][0], uvs[b][1], colors[b]),
+                               (uvs[c][0], uvs[c][1], colors[c]))
+    timings.append(("Reference (extrapolated)", (time.perf_counter() - t) * count / len(subset)))
+
+    buffer = RasterBuffer(size, size)
+    t = time.perf_counter()
+    buffer.DrawTriangles(uvs, colors, triangles)
+    timings.append(("RasterBuffer.DrawTriangles()", time.perf_counter() - t))
+
+    t = time.perf_counter()
+    baker = TileBaker(size, size, uvs, colors, triangles)
+    baker.Bake()
+    baker.Composite()
+    timings.append(("TileBaker", time.perf_counter() - t))
+
+    print("{0} triangles at {1}x{1}:".format(count, size))
+    for name, elapsed in timings:
+        print("    {0}: {1:.1f} sec, {2:.0f} triangles/sec".format(name, elapsed, count / elapsed))
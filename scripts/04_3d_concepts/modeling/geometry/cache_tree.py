@@ -0,0 +1,243 @@
+#coding: utf-8
+"""Provides an iterative walker for the cache-trees of objects, shared by the cache examples.
+
+This file is not a script but a module imported by other scripts. To use it, append the directory
+of this file to `sys.path` before importing it, e.g., for a script two levels below
+`04_3d_concepts`:
+
+    import os
+    import sys
+
+    GEOMETRY_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), "modeling", "geometry")
+    if GEOMETRY_DIRECTORY not in sys.path:
+        sys.path.append(GEOMETRY_DIRECTORY)
+
+    import cache_tree
+
+Topics:
+    * Traversing caches, deform caches and children without recursion.
+    * Filtering the nodes of a cache-tree by type, control-object state and deformation.
+    * Reusing the cache-tree of objects whose cache did not change.
+
+Examples:
+    * CacheTreeWalker: Walks the cache-tree of an object with an explicit stack.
+    * WalkCacheTree(): Yields the nodes in the cache-tree of an object which pass all predicates.
+    * IsType(): Returns a predicate accepting nodes of the given types.
+    * IsNotControlObject(): Predicate accepting nodes which are not hidden by a generator or deformer.
+    * IsDeformed(): Predicate accepting nodes which are part of a deform cache.
+
+Overview:
+    A cache-tree is formed by an object, its cache, its deform cache and its children, where
+    caches can again have caches, deform caches and children. Walking such a tree recursively
+    costs a Python generator frame per level and can exceed the recursion limit for deeply nested
+    hierarchies as produced by MoGraph. CacheTreeWalker keeps the nodes to visit on a list
+    instead and visits them in the same order as a recursive pre-order traversal would: a node,
+    then its cache, then its deform cache and finally its children.
+
+    A walker can also memoize the caches of the objects it visits. For each object which is not
+    itself part of a cache, the nodes found in its caches are stored together with the cache dirty
+    checksum of the object. When the checksum did not change in the next walk, e.g., for a static
+    object while the document is being animated, the stored nodes are yielded instead of walking
+    the caches again.
+"""
+__copyright__ = "Copyright (C) 2022 MAXON Computer GmbH"
+__license__ = "Apache-2.0 License"
+
+import c4d
+import typing
+
+# The link by which a node has been reached in a cache-tree.
+LINK_ROOT: int = 0
+LINK_CACHE: int = 1
+LINK_DEFORM_CACHE: int = 2
+LINK_CHILD: int = 3
+
+# The labels of the links as used by cache-tree print-outs.
+LINK_LABELS: typing.Dict[int, str] = {
+    LINK_ROOT: "",
+    LINK_CACHE: "[cache]",
+    LINK_DEFORM_CACHE: "[deform cache]",
+    LINK_CHILD: "[child]"
+}
+
+
+class CacheTreeItem(typing.NamedTuple):
+    """A node visited by a CacheTreeWalker.
+
+    Attributes:
+        node: The visited node.
+        depth: The depth of the node below the node the walk started at.
+        link: The link by which the node has been reached, one of the LINK_* symbols.
+        deformed: If the node is a deform cache or part of one.
+    """
+    node: c4d.BaseObject
+    depth: int
+    link: int
+    deformed: bool
+
+
+# A predicate deciding if a CacheTreeItem is yielded by a walker.
+Predicate = typing.Callable[[CacheTreeItem], bool]
+
+
+def IsType(*types: int) -> Predicate:
+    """Returns a predicate accepting nodes which are an instance of any of #types.
+
+    Args:
+        types: The type symbols to accept, e.g., c4d.Opolygon.
+    """
+    def Predicate(item: CacheTreeItem) -> bool:
+        return any(item.node.IsInstanceOf(t) for t in types)
+
+    return Predicate
+
+
+def IsNotControlObject(item: CacheTreeItem) -> bool:
+    """Accepts nodes which do not have the control-object bit set.
+
+    Objects are marked as control objects when they are the input of a generator or when they
+    have been deformed, i.e., when something else represents them in the viewport.
+    """
+    return not item.node.GetBit(c4d.BIT_CONTROLOBJECT)
+
+
+def IsDeformed(item: CacheTreeItem) -> bool:
+    """Accepts nodes which are a deform cache or part of one.
+    """
+    return item.deformed
+
+
+class CacheTreeWalker:
+    """Walks the cache-tree of an object with an explicit stack.
+
+    Example:
+        Yielding all visible polygon objects in the cache-tree of #op, reusing the caches of objects
+        whose cache did not change since the last call of Walk().
+
+            walker = CacheTreeWalker((IsType(c4d.Opolygon), IsNotControlObject), memoize=True)
+            for frame in range(0, 100):
+                doc.SetTime(c4d.BaseTime(frame, doc.GetFps()))
+                doc.ExecutePasses(None, True, True, True, c4d.BUILDFLAGS_NONE)
+                for item in walker.Walk(op):
+                    print(item.node)
+    """
+
+    def __init__(self, predicates: typing.Iterable[Predicate] = (), memoize: bool = False) -> None:
+        """Initializes the walker.
+
+        Args:
+            predicates: The predicates a node must pass to be yielded, all nodes are yielded when
+                empty. Nodes failing a predicate are still traversed.
+            memoize: If the accepted nodes in the caches of objects are stored and reused while the
+                cache dirty checksum of the object does not change.
+        """
+        self._predicates: typing.Tuple[Predicate, ...] = tuple(predicates)
+        self._memo: typing.Optional[typing.Dict[int, typing.Tuple[int, typing.List[CacheTreeItem]]]] = (
+            {} if memoize else None)
+
+    def Accept(self, item: CacheTreeItem) -> bool:
+        """Returns if #item passes all predicates of the walker.
+        """
+        for predicate in self._predicates:
+            if not predicate(item):
+                return False
+        return True
+
+    def ClearMemo(self) -> None:
+        """Removes all memoized caches, e.g., after objects have been deleted.
+        """
+        if self._memo is not None:
+            self._memo.clear()
+
+    def Walk(self, node: c4d.BaseObject) -> typing.Iterator[CacheTreeItem]:
+        """Yields the nodes in the cache-tree of #node which pass all predicates, including #node.
+
+        The siblings of #node are not visited.
+
+        Args:
+            node: The object to start walking at.
+        """
+        if not isinstance(node, c4d.BaseObject):
+            raise TypeError(f"Expected a BaseObject or derived class, got {node.__class__.__name__}.")
+
+        # The objects outside of caches are walked here, the caches of each of them by WalkCaches().
+        stack: typing.List[typing.Tuple[c4d.BaseObject, int, int]] = [(node, 0, LINK_ROOT)]
+        while stack:
+            node, depth, link = stack.pop()
+            item: CacheTreeItem = CacheTreeItem(node, depth, link, False)
+            if self.Accept(item):
+                yield item
+
+            if self._memo is None:
+                yield from self.WalkCaches(node, depth)
+            else:
+                yield from self._GetMemoizedCaches(node, depth)
+
+            # Push the children in reverse order, so that the first child is popped first.
+            child: typing.Optional[c4d.BaseObject] = node.GetDownLast()
+            while child:
+                stack.append((child, depth + 1, LINK_CHILD))
+                child = child.GetPred()
+
+    def WalkCaches(self, node: c4d.BaseObject, depth: int = 0) -> typing.Iterator[CacheTreeItem]:
+        """Yields the nodes in the cache and deform cache of #node which pass all predicates.
+
+        Other than Walk(), neither #node nor its children are visited, but all children of nodes
+        inside the caches are.
+
+        Args:
+            node: The object to walk the caches of.
+            depth: The depth of #node.
+        """
+        stack: typing.List[typing.Tuple[c4d.BaseObject, int, int, bool]] = []
+
+        def PushCaches(node: c4d.BaseObject, depth: int, deformed: bool) -> None:
+            """Pushes the deform cache and the cache of #node, so that the cache is popped first.
+            """
+            cache: typing.Optional[c4d.BaseObject] = node.GetDeformCache()
+            if cache is not None:
+                stack.append((cache, depth + 1, LINK_DEFORM_CACHE, True))
+            cache = node.GetCache()
+            if cache is not None:
+                stack.append((cache, depth + 1, LINK_CACHE, deformed))
+
+        PushCaches(node, depth, False)
+        while stack:
+            node, depth, link, deformed = stack.pop()
+            item: CacheTreeItem = CacheTreeItem(node, depth, link, deformed)
+            if self.Accept(item):
+                yield item
+
+            child: typing.Optional[c4d.BaseObject] = node.GetDownLast()
+            while child:
+                stack.append((child, depth + 1, LINK_CHILD, deformed))
+                child = child.GetPred()
+            PushCaches(node, depth, deformed)
+
+    def _GetMemoizedCaches(self, node: c4d.BaseObject, depth: int) -> typing.List[CacheTreeItem]:
+        """Returns the accepted nodes in the caches of #node, walking them only when its cache
+        dirty checksum changed since the last call.
+        """
+        key: int = node.GetGUID()
+        dirty: int = node.GetDirty(c4d.DIRTYFLAGS_CACHE)
+        entry: typing.Optional[typing.Tuple[int, typing.List[CacheTreeItem]]] = self._memo.get(key)
+
+        # The items are stored relative to #node, as it can be reached at different depths.
+        if entry is None or entry[0] != dirty:
+            entry = (dirty, list(self.WalkCaches(node)))
+            self._memo[key] = entry
+
+        return [item._replace(depth=item.depth + depth) for item in entry[1]] if depth else entry[1]
+
+
+def WalkCacheTree(node: c4d.BaseObject, *predicates: Predicate) -> typing.Iterator[CacheTreeItem]:
+    """Yields the nodes in the cache-tree of #node which pass all #predicates.
+
+    Example:
+        Yielding all deformed polygon objects in the cache-tree of #op.
+
+            for item in WalkCacheTree(op, IsType(c4d.Opolygon), IsDeformed):
+                print(item.node)
+    """
+    return CacheTreeWalker(predicates).Walk(node)
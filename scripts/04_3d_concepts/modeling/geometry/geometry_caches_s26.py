@@ -22,6 +22,10 @@ Examples:
     * GetCaches(): Demonstrates retrieving and building caches for BaseObject instances.
     * PrintCacheTree(): Prints out the cache-tree of the passed object.
 
+Note:
+    The cache-tree is walked by the cache_tree module located next to this script, which is also
+    used by other examples.
+
 Overview:
     All geometry in the Cinema 4D Cinema API is represented as `BaseObject` instances. `BaseObject` 
     instances can also express non-geometry entities as light objects or cameras, but they are being 
@@ -56,8 +60,17 @@ __license__ = "Apache-2.0 License"
 __version__ = "S26"
 
 import c4d
+import os
+import sys
 import typing
 
+# The cache-tree walker is shared with other examples, it is located next to this script.
+GEOMETRY_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+if GEOMETRY_DIRECTORY not in sys.path:
+    sys.path.append(GEOMETRY_DIRECTORY)
+
+import cache_tree
+
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: typing.Optional[c4d.BaseObject]  # The selected object within that active document. Can be None.
 
@@ -116,19 +129,12 @@ def PrintCacheTree(obj: c4d.BaseObject, indent: int = 0, prefix: str = "") -> No
     if not isinstance(obj, c4d.BaseObject):
         return
 
-    # Print the current node.
-    tab = "\t" * indent
-    print(f"{tab}{prefix} {obj.GetName()}({obj.GetTypeName()})")
-
-    # Get the caches of the node and recurse for each of them.
-    for prefix, cache in (("[cache]", obj.GetCache()),
-                          ("[deform cache]", obj.GetDeformCache())):
-        if cache:
-            PrintCacheTree(cache, indent + 1, prefix)
-
-    # Traverse the children of the node.
-    for child in obj.GetChildren():
-        PrintCacheTree(child, indent + 1, "[child]")
+    # Walk the node, its caches and children with an explicit stack instead of recursing, deep
+    # hierarchies as produced by MoGraph could otherwise exceed the recursion limit.
+    for item in cache_tree.WalkCacheTree(obj):
+        tab = "\t" * (indent + item.depth)
+        label = cache_tree.LINK_LABELS[item.link] if item.link != cache_tree.LINK_ROOT else prefix
+        print(f"{tab}{label} {item.node.GetName()}({item.node.GetTypeName()})")
 
 
 def GetCaches(node: c4d.BaseObject) -> None:
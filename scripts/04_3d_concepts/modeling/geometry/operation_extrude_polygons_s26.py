@@ -13,12 +13,15 @@ Topics:
     * Extruding polygons
     * Evaluating the normals of polygons and vertices
     * Polygon selections
+    * Processing geometry as flat buffers
     * c4d.PolygonObject
     * c4d.CPolygon
 
 Examples:
     * GetPolygonNormal(): Returns the normal of the polygon defined by the passed points.
+    * PolygonExtruder: Extrudes polygons over flat point and polygon index buffers.
     * ExtrudePolygonObject(): Extrudes the selected polygons in a polygon object.
+    * RunBenchmark(): Extrudes half of the polygons of a mesh with one million polygons.
 
 Overview:
     It is not recommended to reinvent the wheel for basic operations as extruding polygons. While 
@@ -34,9 +37,28 @@ __date__ = "08/04/2022"
 __license__ = "Apache-2.0 License"
 __version__ = "S26"
 
+import array
 import c4d
+import os
+import sys
+import time
 import typing
 
+# The buffer conversions are shared with other examples, they are located next to this script.
+GEOMETRY_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+if GEOMETRY_DIRECTORY not in sys.path:
+    sys.path.append(GEOMETRY_DIRECTORY)
+
+import polygon_buffers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK: bool = False
+
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: typing.Optional[c4d.BaseObject]  # The selected object within that active document. Can be None.
 
@@ -149,21 +171,282 @@ def GetPolygonNormal(points: typing.Collection[c4d.Vector]) -> c4d.Vector:
     return ~GetMean(vertexNormals)
 
 
-def ExtrudePolygonObject(node: c4d.PolygonObject, distance: float) -> c4d.PolygonObject:
+class ExtrusionResult(typing.NamedTuple):
+    """The output of a PolygonExtruder, expressed as flat buffers.
+
+    Attributes:
+        points: The new points as flat x, y, z coordinates. They must be appended to the points of
+         the extruded geometry.
+        polygonIds: The indices of the extruded polygons.
+        caps: The new top-face polygons as flat a, b, c, d vertex indices. The i-th cap replaces the
+         polygon #polygonIds[i], so that polygon indices of the geometry remain valid.
+        walls: The new side polygons as flat a, b, c, d vertex indices. They must be appended to the
+         polygons of the extruded geometry.
+    """
+    points: typing.Sequence[float]
+    polygonIds: typing.Sequence[int]
+    caps: typing.Sequence[int]
+    walls: typing.Sequence[int]
+
+
+class PolygonExtruder:
+    """Extrudes polygons over flat point and polygon index buffers.
+
+    Other than ExtrudePolygonObject() in its simplest form, the extruder does not operate on
+    c4d.Vector and c4d.CPolygon instances. The points of the geometry are expressed as a flat buffer
+    of x, y, z coordinates and the polygons as a flat buffer of a, b, c, d vertex indices, in the
+    same way Cinema 4D stores them internally. All face normals are then computed in one go and the
+    new points and polygons are written into buffers which are allocated once with their final size.
+    When NumPy is installed, these operations are vectorized, otherwise the same buffers are filled
+    with plain Python loops.
+
+    Selections are expressed as bitmaps, a bytearray with one byte per polygon, so that testing if a
+    polygon is selected is a constant time lookup instead of searching a collection of indices.
+
+    The normal #n of a polygon is computed as the cross product of its diagonals, which is the
+    direction of the mean vertex normal as computed by GetPolygonNormal(). Since Cinema 4D stores
+    triangles with d = c, this formula also holds for triangles.
+
+        n = normalize((c - a) x (d - b))
+    """
+
+    def __init__(self, points: typing.Sequence[float], polygons: typing.Sequence[int]) -> None:
+        """Initializes the extruder with flat point and polygon buffers.
+
+        Args:
+            points: The points of the geometry as flat x, y, z coordinates.
+            polygons: The polygons of the geometry as flat a, b, c, d vertex indices.
+        """
+        if len(points) % 3 or len(polygons) % 4:
+            raise ValueError("Malformed point or polygon buffer.")
+
+        self._points = points
+        self._polygons = polygons
+        self._pointCount = len(points) // 3
+        self._polygonCount = len(polygons) // 4
+
+    @classmethod
+    def FromPolygonObject(cls, node: c4d.PolygonObject) -> "PolygonExtruder":
+        """Returns an extruder for the geometry of the passed polygon object.
+
+        Args:
+            node: The polygon object to read the points and polygons from.
+        """
+        return cls(*polygon_buffers.GetPolygonObjectBuffers(node))
+
+    @property
+    def PointCount(self) -> int:
+        """Returns the number of points of the geometry before the extrusion.
+        """
+        return self._pointCount
+
+    @property
+    def PolygonCount(self) -> int:
+        """Returns the number of polygons of the geometry before the extrusion.
+        """
+        return self._polygonCount
+
+    def Extrude(self, selection: bytearray, distance: float, islands: bool = False) -> ExtrusionResult:
+        """Extrudes the polygons marked in #selection by #distance.
+
+        Args:
+            selection: The bitmap of the polygons to extrude.
+            distance: The extrusion depth. Negative values extrude against the polygon normals.
+            islands: If True, polygons sharing an edge are extruded as one surface, i.e., shared
+             points are only extruded once, along the averaged normal of the polygons, and only the
+             outline of such island is receiving side polygons. If False, each polygon is extruded
+             on its own.
+
+        Returns:
+            The new points and polygons.
+        """
+        if len(selection) != self._polygonCount:
+            raise ValueError("The selection does not match the polygon count.")
+        if not any(selection):
+            raise RuntimeError("There are no polygons to extrude.")
+
+        if numpy is not None:
+            return self._ExtrudeNumPy(selection, float(distance), islands)
+
+        return self._ExtrudePython(selection, float(distance), islands)
+
+    def _ExtrudeNumPy(self, selection: bytearray, distance: float, islands: bool) -> ExtrusionResult:
+        """Implements Extrude() with NumPy.
+        """
+        points = numpy.asarray(self._points, dtype=numpy.float64).reshape(-1, 3)
+        polygons = numpy.asarray(self._polygons, dtype=numpy.int64).reshape(-1, 4)
+
+        # Get the indices of the selected polygons and their vertices.
+        polygonIds = numpy.flatnonzero(numpy.frombuffer(bytes(selection), dtype=numpy.uint8))
+        vertices = polygons[polygonIds]
+        isQuad = vertices[:, 2] != vertices[:, 3]
+
+        # Compute all face normals at once.
+        a, b, c, d = (points[vertices[:, i]] for i in range(4))
+        normals = numpy.cross(c - a, d - b)
+        lengths = numpy.linalg.norm(normals, axis=1)
+        normals /= numpy.where(lengths > 0., lengths, 1.)[:, None]
+
+        # The four edges of each polygon, #ab, #bc, #cd and #da; for triangles #cd is the edge #ca
+        # and #da is degenerated and must be ignored.
+        edgeStart = vertices
+        edgeEnd = numpy.roll(vertices, -1, axis=1)
+        edgeEnd[~isQuad, 2] = vertices[~isQuad, 0]
+        edgeMask = numpy.ones(vertices.shape, dtype=bool)
+        edgeMask[~isQuad, 3] = False
+
+        if islands:
+            # Extrude each point once along the normalized sum of the normals of its polygons.
+            corners = vertices[edgeMask]
+            cornerNormals = numpy.repeat(normals, 4, axis=0)[edgeMask.ravel()]
+            usedPoints = numpy.unique(corners)
+            vertexNormals = numpy.stack([numpy.bincount(corners, cornerNormals[:, k], len(points))
+                                         for k in range(3)], axis=1)[usedPoints]
+            lengths = numpy.linalg.norm(vertexNormals, axis=1)
+            vertexNormals /= numpy.where(lengths > 0., lengths, 1.)[:, None]
+
+            remap = numpy.full(len(points), -1, dtype=numpy.int64)
+            remap[usedPoints] = numpy.arange(self._pointCount, self._pointCount + len(usedPoints))
+            newPoints = points[usedPoints] + vertexNormals * distance
+            caps = remap[vertices]
+
+            # Only the edges used by exactly one selected polygon are part of the outline of an
+            # island.
+            starts, ends = edgeStart[edgeMask], edgeEnd[edgeMask]
+            keys = numpy.minimum(starts, ends) * self._pointCount + numpy.maximum(starts, ends)
+            _, inverse, counts = numpy.unique(keys, return_inverse=True, return_counts=True)
+            outline = counts[inverse] == 1
+            starts, ends = starts[outline], ends[outline]
+            startsNew, endsNew = remap[starts], remap[ends]
+        else:
+            # Extrude the corners of each polygon on their own, triangles only have three corners.
+            cornerMask = edgeMask
+            newIds = self._pointCount + numpy.cumsum(cornerMask.ravel()).reshape(-1, 4) - 1
+            newIds[~isQuad, 3] = newIds[~isQuad, 2]
+            newPoints = (points[vertices] + (normals * distance)[:, None, :])[cornerMask]
+            caps = newIds
+
+            newEdgeEnd = numpy.roll(newIds, -1, axis=1)
+            newEdgeEnd[~isQuad, 2] = newIds[~isQuad, 0]
+            starts, ends = edgeStart[edgeMask], edgeEnd[edgeMask]
+            startsNew, endsNew = newIds[edgeMask], newEdgeEnd[edgeMask]
+
+        # Build the side polygons, their vertex order is flipped for negative depths so that they
+        # still face outwards.
+        if distance >= 0.:
+            walls = numpy.stack((starts, ends, endsNew, startsNew), axis=1)
+        else:
+            walls = numpy.stack((startsNew, endsNew, ends, starts), axis=1)
+
+        return ExtrusionResult(newPoints.ravel(), polygonIds, caps.ravel(), walls.ravel())
+
+    def _ExtrudePython(self, selection: bytearray, distance: float, islands: bool) -> ExtrusionResult:
+        """Implements Extrude() with plain Python.
+        """
+        points, polygons = self._points, self._polygons
+        polygonIds = array.array("l", (i for i, state in enumerate(selection) if state))
+
+        # Compute all face normals, #normals[i] is the normal of the polygon #polygonIds[i].
+        normals = array.array("d", [0.]) * (len(polygonIds) * 3)
+        for i, pid in enumerate(polygonIds):
+            ia, ib, ic, id = polygons[pid * 4:pid * 4 + 4]
+            ax, ay, az = points[ia * 3:ia * 3 + 3]
+            bx, by, bz = points[ib * 3:ib * 3 + 3]
+            cx, cy, cz = points[ic * 3:ic * 3 + 3]
+            dx, dy, dz = points[id * 3:id * 3 + 3]
+            ux, uy, uz = cx - ax, cy - ay, cz - az
+            vx, vy, vz = dx - bx, dy - by, dz - bz
+            nx, ny, nz = uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx
+            length = (nx * nx + ny * ny + nz * nz) ** .5 or 1.
+            normals[i * 3:i * 3 + 3] = array.array("d", (nx / length, ny / length, nz / length))
+
+        def GetEdges(ia: int, ib: int, ic: int, id: int) -> typing.Tuple[typing.Tuple[int, int], ...]:
+            """Returns the edges of a polygon in the order of its vertices.
+            """
+            if ic == id:
+                return (ia, ib), (ib, ic), (ic, ia)
+            return (ia, ib), (ib, ic), (ic, id), (id, ia)
+
+        if islands:
+            # Sum up the normals of the polygons for each of their points and count the usage of
+            # each edge.
+            vertexNormals = {}
+            edgeUsage = {}
+            for i, pid in enumerate(polygonIds):
+                nx, ny, nz = normals[i * 3:i * 3 + 3]
+                for start, end in GetEdges(*polygons[pid * 4:pid * 4 + 4]):
+                    sx, sy, sz = vertexNormals.get(start, (0., 0., 0.))
+                    vertexNormals[start] = (sx + nx, sy + ny, sz + nz)
+                    key = (start, end) if start < end else (end, start)
+                    edgeUsage[key] = edgeUsage.get(key, 0) + 1
+
+            # Extrude each point once along its normalized normal.
+            remap = {}
+            newPoints = array.array("d", [0.]) * (len(vertexNormals) * 3)
+            for i, index in enumerate(sorted(vertexNormals)):
+                remap[index] = self._pointCount + i
+                nx, ny, nz = vertexNormals[index]
+                length = (nx * nx + ny * ny + nz * nz) ** .5 or 1.
+                x, y, z = points[index * 3:index * 3 + 3]
+                newPoints[i * 3:i * 3 + 3] = array.array(
+                    "d", (x + nx / length * distance, y + ny / length * distance, z + nz / length * distance))
+
+            caps = array.array("l", (remap[index] for pid in polygonIds
+                                     for index in polygons[pid * 4:pid * 4 + 4]))
+
+            # Only the edges used by exactly one selected polygon are part of the outline.
+            edges = [(start, end, remap[start], remap[end]) for pid in polygonIds
+                     for start, end in GetEdges(*polygons[pid * 4:pid * 4 + 4])
+                     if edgeUsage[(start, end) if start < end else (end, start)] == 1]
+        else:
+            # Extrude the corners of each polygon on their own, triangles only have three corners.
+            cornerCount = sum(3 if polygons[pid * 4 + 2] == polygons[pid * 4 + 3] else 4 for pid in polygonIds)
+            newPoints = array.array("d", [0.]) * (cornerCount * 3)
+            caps = array.array("l", [0]) * (len(polygonIds) * 4)
+            edges = []
+            offset = 0
+            for i, pid in enumerate(polygonIds):
+                nx, ny, nz = normals[i * 3:i * 3 + 3]
+                corners = polygons[pid * 4:pid * 4 + 4]
+                isTriangle = corners[2] == corners[3]
+                remap = {}
+                for index in corners[:3] if isTriangle else corners:
+                    x, y, z = points[index * 3:index * 3 + 3]
+                    newPoints[offset * 3:offset * 3 + 3] = array.array(
+                        "d", (x + nx * distance, y + ny * distance, z + nz * distance))
+                    remap[index] = self._pointCount + offset
+                    offset += 1
+
+                caps[i * 4:i * 4 + 4] = array.array("l", (remap[index] for index in corners))
+                edges += [(start, end, remap[start], remap[end]) for start, end in GetEdges(*corners)]
+
+        # Build the side polygons, their vertex order is flipped for negative depths so that they
+        # still face outwards.
+        walls = array.array("l", [0]) * (len(edges) * 4)
+        for i, (start, end, startNew, endNew) in enumerate(edges):
+            walls[i * 4:i * 4 + 4] = array.array(
+                "l", (start, end, endNew, startNew) if distance >= 0. else (startNew, endNew, end, start))
+
+        return ExtrusionResult(newPoints, polygonIds, caps, walls)
+
+
+def ExtrudePolygonObject(node: c4d.PolygonObject, distance: float,
+                         islands: bool = False) -> c4d.PolygonObject:
     """Extrudes the selected polygons in a polygon object.
 
-    This is the most simplistic implementation possible and does not provide features as extruding 
-    'islands' and negative extrusion depths.
+    The geometry operation itself is carried out by a PolygonExtruder over flat buffers, this
+    function only reads the data from and writes the result back to #node. Extruded polygons are
+    replaced in place by their top-face polygons and all side polygons are appended, so that only the
+    changed polygons must be written and the indices of all other polygons remain valid.
 
     Args:
         node: The polygon object to extrude the selected polygon.
-        distance: The distance of extrusion. Must be a positive value. When wanting to support
-         negative values, one would have to invert the polygon normals when #distance is negative.
+        distance: The distance of extrusion. Negative values extrude against the polygon normals.
+        islands: If True, polygons sharing an edge are extruded as one surface.
     """
     # Assert the type of the inputs.
     AssertType(node, c4d.PolygonObject)
     AssertType(distance, (float, int))
-    distance = max(distance, 0.0)
 
     # Get the document of the node. This step is only required when one wants to create an undo
     # for the operation.
@@ -171,127 +454,19 @@ def ExtrudePolygonObject(node: c4d.PolygonObject, distance: float) -> c4d.Polygo
     if nodeDoc is None:
         raise RuntimeError(f"'{node.GetName()}' is not attached to a document.")
 
-    # Get the polygon selection of #node and find the selected indices in it.
+    # Get the polygon selection of #node as a bitmap, i.e., one byte per polygon.
     selection = node.GetPolygonS()
-
-    # This is a list of boolean, e.g., for a PolygonObject with three polygons and the first and
-    # third polygon being selected, it would be [True, False, True].
-    states = selection.GetAll(node.GetPolygonCount())
-
-    # Translate #states into a list of selected indices.
-    selectedPolygonIndices = tuple(i for i, n in enumerate(states) if n)
-
-    if len(selectedPolygonIndices) == 0:
+    extruder = PolygonExtruder.FromPolygonObject(node)
+    bitmap = polygon_buffers.GetSelectionBitmap(selection, extruder.PolygonCount)
+    if not any(bitmap):
         raise RuntimeError(f"'{node.GetName()}' does not contain any selected polygons.")
 
-    # Get the polygons and points of #node.
-    points = node.GetAllPoints()
-    polygons = node.GetAllPolygons()
-
-    # The maximum polygon index before modifications minus the count of polygons which will be
-    # extruded and therefore removed. Storing this value is required to create the optional new
-    # polygon selection state after the operation has been carried out.
-    oldAdjustedMaxPolygonIndex = (len(polygons)) - len(selectedPolygonIndices)
-
-    # Loop over all polygons indices which should be extruded.
-    for pid in selectedPolygonIndices:
-
-        # A polygon which should be extruded.
-        cpoly = polygons[pid]
-
-        # Get the vertex indices of the polygon and the points for these vertices. Since Cinema 4D
-        # does store even triangles with a fourth index, one can blindly index a polygon as a quad
-        # and only differentiate the two cases when it matters.
-        ia, ib, ic, id = cpoly.a, cpoly.b, cpoly.c, cpoly.d
-        a, b, c, d = points[ia], points[ib], points[ic], points[id]
-        isTriangle = cpoly.IsTriangle()
-
-        # Get the normal of the selected polygon.
-        normal = GetPolygonNormal((a, b, c) if isTriangle else (a, b, c, d))
-
-        # A diagram of the operation of extruding the polygon #P.
-        #
-        #         d'------- c'
-        #        /|   Q    /|
-        #       / |       / |
-        #      a'------- b' |/
-        #     -|- d -----|- c --
-        #      | /   P   | /
-        #      |/        |/
-        #   -- a ------- b --
-        #     /         /
-        #
-        #   P                 The to be extruded (and removed) polygon.
-        #   Q                 The new extruded top-face polygon.
-        #   a, b, c, d        The vertices of the to be extruded polygon #Q.
-        #   a', b', c', d'    The extruded vertices.
-
-        # Extrude the points. An extruded point is defined as the sum of the original point and
-        # the polygon normal of P scaled to the extrusion depth.
-        a_ = a + normal * distance
-        b_ = b + normal * distance
-        c_ = c + normal * distance
-        d_ = d + normal * distance  # Only relevant when #isTriangle is #False.
-
-        # Determine the indices of the new points.
-        start = len(points) - 1
-        ia_, ib_, ic_, id_ = start + 1, start + 2, start + 3, start + 4
-        # Append the new points to the existing points of the object. When the to be extruded
-        # polygon is a triangle, the fourth point #d must be excluded.
-        points += [a_, b_, c_] if isTriangle else [a_, b_, c_, d_]
-
-        # Construct the new polygons. Just as for constructing the cube object example, the order
-        # of polygons does not carry any special meaning, but the order of vertices does, as it will
-        # determine the normal of the polygon. See the example function ConstructPolygonObject() in
-        # geometry_types_xxx.py which constructs a cube object for fundamental information on
-        # polygons and polygon objects.
-        #
-        #         d'------- c'
-        #        /|   Q    /|
-        #       / |       / |
-        #      a'------- b' |/
-        #     -|- d -----|- c --
-        #      | /   P   | /
-        #      |/        |/
-        #   -- a ------- b --
-        #     /         /
-        #
-        newPolygons = [
-            # The to be extruded polygon is a quadrangle.
-            c4d.CPolygon(ia_, ib_, ic_, id_),  # The polygon at the top
-            c4d.CPolygon(ia, ib, ib_, ia_),    # The polygon for the edge #ab
-            c4d.CPolygon(ib, ic, ic_, ib_),    # The polygon for the edge #bc
-            c4d.CPolygon(ic_, ic, id, id_),    # The polygon for the edge #cd
-            c4d.CPolygon(id_, id, ia, ia_),    # The polygon for the edge #da
-        ] if not isTriangle else [
-            # The to be extruded polygon is a triangle.
-            c4d.CPolygon(ia_, ib_, ic_, ic_),  # The polygon at the top
-            c4d.CPolygon(ia, ib, ib_, ia_),    # The polygon for the edge #ab
-            c4d.CPolygon(ib, ic, ic_, ib_),    # The polygon for the edge #bc
-            c4d.CPolygon(ic_, ic, ia, ia_)     # The polygon for the edge #ca
-        ]
-
-        # Append the new polygons to the list of polygons of the object.
-        polygons += newPolygons
-
-    # End of loop
-
-    # Remove all polygons which have been extruded from the list of polygons. The principal state
-    # of #polygons is as follows, where indices marked as {} are polygons which have been extruded,
-    # and should be removed, and indices marked with () are new polygons which have been added.
-    # i + n marks the old maximum polygon index before the extrusions and i + n + m the new maximum
-    # index.
-    #
-    #   polygons = [i, {i + 1}, i + 2, ..., i + n, (i + n + 1), (i + n + 2), ..., (i + n + m)]
-    #
-    polygons = [cpoly for i, cpoly in enumerate(polygons) if i not in selectedPolygonIndices]
-
-    # Start an undo operation.
-    doc.StartUndo()
-    doc.AddUndo(c4d.UNDOTYPE_CHANGE, node)
-
-    # The polygon object must be resized before the data can be written back.
-    node.ResizeObject(pcnt=len(points), vcnt=len(polygons))
+    # Carry out the extrusion.
+    result = extruder.Extrude(bitmap, distance, islands)
+    newPoints = result.points.tolist()
+    caps, walls = result.caps.tolist(), result.walls.tolist()
+    pointCount, polygonCount = extruder.PointCount, extruder.PolygonCount
+    wallCount = len(walls) // 4
 
     # Open an undo stack for the changes and an undo item for the point and polygon changes.
     if not nodeDoc.StartUndo():
@@ -300,25 +475,30 @@ def ExtrudePolygonObject(node: c4d.PolygonObject, distance: float) -> c4d.Polygo
     if not nodeDoc.AddUndo(c4d.UNDOTYPE_CHANGE, node):
         raise RuntimeError("Could not add undo item.")
 
-    # Write the data back to the polygon object.
+    # The polygon object must be resized before the data can be written back. Resizing preserves
+    # the existing points and polygons.
+    node.ResizeObject(pcnt=pointCount + len(newPoints) // 3, vcnt=polygonCount + wallCount)
+
+    # Write the points back, the new points are built from the flat buffer in one go.
+    points = node.GetAllPoints()
+    points[pointCount:] = map(c4d.Vector, newPoints[0::3], newPoints[1::3], newPoints[2::3])
     node.SetAllPoints(points)
-    for i, cpoly in enumerate(polygons):
-        node.SetPolygon(i, cpoly)
+
+    # Only write the changed polygons, the top-faces replace the extruded polygons.
+    for i, pid in enumerate(result.polygonIds.tolist()):
+        node.SetPolygon(pid, c4d.CPolygon(*caps[i * 4:i * 4 + 4]))
+    for i in range(wallCount):
+        node.SetPolygon(polygonCount + i, c4d.CPolygon(*walls[i * 4:i * 4 + 4]))
 
     node.Message(c4d.MSG_UPDATE)
 
     # It is technically not necessary to do this, but since the polygon count has changed, the
-    # polygon selection state of #node is now incorrect, as selections reference indices. Being
-    # selected are here all new polygons.
+    # polygon selection state of #node is now incorrect. Being selected are here all new polygons,
+    # i.e., the top-faces and side polygons.
     if not nodeDoc.AddUndo(c4d.UNDOTYPE_CHANGE_SELECTION, node):
         raise RuntimeError("Could not add undo item.")
 
-    # Flush the polygon selection.
-    selection.DeselectAll()
-
-    # Select all new polygons which have been appended to the list of polygons.
-    for i in range(oldAdjustedMaxPolygonIndex, node.GetPolygonCount()):
-        selection.Select(i)
+    selection.SetAll(list(map(bool, bitmap + b"\x01" * wallCount)))
 
     # End the undo stack.
     if not nodeDoc.EndUndo():
@@ -327,6 +507,42 @@ def ExtrudePolygonObject(node: c4d.PolygonObject, distance: float) -> c4d.Polygo
     return node
 
 
+def RunBenchmark(size: int = 1000) -> None:
+    """Extrudes every other row of polygons of a plane with #size * #size polygons.
+
+    The plane is built directly as flat buffers, so that the benchmark only measures the extrusion.
+    With the default size, 500,000 polygons of a 1,000,000 polygons mesh are extruded.
+
+    Args:
+        size: The number of polygons along each side of the plane.
+    """
+    # Build the points and quads of the plane.
+    row = size + 1
+    points = array.array("d", [0.]) * (row * row * 3)
+    for i in range(row * row):
+        points[i * 3] = float(i % row)
+        points[i * 3 + 2] = float(i // row)
+
+    polygons = array.array("l", [0]) * (size * size * 4)
+    for i in range(size * size):
+        a = (i // size) * row + i % size
+        polygons[i * 4:i * 4 + 4] = array.array("l", (a, a + row, a + row + 1, a + 1))
+
+    # Select every other row of polygons, each row is then an island.
+    bitmap = bytearray(size * size)
+    for y in range(0, size, 2):
+        bitmap[y * size:(y + 1) * size] = b"\x01" * size
+
+    extruder = PolygonExtruder(points, polygons)
+    backend = "NumPy" if numpy is not None else "Python"
+    for islands in (False, True):
+        t = time.perf_counter()
+        result = extruder.Extrude(bitmap, 10., islands)
+        print(f"Extruded {sum(bitmap):,} of {size * size:,} polygons ({backend}, islands: {islands}) in "
+              f"{time.perf_counter() - t:.3f} sec: {len(result.points) // 3:,} new points, "
+              f"{len(result.walls) // 4:,} side polygons.")
+
+
 def BuildSetup(doc: c4d.documents.BaseDocument) -> c4d.BaseObject:
     """Builds the inputs for the example.
     """
@@ -389,8 +605,9 @@ def main(doc: c4d.documents.BaseDocument, op: typing.Optional[c4d.BaseObject]) -
     # polygon object selection.
     node = op if isinstance(op, c4d.PolygonObject) else BuildSetup(doc)
 
-    # Extrude the selected polygons in #node manually by 50 units.
-    ExtrudePolygonObject(node, 50.)
+    # Extrude the selected polygons in #node manually by 50 units, polygons sharing edges are
+    # extruded as one surface.
+    ExtrudePolygonObject(node, 50., islands=True)
 
     # Set the document to polygon mode and set #node as the selected object in #doc.
     doc.SetMode(c4d.Mpolygons)
@@ -403,4 +620,7 @@ def main(doc: c4d.documents.BaseDocument, op: typing.Optional[c4d.BaseObject]) -
 if __name__ == '__main__':
     c4d.CallCommand(13957)  # Clear the console.
     # #doc and #op are predefined module attributes as defined at the top of the file.
-    main(doc, op)
+    if RUN_BENCHMARK:
+        RunBenchmark()
+    else:
+        main(doc, op)
@@ -3,7 +3,8 @@
 polygons in a polygon object.
 
 'Flattening' means here projecting all point which are part of the active polygon selection into
-the mean plane of that polygon selection. The example will either project the selected polygons of 
+the least-squares plane of that polygon selection, where each island of the selection is flattened
+into its own plane. The example will either project the selected polygons of 
 the selected PolygonObject instance, or, when no object selection is present, generate an example 
 geometry for which then the polygon selection will be flattened.
 
@@ -15,16 +16,20 @@ Note:
 Topics:
     * Implementing a point deformation operation
     * Orthogonally projecting points into a plane
-    * Evaluating the normals of polygons and vertices
+    * Fitting planes to points
     * Polygon selections
+    * Processing geometry as flat buffers
     * c4d.PolygonObject
     * c4d.CPolygon
 
 Examples:
-    * ProjectIntoPlane(): Projects #p orthogonally into the plane defined by #q and #normal.
-    * GetPolygonNormal(): Returns the normal of the polygon defined by the passed points.
-    * FlattenPolygonObjectSelection(): Projects the selected polygons in #node into the mean plane 
-     of the selection.
+    * GetSmallestEigenvector(): Returns the eigenvector for the smallest eigenvalue of a symmetric
+     3x3 matrix.
+    * PlaneFlattener: Projects selected points into least-squares fitted planes over flat buffers.
+    * FlattenPolygonObjectSelection(): Projects each island of the selected polygons in #node into
+     its least-squares plane.
+    * RunBenchmark(): Flattens the points of half of the polygons of a mesh with one million
+     polygons.
 
 Overview:
     Other than modelling tools which construct geometry, tools which just deform point objects are 
@@ -42,9 +47,29 @@ __date__ = "08/04/2022"
 __license__ = "Apache-2.0 License"
 __version__ = "S26"
 
+import array
 import c4d
+import os
+import sys
+import math
+import time
 import typing
 
+# The buffer conversions are shared with other examples, they are located next to this script.
+GEOMETRY_DIRECTORY: str = os.path.dirname(os.path.abspath(__file__))
+if GEOMETRY_DIRECTORY not in sys.path:
+    sys.path.append(GEOMETRY_DIRECTORY)
+
+import polygon_buffers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK: bool = False
+
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: typing.Optional[c4d.BaseObject]  # The selected object within that active document. Can be None.
 
@@ -56,135 +81,284 @@ def AssertType(item: any, t: typing.Type) -> None:
         raise TypeError(f"Expected {t} for {item}.")
 
 
-def GetMean(collection: typing.Collection) -> typing.Any:
-    """Returns the arithmetic mean of #collection. 
+def GetSmallestEigenvector(matrix: typing.Sequence[float]) -> typing.Tuple[float, float, float]:
+    """Returns the eigenvector for the smallest eigenvalue of a symmetric 3x3 matrix.
 
-    Args:
-        collection: An iterable of types that support addition operations between each other, where
-         the sum of them supports multiplication.
-
-    Returns:
-        The arithmetic mean of #collection.
-    """
-    return sum(collection) * (1. / len(collection))
-
-
-def ProjectIntoPlane(p: c4d.Vector, q: c4d.Vector, normal: c4d.Vector) -> c4d.Vector:
-    """Projects the point #p orthogonally into the plane defined by #q and #normal.
+    The eigenvalues are computed in closed form with the trigonometric method for symmetric
+    matrices. The eigenvector for the smallest eigenvalue #l is then the largest cross product of two
+    rows of (M - l * I), as all rows of that matrix are orthogonal to the eigenvector.
 
     Args:
-        p: The point to project.
-        q: A point in the plane.
-        normal: The normal of the plane (expected to be a normalized vector).
+        matrix: The matrix as its components xx, xy, xz, yy, yz, zz.
 
     Returns:
-        The projected point.
+        The normalized eigenvector.
     """
-    AssertType(p, c4d.Vector)
-    AssertType(q, c4d.Vector)
-    AssertType(normal, c4d.Vector)
-
-    # The distance from the point #p to its orthogonal projection #p' on the plane. Or, in short,
-    # the length of the shortest path (in euclidean space) from #p to the plane.
-    distance = (p - q) * normal
-    # Calculate #p' by moving #p #distance units along the inverse plane normal.
-    return p - normal * distance
-
-
-def GetPolygonNormal(points: typing.Collection[c4d.Vector]) -> c4d.Vector:
-    """Returns the normal of the polygon defined by the passed points.
-
-    Cinema 4D provides normals for polygon objects in the form of normal and phong tags. Both forms
-    of normal storage are not always accessible, as these tags are not always present on an object.
-    Both tags usually also store interpolated normals which most of the time are undesirable for
-    modelling operations. This function demonstrates how to compute the raw normal of a polygon and
-    its vertices. There are more performant ways to compute these normals, but this example has been
-    written with clarity of operations and not with efficiency in mind.
-
-    The normal #ni of the i-th vertex #i in a polygon is defined by the normalized cross product 
-    of its edges #e1 and #e2. #e1 is the edge connecting #i to the previous vertex #h in the 
-    polygon, and #e2 the edge connecting #i to the next vertex #j.
-
-        Quadrangle              Triangle      
-
-        * ----- j                     j      
-        |       |                   / |      
-        |    ni | e2              / ni| e2       
-        |      \|               /    \|       
-        h -----[i]             h ----[i]      
-            e1                    e1            
-
-        e1 = (h - i)
-        e2 = (i - j)
-        ni = normalize(e1 x e2)
-
-    The normal #n of a polygon #P is then the arithmetic mean of all its vertex normals.
-
-       nd      nb
-        \       \    
-         d ----- c   
-         |  n    |   
-       na|   \ nb|    <---   Polygon P
-        \|      \|   
-         a ----- b      
-
-        Triangle:
-
-            na + nb + nc
-        n = ------------
-                 3
-
-        Quadrangle:
-
-            na + nb + nc + nd
-        n = -----------------
-                    4      
-
-    To be more efficient in computation, one should at least leave out the step of normalizing all
-    vertex normals and instead just normalize the final polygon normal when the vertex normals are
-    not required as an output. Normalization is an expensive operation since it entails calculating 
-    the length of a vector. In practice, floating precision errors would so require one to normalize 
-    the polygon normal when the vertex normals had been normalized. 
-
-        vertexNormals = []
-        for h, i, j in vertexNeighborhoodTriples:
-            vertexNormals.append((h - i) x (j - i))
-
-        n = normalize(mean(vertexNormals))
-
-    Args:
-        points: The points of a polygon in consecutive order. Can either be three or four points.
+    xx, xy, xz, yy, yz, zz = matrix
+
+    # Compute the smallest eigenvalue.
+    p1 = xy * xy + xz * xz + yz * yz
+    q = (xx + yy + zz) / 3.
+    if p1 == 0.:
+        value = min(xx, yy, zz)
+    else:
+        p = ((((xx - q) ** 2 + (yy - q) ** 2 + (zz - q) ** 2 + 2. * p1) / 6.) ** .5) or 1.
+        bxx, byy, bzz, bxy, bxz, byz = (xx - q) / p, (yy - q) / p, (zz - q) / p, xy / p, xz / p, yz / p
+        r = (bxx * (byy * bzz - byz * byz) - bxy * (bxy * bzz - byz * bxz) + bxz * (bxy * byz - byy * bxz)) / 2.
+        phi = math.acos(max(-1., min(1., r))) / 3.
+        value = q + 2. * p * math.cos(phi + 2. * math.pi / 3.)
+
+    # Find the largest cross product of the rows of (M - value * I).
+    rows = ((xx - value, xy, xz), (xy, yy - value, yz), (xz, yz, zz - value))
+    best, bestLength = None, 0.
+    for (ax, ay, az), (bx, by, bz) in ((rows[0], rows[1]), (rows[0], rows[2]), (rows[1], rows[2])):
+        cross = (ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx)
+        length = sum(c * c for c in cross)
+        if length > bestLength:
+            best, bestLength = cross, length
+
+    if best is not None and bestLength > 1e-24:
+        length = bestLength ** .5
+        return best[0] / length, best[1] / length, best[2] / length
+
+    # The rows are parallel, i.e., the points are collinear, any vector orthogonal to the largest row
+    # is then an eigenvector. When all rows are null, the points are all identical.
+    x, y, z = max(rows, key=lambda row: sum(c * c for c in row))
+    if x == y == z == 0.:
+        return 0., 1., 0.
+    cross = (y, -x, 0.) if abs(z) < max(abs(x), abs(y)) else (0., z, -y)
+    length = sum(c * c for c in cross) ** .5
+    return cross[0] / length, cross[1] / length, cross[2] / length
+
+
+class PlaneFlattener:
+    """Projects selected points into least-squares fitted planes over flat point and polygon buffers.
+
+    Other than a simple flatten operation, the flattener does not average polygon normals to find
+    the plane and does not project points one by one. The points of the geometry are expressed
+    as a flat buffer of x, y, z coordinates and the polygons as a flat buffer of a, b, c, d vertex
+    indices. When NumPy is installed, all operations are vectorized, otherwise the same buffers are
+    processed with plain Python loops.
+
+    The points of the selected polygons are split into islands, i.e., groups of polygons connected
+    over shared points, and each island is flattened into its own plane. The plane of an island is
+    its (weighted) least-squares plane: it runs through the weighted mean point #c of the island and
+    its normal #n is the direction of least variance of the points, the eigenvector of the smallest
+    eigenvalue of their covariance matrix. This is the same vector as the last right singular vector
+    of an SVD of the centered points, but only requires decomposing one 3x3 matrix per island.
+
+        c = sum(w * p) / sum(w)
+        C = sum(w * (p - c)(p - c)^T)
+        p' = p - n * ((p - c) . n) * w * strength
     """
-    # Assert the inputs.
-    AssertType(points, (list, tuple))
-    if len(points) not in (3, 4):
-        raise RuntimeError(f"Invalid length for: {points}")
-
-    count = len(points)
-    vertexNormals = []
-
-    # Iterate over all points.
-    for index in range(count):
-        # Determine the current vertex #i and its two neighbors #h and #j. For the first and last
-        # point, the neighborhood lookup must loop over.
-        h = points[index - 1] if index > 0 else points[count - 1]
-        i = points[index]
-        j = points[index + 1] if index < (count - 1) else points[0]
-        # Compute the cross product for the two edges of the vertex.
-        e1, e2 = (h - i), (i - j)
-        vertexNormals.append(e1 % e2)
-
-    # Return normalized mean of #vertexNormals. The operator ~ carries out normalization for the
-    # type c4d.Vector.
-    return ~GetMean(vertexNormals)
 
-
-def FlattenPolygonObjectSelection(node: c4d.PolygonObject, strength: float) -> c4d.PolygonObject:
-    """Projects the selected polygons in #node into the mean plane of the selection.
+    def __init__(self, points: typing.Sequence[float], polygons: typing.Sequence[int]) -> None:
+        """Initializes the flattener with flat point and polygon buffers.
+
+        Args:
+            points: The points of the geometry as flat x, y, z coordinates.
+            polygons: The polygons of the geometry as flat a, b, c, d vertex indices.
+        """
+        if len(points) % 3 or len(polygons) % 4:
+            raise ValueError("Malformed point or polygon buffer.")
+
+        self._points = points
+        self._polygons = polygons
+        self._pointCount = len(points) // 3
+        self._polygonCount = len(polygons) // 4
+
+    @classmethod
+    def FromPolygonObject(cls, node: c4d.PolygonObject) -> "PlaneFlattener":
+        """Returns a flattener for the geometry of the passed polygon object.
+
+        Args:
+            node: The polygon object to read the points and polygons from.
+        """
+        return cls(*polygon_buffers.GetPolygonObjectBuffers(node))
+
+    @property
+    def PolygonCount(self) -> int:
+        """Returns the number of polygons of the geometry.
+        """
+        return self._polygonCount
+
+    def Flatten(self, selection: bytearray, strength: float = 1.,
+                weights: typing.Optional[typing.Sequence[float]] = None
+                ) -> typing.Tuple[typing.Sequence[int], typing.Sequence[float]]:
+        """Projects the points of the polygons marked in #selection into the planes of their islands.
+
+        Args:
+            selection: The bitmap of the polygons to flatten.
+            strength: The strength in the interval [0, 1] with which the projection is applied.
+            weights: The optional per-point falloff weights in the interval [0, 1], e.g., the values
+             of a vertex map. They weight the points both in the plane fit and in the projection.
+
+        Returns:
+            The indices of the selected points and their new positions as flat x, y, z coordinates.
+        """
+        if len(selection) != self._polygonCount:
+            raise ValueError("The selection does not match the polygon count.")
+        if weights is not None and len(weights) != self._pointCount:
+            raise ValueError("The weights do not match the point count.")
+        if not any(selection):
+            raise RuntimeError("There are no polygons to flatten.")
+
+        if numpy is not None:
+            return self._FlattenNumPy(selection, float(strength), weights)
+
+        return self._FlattenPython(selection, float(strength), weights)
+
+    def _FlattenNumPy(self, selection: bytearray, strength: float,
+                      weights: typing.Optional[typing.Sequence[float]]
+                      ) -> typing.Tuple[typing.Sequence[int], typing.Sequence[float]]:
+        """Implements Flatten() with NumPy.
+        """
+        polygons = numpy.asarray(self._polygons, dtype=numpy.int64).reshape(-1, 4)
+        polygons = polygons[numpy.frombuffer(bytes(selection), dtype=numpy.uint8).astype(bool)]
+
+        # Get the selected points and express the polygons over indices into them.
+        used = numpy.zeros(self._pointCount, dtype=bool)
+        used[polygons] = True
+        pointIds = numpy.flatnonzero(used)
+        corners = (numpy.cumsum(used) - 1)[polygons]
+
+        # Label the islands by propagating the smallest label over each polygon and then letting
+        # each label point to the label of its label until nothing changes anymore.
+        labels = numpy.arange(len(pointIds))
+        while True:
+            newLabels = labels.copy()
+            numpy.minimum.at(newLabels, corners.ravel(), numpy.repeat(labels[corners].min(axis=1), 4))
+            numpy.minimum.at(newLabels, labels, newLabels)
+            while True:
+                jumped = newLabels[newLabels]
+                if numpy.array_equal(jumped, newLabels):
+                    break
+                newLabels = jumped
+            if numpy.array_equal(newLabels, labels):
+                break
+            labels = newLabels
+
+        # Each island is now labelled with its smallest point, number them consecutively.
+        roots = labels == numpy.arange(len(labels))
+        labels = (numpy.cumsum(roots) - 1)[labels]
+        islandCount = int(numpy.count_nonzero(roots))
+
+        # Compute the weighted mean point and the covariance matrix of each island.
+        points = numpy.asarray(self._points, dtype=numpy.float64).reshape(-1, 3)[pointIds]
+        w = (numpy.ones(len(pointIds)) if weights is None else
+             numpy.clip(numpy.asarray(weights, dtype=numpy.float64)[pointIds], 0., 1.))
+        weightSum = numpy.bincount(labels, w, islandCount)
+        weightSum[weightSum == 0.] = 1.
+        centers = numpy.stack([numpy.bincount(labels, w * points[:, i], islandCount)
+                               for i in range(3)], axis=1) / weightSum[:, None]
+        delta = points - centers[labels]
+        covariance = numpy.empty((islandCount, 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                covariance[:, i, j] = covariance[:, j, i] = numpy.bincount(
+                    labels, w * delta[:, i] * delta[:, j], islandCount)
+
+        # The plane normals are the eigenvectors of the smallest eigenvalues, #eigh() returns them
+        # in ascending order.
+        normals = numpy.linalg.eigh(covariance)[1][:, :, 0][labels]
+
+        # Project all points at once.
+        distances = numpy.einsum("ij,ij->i", delta, normals) * w * strength
+        return pointIds, (points - normals * distances[:, None]).ravel()
+
+    def _FlattenPython(self, selection: bytearray, strength: float,
+                       weights: typing.Optional[typing.Sequence[float]]
+                       ) -> typing.Tuple[typing.Sequence[int], typing.Sequence[float]]:
+        """Implements Flatten() with plain Python.
+        """
+        polygons = self._polygons
+        points = self._points
+
+        # Label the islands with a union-find over the points of the selected polygons.
+        parents = {}
+
+        def Find(index: int) -> int:
+            """Returns the root of #index, halving the path to it on the way.
+            """
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        for pid, state in enumerate(selection):
+            if not state:
+                continue
+            corners = polygons[pid * 4:pid * 4 + 4]
+            for index in corners:
+                parents.setdefault(index, index)
+            root = Find(corners[0])
+            for index in corners[1:]:
+                other = Find(index)
+                if other != root:
+                    parents[max(root, other)] = min(root, other)
+                    root = min(root, other)
+
+        pointIds = array.array("l", sorted(parents))
+        islands = {}
+        labels = array.array("l", [0]) * len(pointIds)
+        for i, index in enumerate(pointIds):
+            labels[i] = islands.setdefault(Find(index), len(islands))
+
+        # Compute the weighted mean point of each island.
+        w = array.array("d", [1.]) * len(pointIds)
+        if weights is not None:
+            for i, index in enumerate(pointIds):
+                w[i] = max(0., min(1., weights[index]))
+
+        sums = [[0., 0., 0., 0.] for _ in islands]
+        for i, index in enumerate(pointIds):
+            x, y, z = points[index * 3:index * 3 + 3]
+            s, wi = sums[labels[i]], w[i]
+            s[0] += wi * x
+            s[1] += wi * y
+            s[2] += wi * z
+            s[3] += wi
+        centers = [(sx / (sw or 1.), sy / (sw or 1.), sz / (sw or 1.)) for sx, sy, sz, sw in sums]
+
+        # Compute the covariance matrix of each island and the normal of its plane.
+        covariances = [[0.] * 6 for _ in islands]
+        for i, index in enumerate(pointIds):
+            cx, cy, cz = centers[labels[i]]
+            x, y, z = points[index * 3:index * 3 + 3]
+            dx, dy, dz, wi = x - cx, y - cy, z - cz, w[i]
+            c = covariances[labels[i]]
+            c[0] += wi * dx * dx
+            c[1] += wi * dx * dy
+            c[2] += wi * dx * dz
+            c[3] += wi * dy * dy
+            c[4] += wi * dy * dz
+            c[5] += wi * dz * dz
+        normals = [GetSmallestEigenvector(c) for c in covariances]
+
+        # Project the points.
+        result = array.array("d", [0.]) * (len(pointIds) * 3)
+        for i, index in enumerate(pointIds):
+            (cx, cy, cz), (nx, ny, nz) = centers[labels[i]], normals[labels[i]]
+            x, y, z = points[index * 3:index * 3 + 3]
+            distance = ((x - cx) * nx + (y - cy) * ny + (z - cz) * nz) * w[i] * strength
+            result[i * 3:i * 3 + 3] = array.array("d", (x - nx * distance, y - ny * distance, z - nz * distance))
+
+        return pointIds, result
+
+
+def FlattenPolygonObjectSelection(node: c4d.PolygonObject, strength: float,
+                                  weights: typing.Optional[typing.Sequence[float]] = None
+                                  ) -> c4d.PolygonObject:
+    """Projects each island of the selected polygons in #node into its least-squares plane.
+
+    The projection itself is carried out by a PlaneFlattener over flat buffers, this function only
+    reads the data from and writes the result back to #node.
 
     Args:
-        strength: The strength value in the interval [0, 1] with which the projection should be 
-         applied. 
+        node: The polygon object to flatten the selected polygons for.
+        strength: The strength value in the interval [0, 1] with which the projection should be
+         applied.
+        weights: The optional per-point falloff weights in the interval [0, 1].
 
     Returns:
         The 'flattened' object.
@@ -200,52 +374,25 @@ def FlattenPolygonObjectSelection(node: c4d.PolygonObject, strength: float) -> c
     if nodeDoc is None:
         raise RuntimeError(f"'{node.GetName()}' is not attached to a document.")
 
-     # Get the point, polygons and polygon selection of the node.
-    points = node.GetAllPoints()
-    polygons = node.GetAllPolygons()
-    polygonCount = len(polygons)
-
     # There are no polygons in #node.
-    if polygonCount < 1:
+    if node.GetPolygonCount() < 1:
         raise RuntimeError(f"'{node.GetName()}' does not contain any polygons.")
 
-    # The current polygon selection of #node.
-    baseSelect = node.GetPolygonS()
-
-    # This is a list of boolean, e.g., for a PolygonObject with three polygons and the first and
-    # third polygon being selected, it would be [True, False, True].
-    polygonSelection = baseSelect.GetAll(polygonCount)
-
-    # Get the indices of the selected polygons.
-    selectedPolygonIds = [i for i, v in enumerate(polygonSelection) if v]
-    selectedPolygons = [polygons[i] for i in selectedPolygonIds]
+    # Get the polygon selection of #node as a bitmap, i.e., one byte per polygon.
+    flattener = PlaneFlattener.FromPolygonObject(node)
+    bitmap = polygon_buffers.GetSelectionBitmap(node.GetPolygonS(), flattener.PolygonCount)
 
     # There are no polygons selected in #node.
-    if not selectedPolygons:
+    if not any(bitmap):
         raise RuntimeError(f"'{node.GetName()}' does not contain any selected polygons.")
 
-    # Get the points of the vertices which are part of the selected polygons.
-    selectedPointIds = list({p for cpoly in selectedPolygons
-                             for p in [cpoly.a, cpoly.b, cpoly.c, cpoly.d]})
-    selectedPoints = [points[i] for i in selectedPointIds]
-
-    # The selected polygon normals, the mean selected polygon normal and the mean point within the
-    # polygon vertices. The mean point and the mean normal define the plane one must project points
-    # into to 'flatten' the selection.
-    polygonNormals = [
-        GetPolygonNormal([points[cpoly.a], points[cpoly.b], points[cpoly.c]]
-                         if cpoly.IsTriangle() else
-                         [points[cpoly.a], points[cpoly.b], points[cpoly.c], points[cpoly.d]])
-        for cpoly in selectedPolygons]
-    meanNormal = ~GetMean(polygonNormals)
-    meanPoint = GetMean(selectedPoints)
-
-    # Project the selected points into the mean plane of #selectedPolygonIds and then overwrite the
-    # original point, depending on #strength.
-    for pid in selectedPointIds:
-        p = ProjectIntoPlane(points[pid], meanPoint, meanNormal)
-        # MixVec() computes the linear interpolation between two vectors.
-        points[pid] = c4d.utils.MixVec(points[pid], p, strength)
+    # Compute the new positions of the selected points and write them into the points of #node.
+    pointIds, coordinates = flattener.Flatten(bitmap, strength, weights)
+    coordinates = coordinates.tolist()
+    points = node.GetAllPoints()
+    for index, p in zip(pointIds.tolist(), map(c4d.Vector, coordinates[0::3], coordinates[1::3],
+                                               coordinates[2::3])):
+        points[index] = p
 
     # Open an undo stack for the changes and an undo item for the point and polygon changes.
     if not nodeDoc.StartUndo():
@@ -264,6 +411,53 @@ def FlattenPolygonObjectSelection(node: c4d.PolygonObject, strength: float) -> c
     return node
 
 
+def GetVertexMapWeights(node: c4d.PolygonObject) -> typing.Optional[typing.List[float]]:
+    """Returns the values of the first vertex map tag on #node as per-point weights.
+
+    Returns:
+        The weights or None when #node has no vertex map tag.
+    """
+    tag = node.GetTag(c4d.Tvertexmap)
+    if tag is None or tag.GetDataCount() != node.GetPointCount():
+        return None
+
+    return tag.GetAllHighlevelData()
+
+
+def RunBenchmark(size: int = 1000) -> None:
+    """Flattens every other row of polygons of a noisy plane with #size * #size polygons.
+
+    The plane is built directly as flat buffers, so that the benchmark only measures the flattening.
+    With the default size, the points of 500,000 polygons in 500 islands are flattened.
+
+    Args:
+        size: The number of polygons along each side of the plane.
+    """
+    # Build the points and quads of the plane.
+    row = size + 1
+    points = array.array("d", [0.]) * (row * row * 3)
+    for i in range(row * row):
+        points[i * 3] = float(i % row)
+        points[i * 3 + 1] = math.sin(i * 0.37)
+        points[i * 3 + 2] = float(i // row)
+
+    polygons = array.array("l", [0]) * (size * size * 4)
+    for i in range(size * size):
+        a = (i // size) * row + i % size
+        polygons[i * 4:i * 4 + 4] = array.array("l", (a, a + row, a + row + 1, a + 1))
+
+    # Select every other row of polygons, each row is then an island.
+    bitmap = bytearray(size * size)
+    for y in range(0, size, 2):
+        bitmap[y * size:(y + 1) * size] = b"\x01" * size
+
+    flattener = PlaneFlattener(points, polygons)
+    t = time.perf_counter()
+    pointIds, _ = flattener.Flatten(bitmap, 1.)
+    print(f"Flattened {len(pointIds):,} points of {sum(bitmap):,} polygons "
+          f"({'NumPy' if numpy is not None else 'Python'}) in {time.perf_counter() - t:.3f} sec.")
+
+
 def BuildSetup(doc: c4d.documents.BaseDocument) -> c4d.BaseObject:
     """Builds the inputs for the example.
     """
@@ -326,8 +520,8 @@ def main(doc: c4d.documents.BaseDocument, op: typing.Optional[c4d.BaseObject]) -
     # polygon object selection.
     node = op if isinstance(op, c4d.PolygonObject) else BuildSetup(doc)
 
-    # 'Flatten' the polygon selection of #node
-    FlattenPolygonObjectSelection(node, 1.0)
+    # 'Flatten' the polygon selection of #node, weighted by its first vertex map when there is one.
+    FlattenPolygonObjectSelection(node, 1.0, GetVertexMapWeights(node))
 
     # Set the document to polygon mode and set the new objects as the selected object in #doc.
     doc.SetMode(c4d.Mpolygons)
@@ -340,4 +534,7 @@ def main(doc: c4d.documents.BaseDocument, op: typing.Optional[c4d.BaseObject]) -
 if __name__ == '__main__':
     c4d.CallCommand(13957)  # Clear the console.
     # #doc and #op are predefined module attributes as defined at the top of the file.
-    main(doc, op)
+    if RUN_BENCHMARK:
+        RunBenchmark()
+    else:
+        main(doc, op)
@@ -0,0 +1,80 @@
+#coding: utf-8
+"""Provides the conversion of polygon objects and selections into flat buffers, shared by the
+polygon operation examples.
+
+This file is not a script but a module imported by other scripts. To use it, append the directory
+of this file to `sys.path` before importing it, e.g., for a script located next to it:
+
+    import os
+    import sys
+
+    GEOMETRY_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+    if GEOMETRY_DIRECTORY not in sys.path:
+        sys.path.append(GEOMETRY_DIRECTORY)
+
+    import polygon_buffers
+
+Topics:
+    * Processing geometry as flat buffers
+    * Polygon selections
+
+Examples:
+    * GetPolygonObjectBuffers(): Returns the points and polygons of a polygon object as flat
+     buffers.
+    * GetSelectionBitmap(): Returns the selection bitmap, one byte per element, for a selection.
+
+Overview:
+    The operations of the polygon operation examples do not work on c4d.Vector and c4d.CPolygon
+    instances but on flat buffers, the points as x, y, z coordinates and the polygons as a, b, c, d
+    vertex indices, and on selections expressed as one byte per element. Such buffers can be
+    processed with NumPy when it is installed and with plain Python loops otherwise.
+"""
+__copyright__ = "Copyright (C) 2022 MAXON Computer GmbH"
+__license__ = "Apache-2.0 License"
+
+import array
+import c4d
+import typing
+
+
+def GetPolygonObjectBuffers(node: c4d.PolygonObject) -> typing.Tuple[array.array, array.array]:
+    """Returns the points and polygons of #node as flat buffers.
+
+    Args:
+        node: The polygon object to read the points and polygons from.
+
+    Returns:
+        The points as flat x, y, z coordinates and the polygons as flat a, b, c, d vertex indices.
+    """
+    if not isinstance(node, c4d.PolygonObject):
+        raise TypeError(f"Expected {c4d.PolygonObject} for {node}.")
+
+    points = array.array("d", [0.]) * (node.GetPointCount() * 3)
+    for i, p in enumerate(node.GetAllPoints()):
+        points[i * 3:i * 3 + 3] = array.array("d", (p.x, p.y, p.z))
+
+    polygons = array.array("l", [0]) * (node.GetPolygonCount() * 4)
+    for i, cpoly in enumerate(node.GetAllPolygons()):
+        polygons[i * 4:i * 4 + 4] = array.array("l", (cpoly.a, cpoly.b, cpoly.c, cpoly.d))
+
+    return points, polygons
+
+
+def GetSelectionBitmap(selection: c4d.BaseSelect, count: int) -> bytearray:
+    """Returns the selection bitmap, one byte per element, for #selection.
+
+    The bitmap is filled segment-wise, i.e., over ranges of consecutively selected elements,
+    instead of testing each element.
+
+    Args:
+        selection: The selection to convert.
+        count: The number of elements the selection is referring to.
+    """
+    bitmap = bytearray(count)
+    for segment in range(selection.GetSegments()):
+        first, last = selection.GetRange(segment, count)
+        if first < count:
+            last = min(last, count - 1)
+            bitmap[first:last + 1] = b"\x01" * (last - first + 1)
+
+    return bitmap
@@ -7,9 +7,17 @@ Description:
       tag where the normals have been rotated by 45° around the world z-axis.
     - Showcases read and write operations for the normals of a NormalTag.
     - Normals are stored for each vertex of each polygon.
-    - Raw data normal structure for one polygon is 12 int16 value (4 vectors 
-      for each vertex of a Cpolygon * 3 components for each vector), even if 
+    - Raw data normal structure for one polygon is 12 int16 value (4 vectors
+      for each vertex of a Cpolygon * 3 components for each vector), even if
       the Cpolygon is a triangle.
+    - When NumPy is installed, the normals are converted between the raw int16
+      buffer of the tag and a float32 array of the shape (polygon_count, 4, 3)
+      in single vectorized operations, and the phong normals are rotated in one
+      operation.
+    - ComputeSmoothNormals() is not used by the script. It shows how to compute
+      smooth normals from flat point and polygon arrays for geometry without a
+      phong tag, but ignores the phong angle and phong breaks, i.e., its normals
+      differ from the ones returned by CreatePhongNormals().
 
 Class/method highlighted:
     - c4d.NormalTag
@@ -21,25 +29,46 @@ import c4d
 import array
 import math
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 QUARTER_PI = math.pi * .25
 
+# The factor between a normal component and its int16 representation.
+NORMAL_SCALE = 32000.0
 
-def ReadNormalTag(tag):
-    """Reads a c4d.NormalTag to a list of c4d.Vector.
+# The weightings supported by ComputeSmoothNormals().
+WEIGHTING_FACE = 0
+WEIGHTING_ANGLE = 1
+
+
+def CheckNormalTag(tag):
+    """Raises a TypeError when tag is not a c4d.NormalTag.
+
+    Args:
+        tag (c4d.NormalTag): The tag to check.
+    """
+    if not (isinstance(tag, c4d.BaseTag) and tag.CheckType(c4d.Tnormal)):
+        msg = f"Expected normal tag, received: {tag}."
+        raise TypeError(msg)
+
+
+def ReadNormalTagArray(tag):
+    """Reads the normals of a c4d.NormalTag into a float32 array.
 
     Args:
         tag (c4d.NormalTag): The tag to read the normals from.
 
     Returns:
-        list[c4d.Vector]: The read normals. There are polygon_count * 4 normals, i.e. each vertex has a normal for each polygon it is attached to.
+        Union[numpy.ndarray, array.array]: The normals as an array of the shape (polygon_count, 4, 3) when NumPy is installed, otherwise as a flat array('f') with 12 components per polygon.
 
     Raises:
         TypeError: When tag is not a c4d.NormalTag.
         RuntimeError: When the memory of the tag cannot be read.
     """
-    if not (isinstance(tag, c4d.BaseTag) and tag.CheckType(c4d.Tnormal)):
-        msg = f"Expected normal tag, received: {tag}."
-        raise TypeError(msg)
+    CheckNormalTag(tag)
 
     # Get the read-only normal tag buffer.
     buffer = tag.GetLowlevelDataAddressR()
@@ -47,28 +76,27 @@ def ReadNormalTag(tag):
         msg = "Failed to retrieve memory buffer for VariableTag."
         raise RuntimeError(msg)
 
-    # Init an int16 array with the raw buffer. For details on Python's typed 
+    # Interpret the raw buffer as int16 values and scale them in one operation.
+    count = tag.GetDataCount() * 12
+    if numpy is not None:
+        data = numpy.frombuffer(buffer, dtype=numpy.int16, count=count)
+        return (data * numpy.float32(1. / NORMAL_SCALE)).reshape(-1, 4, 3)
+
+    # Init an int16 array with the raw buffer. For details on Python's typed
     # arrays see:
     #   https://docs.python.org/3.7/library/array.html
     data = array.array('h')
-    data.frombytes(buffer)
+    data.frombytes(buffer[:count * 2])
+    factor = 1. / NORMAL_SCALE
+    return array.array('f', [value * factor for value in data])
 
-    # Convert the int16 representation of the normals to a list of c4d.Vector.
-    factor = 1 / 32000.0
-    return [c4d.Vector(data[i-3] * factor,
-                       data[i-2] * factor,
-                       data[i-1] * factor)
-            for i in range(3, len(data) + 3, 3)]
 
-
-def WriteNormalTag(tag, normals, doNormalize=True):
-    """Writes a list of c4d.Vector to a c4d.NormalTag.
-    
-    Does not ensure that normals is only composed of c4d.Vector.
+def WriteNormalTagArray(tag, normals, doNormalize=True):
+    """Writes an array of normals into a c4d.NormalTag.
 
     Args:
         tag (c4d.NormalTag): The tag to write the normals into.
-        normals (list[c4d.Vector]): The normals to write.
+        normals (Union[numpy.ndarray, Sequence[float]]): The normals, either as an array of the shape (polygon_count, 4, 3) or as a flat sequence with 12 components per polygon.
         doNormalize (bool, optional): If True, the input normals will be normalized. If False, they will not.. Defaults to True.
 
     Raises:
@@ -76,9 +104,7 @@ def WriteNormalTag(tag, normals, doNormalize=True):
         RuntimeError: When the memory of the tag cannot be read.
         IndexError: When normals does not match the size of tag.
     """
-    if not (isinstance(tag, c4d.BaseTag) and tag.CheckType(c4d.Tnormal)):
-        msg = f"Expected normal tag, received: {tag}."
-        raise TypeError(msg)
+    CheckNormalTag(tag)
 
     # Get the writable normal tag buffer.
     buffer = tag.GetLowlevelDataAddressW()
@@ -86,29 +112,194 @@ def WriteNormalTag(tag, normals, doNormalize=True):
         msg = "Failed to retrieve memory buffer for VariableTag."
         raise RuntimeError(msg)
 
-    # Normalize the input if requested.
-    if doNormalize:
-        normals = [n.GetNormalized() for n in normals]
-
-    # Convert c4d.Vector normals to int16 representation.
-    raw_normals = [int(component * 32000.0)
-                   for n in normals for component in (n.x, n.y, n.z)]
-
     # Catch input data of invalid length.
-    count = tag.GetDataCount()
-    if count * 12 != len(raw_normals):
+    count = tag.GetDataCount() * 12
+    received = numpy.size(normals) if numpy is not None else len(normals)
+    if received != count:
         msg = (f"Invalid data size. Expected length of {count}. "
-               f"Received: {len(raw_normals)}")
+               f"Received: {received}")
         raise IndexError(msg)
 
+    if numpy is not None:
+        # Normalize, quantize and write the normals, each in one operation. The
+        # int16 view is writing directly into the memory of the tag.
+        values = numpy.asarray(normals, dtype=numpy.float32).reshape(-1, 3)
+        if doNormalize:
+            lengths = numpy.linalg.norm(values, axis=1, keepdims=True)
+            values = values / numpy.where(lengths > 0., lengths, 1.)
+        view = numpy.frombuffer(buffer, dtype=numpy.int16, count=count).reshape(-1, 3)
+        view[:] = numpy.clip(numpy.rint(values * NORMAL_SCALE), -NORMAL_SCALE, NORMAL_SCALE)
+        return
+
+    # Normalize and quantize the normals component by component.
+    values = list(normals)
+    if doNormalize:
+        for i in range(0, count, 3):
+            x, y, z = values[i:i + 3]
+            length = math.sqrt(x * x + y * y + z * z) or 1.
+            values[i:i + 3] = x / length, y / length, z / length
+
     # Write the data back. For details on Python's typed arrays, see:
     #   https://docs.python.org/3.7/library/array.html
-    data = array.array('h')
-    data.fromlist(raw_normals)
+    data = array.array('h', [int(round(max(-1., min(1., value)) * NORMAL_SCALE)) for value in values])
     data = data.tobytes()
     buffer[:len(data)] = data
 
 
+def ReadNormalTag(tag):
+    """Reads a c4d.NormalTag to a list of c4d.Vector.
+
+    Args:
+        tag (c4d.NormalTag): The tag to read the normals from.
+
+    Returns:
+        list[c4d.Vector]: The read normals. There are polygon_count * 4 normals, i.e. each vertex has a normal for each polygon it is attached to.
+
+    Raises:
+        TypeError: When tag is not a c4d.NormalTag.
+        RuntimeError: When the memory of the tag cannot be read.
+    """
+    # Convert the float representation of the normals to a list of c4d.Vector.
+    data = ReadNormalTagArray(tag)
+    data = data.reshape(-1).tolist() if numpy is not None else data.tolist()
+    return list(map(c4d.Vector, data[0::3], data[1::3], data[2::3]))
+
+
+def WriteNormalTag(tag, normals, doNormalize=True):
+    """Writes a list of c4d.Vector to a c4d.NormalTag.
+
+    Does not ensure that normals is only composed of c4d.Vector.
+
+    Args:
+        tag (c4d.NormalTag): The tag to write the normals into.
+        normals (list[c4d.Vector]): The normals to write.
+        doNormalize (bool, optional): If True, the input normals will be normalized. If False, they will not.. Defaults to True.
+
+    Raises:
+        TypeError: When tag is not a c4d.NormalTag.
+        RuntimeError: When the memory of the tag cannot be read.
+        IndexError: When normals does not match the size of tag.
+    """
+    # Flatten the c4d.Vector normals, the conversion to the int16 representation
+    # is done by WriteNormalTagArray.
+    values = [component for n in normals for component in (n.x, n.y, n.z)]
+    WriteNormalTagArray(tag, values, doNormalize)
+
+
+def ComputeSmoothNormals(points, polygons, weighting=WEIGHTING_FACE):
+    """Computes smooth normals in the layout of a c4d.NormalTag from flat point and polygon arrays.
+
+    The normal of a vertex is the normalized sum of the normals of all polygons attached to it,
+    weighted either by the area of the polygons (WEIGHTING_FACE) or by the angle of the polygons at
+    the vertex (WEIGHTING_ANGLE). Other than CreatePhongNormals(), the phong angle limit and phong
+    breaks are not taken into account, i.e., all edges are smooth.
+
+    Args:
+        points (Union[numpy.ndarray, Sequence[float]]): The points as flat x, y, z coordinates.
+        polygons (Union[numpy.ndarray, Sequence[int]]): The polygons as flat a, b, c, d vertex indices.
+        weighting (int, optional): WEIGHTING_FACE or WEIGHTING_ANGLE. Defaults to WEIGHTING_FACE.
+
+    Returns:
+        Union[numpy.ndarray, array.array]: The normals, see ReadNormalTagArray.
+
+    Raises:
+        ValueError: When weighting is not supported.
+    """
+    if weighting not in (WEIGHTING_FACE, WEIGHTING_ANGLE):
+        raise ValueError(f"Unsupported weighting: {weighting}")
+
+    if numpy is None:
+        return ComputeSmoothNormalsPython(points, polygons, weighting)
+
+    pts = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    polys = numpy.asarray(polygons, dtype=numpy.int64).reshape(-1, 4)
+    isTriangle = polys[:, 2] == polys[:, 3]
+
+    # The normals of all polygons, the cross product of the diagonals. Its length
+    # is twice the area of the polygon, for triangles as well, as d equals c.
+    a, b, c, d = (pts[polys[:, i]] for i in range(4))
+    faceNormals = numpy.cross(c - a, d - b)
+
+    # The corners which are part of the polygons, the fourth corner of triangles is not.
+    corners = numpy.ones(polys.shape, dtype=bool)
+    corners[isTriangle, 3] = False
+
+    if weighting == WEIGHTING_FACE:
+        cornerNormals = numpy.broadcast_to(faceNormals[:, None, :], polys.shape + (3,))
+    else:
+        # Compute the angle of each corner between the edges to its neighbors. The
+        # edge to the previous corner is the inverted edge of the previous corner.
+        following = numpy.roll(polys, -1, axis=1)
+        following[isTriangle, 2] = polys[isTriangle, 0]
+        corner = numpy.stack((a, b, c, d), axis=1)
+        e2 = pts[following] - corner
+        e1 = -numpy.roll(e2, 1, axis=1)
+        angles = numpy.arctan2(numpy.linalg.norm(numpy.cross(e1, e2), axis=2),
+                               numpy.einsum("ijk,ijk->ij", e1, e2))
+        lengths = numpy.linalg.norm(faceNormals, axis=1, keepdims=True)
+        unitNormals = faceNormals / numpy.where(lengths > 0., lengths, 1.)
+        cornerNormals = unitNormals[:, None, :] * angles[:, :, None]
+
+    # Sum up the weighted normals for each vertex and normalize them.
+    indices = polys[corners]
+    weighted = cornerNormals[corners]
+    vertexNormals = numpy.stack([numpy.bincount(indices, weighted[:, i], len(pts))
+                                 for i in range(3)], axis=1)
+    lengths = numpy.linalg.norm(vertexNormals, axis=1, keepdims=True)
+    vertexNormals /= numpy.where(lengths > 0., lengths, 1.)
+
+    # Gather the vertex normals for each corner, the fourth corner of triangles gets the normal of c.
+    return vertexNormals.astype(numpy.float32)[polys]
+
+
+def ComputeSmoothNormalsPython(points, polygons, weighting=WEIGHTING_FACE):
+    """Implements ComputeSmoothNormals without NumPy.
+
+    Args:
+        points (Sequence[float]): The points as flat x, y, z coordinates.
+        polygons (Sequence[int]): The polygons as flat a, b, c, d vertex indices.
+        weighting (int, optional): WEIGHTING_FACE or WEIGHTING_ANGLE. Defaults to WEIGHTING_FACE.
+
+    Returns:
+        array.array: The normals as a flat array('f') with 12 components per polygon.
+    """
+    def Sub(i, j):
+        return (points[i * 3] - points[j * 3],
+                points[i * 3 + 1] - points[j * 3 + 1],
+                points[i * 3 + 2] - points[j * 3 + 2])
+
+    def Cross(u, v):
+        return (u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0])
+
+    def Length(u):
+        return math.sqrt(u[0] * u[0] + u[1] * u[1] + u[2] * u[2])
+
+    vertexNormals = [0.] * len(points)
+    for p in range(0, len(polygons), 4):
+        ia, ib, ic, id = polygons[p:p + 4]
+        corners = (ia, ib, ic) if ic == id else (ia, ib, ic, id)
+        normal = Cross(Sub(ic, ia), Sub(id, ib))
+
+        for k, index in enumerate(corners):
+            weight = 1.
+            if weighting == WEIGHTING_ANGLE:
+                # Weight the unit normal by the angle of the corner.
+                e1 = Sub(corners[k - 1], index)
+                e2 = Sub(corners[(k + 1) % len(corners)], index)
+                angle = math.atan2(Length(Cross(e1, e2)), e1[0] * e2[0] + e1[1] * e2[1] + e1[2] * e2[2])
+                weight = angle / (Length(normal) or 1.)
+
+            vertexNormals[index * 3] += normal[0] * weight
+            vertexNormals[index * 3 + 1] += normal[1] * weight
+            vertexNormals[index * 3 + 2] += normal[2] * weight
+
+    for i in range(0, len(vertexNormals), 3):
+        length = Length(vertexNormals[i:i + 3]) or 1.
+        vertexNormals[i:i + 3] = [value / length for value in vertexNormals[i:i + 3]]
+
+    return array.array('f', [vertexNormals[index * 3 + k] for index in polygons for k in range(3)])
+
+
 def main():
     """Entry point."""
     # Raise an error when the primary selection is not a PolygonObject.
@@ -119,11 +310,6 @@ def main():
     if op.GetTag(c4d.Tphong) is None:
         raise ValueError("Selected object does not carry a phong tag.")
 
-    # Get the phong normals of the phong tag of the object and rotate them
-    # all by 45° around the global z-axis.
-    phongNormals = [nrm * c4d.utils.MatrixRotZ(QUARTER_PI) 
-                    for nrm in op.CreatePhongNormals()]
-
     # Create a new NormalTag with a size of the polygon count of our object.
     normalTag = c4d.NormalTag(count=op.GetPolygonCount())
     if normalTag is None:
@@ -133,16 +319,34 @@ def main():
     normals = ReadNormalTag(normalTag)
     print(f"Normals of the newly allocated tag: {normals}")
 
+    # Get the phong normals of the phong tag of the object.
+    phongNormals = op.CreatePhongNormals()
+
     # This should not happen.
-    if len(phongNormals) != len(normals):
+    if phongNormals is None or len(phongNormals) != len(normals):
         raise RuntimeError("Unexpected NormalTag to phong normals mismatch.")
 
-    # Write the phong normals into our NormalTag.
-    WriteNormalTag(normalTag, phongNormals)
+    if numpy is not None:
+        # Rotate all phong normals by 45° around the global z-axis in one
+        # vectorized operation.
+        m = c4d.utils.MatrixRotZ(QUARTER_PI)
+        rotation = numpy.array([[m.v1.x, m.v1.y, m.v1.z],
+                                [m.v2.x, m.v2.y, m.v2.z],
+                                [m.v3.x, m.v3.y, m.v3.z]], dtype=numpy.float32)
+        values = numpy.array([(n.x, n.y, n.z) for n in phongNormals], dtype=numpy.float32)
+
+        # Write the rotated normals into our NormalTag.
+        WriteNormalTagArray(normalTag, values @ rotation)
+    else:
+        # Rotate the phong normals all by 45° around the global z-axis.
+        phongNormals = [nrm * c4d.utils.MatrixRotZ(QUARTER_PI) for nrm in phongNormals]
+
+        # Write the phong normals into our NormalTag.
+        WriteNormalTag(normalTag, phongNormals)
 
     # Inspect our write operation in the console.
     normals = ReadNormalTag(normalTag)
-    print(f"Normals after writing the phong normals: {normals}")
+    print(f"Normals after writing the normals: {normals}")
 
     # Start an undo block.
     doc.StartUndo()
@@ -0,0 +1,149 @@
+"""
+Copyright: MAXON Computer GmbH
+Author: Yannick Puech
+
+Description:
+    - Reads and writes all colors of a Vertex Color Tag in one call through the memory of the tag.
+    - Converts colors between the Point mode and Polygon mode layouts.
+    - Shared by the vertex color examples, this file is not a script but a module. To use it, append the directory of
+      this file to sys.path before importing it, e.g., for a script located next to it:
+
+          VERTEX_COLOR_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+          if VERTEX_COLOR_DIRECTORY not in sys.path:
+              sys.path.append(VERTEX_COLOR_DIRECTORY)
+
+          import vertex_color_buffers
+
+Note:
+     - The colors of a Vertex Color Tag are stored as four float32 components (RGBA) per color, one color per point in
+       Point mode, and four colors per polygon (one for each of its vertices a, b, c, d) in Polygon mode.
+     - When NumPy is installed, colors are (N, 4) float32 arrays, otherwise flat sequences with four components per
+       color.
+
+Class/method highlighted:
+    - VertexColorTag.IsPerPointColor()
+    - VariableTag.GetLowlevelDataAddressR()
+    - VariableTag.GetLowlevelDataAddressW()
+
+"""
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def GetColorCount(tag):
+    """Returns the number of colors stored in a Vertex Color Tag.
+
+    Args:
+        tag (c4d.VertexColorTag): The tag to get the number of colors for.
+
+    Returns:
+        int: The point count in Point mode, four times the polygon count in Polygon mode.
+    """
+    # GetDataCount() returns the number of polygons in Polygon mode
+    count = tag.GetDataCount()
+    return count if tag.IsPerPointColor() else count * 4
+
+
+def ReadVertexColors(tag):
+    """Reads all colors of a Vertex Color Tag.
+
+    Args:
+        tag (c4d.VertexColorTag): The tag to read the colors from.
+
+    Returns:
+        Union[numpy.ndarray, array.array]: The colors, a (N, 4) float32 array or a flat array('f').
+    """
+    buffer = tag.GetLowlevelDataAddressR()
+    if buffer is None:
+        raise RuntimeError("Failed to retrieve the memory of the vertex color tag.")
+
+    count = GetColorCount(tag) * 4
+    if numpy is not None:
+        return numpy.frombuffer(buffer, dtype=numpy.float32, count=count).reshape(-1, 4).copy()
+
+    return array.array("f", buffer.cast("B")[:count * 4].cast("f"))
+
+
+def WriteVertexColors(tag, colors):
+    """Writes all colors of a Vertex Color Tag in one call.
+
+    Args:
+        tag (c4d.VertexColorTag): The tag to write the colors into.
+        colors (Union[numpy.ndarray, Sequence[float]]): The colors in the layout of the tag, see GetColorCount(), either
+            as a (N, 4) array or as a flat sequence of RGBA components.
+    """
+    buffer = tag.GetLowlevelDataAddressW()
+    if buffer is None:
+        raise RuntimeError("Failed to retrieve the memory of the vertex color tag.")
+
+    count = GetColorCount(tag) * 4
+    if numpy is not None:
+        colors = numpy.asarray(colors, dtype=numpy.float32).reshape(-1)
+        if colors.size != count:
+            raise ValueError(f"Expected {count // 4} colors, received {colors.size // 4}.")
+        numpy.frombuffer(buffer, dtype=numpy.float32, count=count)[:] = colors
+        return
+
+    if len(colors) != count:
+        raise ValueError(f"Expected {count // 4} colors, received {len(colors) // 4}.")
+    buffer.cast("B")[:count * 4].cast("f")[:] = array.array("f", colors)
+
+
+def PointToPolygonColors(colors, polygons):
+    """Converts colors from the Point mode layout to the Polygon mode layout.
+
+    Each vertex of each polygon receives the color of its point.
+
+    Args:
+        colors (Union[numpy.ndarray, Sequence[float]]): The colors of the points.
+        polygons (Union[numpy.ndarray, Sequence[int]]): The polygons as flat a, b, c, d point indices.
+
+    Returns:
+        Union[numpy.ndarray, array.array]: The colors of the vertices of the polygons.
+    """
+    if numpy is not None:
+        colors = numpy.asarray(colors, dtype=numpy.float32).reshape(-1, 4)
+        return colors[numpy.asarray(polygons, dtype=numpy.int64)]
+
+    return array.array("f", [c for index in polygons for c in colors[index * 4:index * 4 + 4]])
+
+
+def PolygonToPointColors(colors, polygons, pointCount):
+    """Converts colors from the Polygon mode layout to the Point mode layout.
+
+    The color of a point is the mean of the colors of the polygon vertices attached to it. The fourth vertex of
+    triangles is ignored.
+
+    Args:
+        colors (Union[numpy.ndarray, Sequence[float]]): The colors of the vertices of the polygons.
+        polygons (Union[numpy.ndarray, Sequence[int]]): The polygons as flat a, b, c, d point indices.
+        pointCount (int): The number of points.
+
+    Returns:
+        Union[numpy.ndarray, array.array]: The colors of the points.
+    """
+    if numpy is not None:
+        colors = numpy.asarray(colors, dtype=numpy.float32).reshape(-1, 4)
+        polys = numpy.asarray(polygons, dtype=numpy.int64).reshape(-1, 4)
+        used = numpy.ones(polys.shape, dtype=bool)
+        used[polys[:, 2] == polys[:, 3], 3] = False
+        indices, used = polys[used], used.reshape(-1)
+        counts = numpy.bincount(indices, minlength=pointCount)
+        sums = numpy.stack([numpy.bincount(indices, colors[used, i], pointCount) for i in range(4)], axis=1)
+        return (sums / numpy.maximum(counts, 1)[:, None]).astype(numpy.float32)
+
+    sums = [0.] * (pointCount * 4)
+    counts = [0] * pointCount
+    for corner, index in enumerate(polygons):
+        # Skips the fourth vertex of triangles
+        if corner % 4 == 3 and polygons[corner - 1] == index:
+            continue
+        counts[index] += 1
+        for i in range(4):
+            sums[index * 4 + i] += colors[corner * 4 + i]
+
+    return array.array("f", [value / (counts[i // 4] or 1) for i, value in enumerate(sums)])
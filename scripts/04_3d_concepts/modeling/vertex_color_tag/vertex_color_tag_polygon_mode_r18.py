@@ -5,16 +5,35 @@ Author: Yannick Puech
 Description:
     - Gets and Sets Vertex Colors in Polygon mode:
     - Changes all vertex colors to red.
+    - Writes all colors in one call into the memory of the tag, instead of calling SetPolygon() for each polygon.
 
 Note:
      - Only RGB vertex colors are supported by this script
+     - The colors are written by the vertex_color_buffers module located next to this script, which also converts
+       colors between the Point mode and Polygon mode layouts.
 
 Class/method highlighted:
-    - VertexColorTag.GetDataAddressW()
-    - VertexColorTag.SetPolygon()
+    - VertexColorTag.IsPerPointColor()
+    - VertexColorTag.SetPerPointMode()
+    - VariableTag.GetLowlevelDataAddressW()
 
 """
+import array
 import c4d
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The color buffer helpers are shared with other examples, they are located next to this script.
+VERTEX_COLOR_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+if VERTEX_COLOR_DIRECTORY not in sys.path:
+    sys.path.append(VERTEX_COLOR_DIRECTORY)
+
+import vertex_color_buffers
 
 
 def main():
@@ -32,24 +51,18 @@ def main():
         # If not changes to Polygon mode
         tag.SetPerPointMode(False)
 
-    # Obtains Vertex Colors data address
-    addr = tag.GetDataAddressW()
-
-    # Initializes red color and Vertex Colors polygon
-    red = c4d.Vector4d(1, 0, 0, 1)
-    poly = dict()
-    poly['a'] = red
-    poly['b'] = red
-    poly['c'] = red
-    poly['d'] = red
+    # Initializes red color for each vertex of each polygon
+    count = vertex_color_buffers.GetColorCount(tag)
+    if numpy is not None:
+        red = numpy.tile(numpy.array([1, 0, 0, 1], dtype=numpy.float32), (count, 1))
+    else:
+        red = array.array("f", [1, 0, 0, 1]) * count
 
-    # GetDataCount() returns the number of polygons in Polygon mode
-    count = tag.GetDataCount()
-    for idx in range(count):
-        # Sets Vertex Colors red
-        c4d.VertexColorTag.SetPolygon(addr, idx, poly)
+    # Sets all Vertex Colors red at once
+    vertex_color_buffers.WriteVertexColors(tag, red)
 
     # Pushes an update event to Cinema 4D
+    tag.Message(c4d.MSG_UPDATE)
     c4d.EventAdd()
 
 
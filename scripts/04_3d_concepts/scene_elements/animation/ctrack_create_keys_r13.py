@@ -6,14 +6,34 @@ Description:
     - Creates position Y tracks.
     - Adds two keyframes.
     - Sets their value and interpolation.
+    - BakeTrack() bakes arrays of times and values into a track, e.g. for mocap data, optionally reducing the keys
+      beforehand with the Ramer-Douglas-Peucker algorithm.
+
+Note:
+    - CreateKey() needs four calls per key, SetKeyDefault() being the most expensive one. BakeTrack() sets up one key
+      as a template and inserts a clone of it per key, only setting its time and value.
+    - Times are in seconds. When NumPy is installed, ReduceKeys() measures the errors of all keys of a segment at once.
+    - Set RUN_BENCHMARK to True to compare the keys per second of CreateKey() and BakeTrack().
 
 Class/method highlighted:
     - CKey.SetInterpolation()
     - CKey.SetKeyDefault()
+    - CKey.SetAutomaticTangentMode()
+    - CCurve.InsertKey()
 
 """
 
 import c4d
+import math
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK = False
 
 
 def CreateKey(curve, time, value, interpolation):
@@ -57,7 +77,182 @@ def CreateKey(curve, time, value, interpolation):
     return key, keyIndex
 
 
+def ReduceKeys(times, values, tolerance):
+    """Returns the indices of the keys to keep so that the linear interpolation of the kept keys deviates from all
+    values by at most the tolerance, with the Ramer-Douglas-Peucker algorithm.
+
+    The deviation is measured along the value axis, at the time of each key, so that the tolerance is in the unit of
+    the values.
+
+    Args:
+        times (Sequence[float]): The times of the keys, sorted ascending.
+        values (Sequence[float]): The values of the keys.
+        tolerance (float): The maximum deviation of a removed key.
+
+    Returns:
+        list[int]: The sorted indices of the kept keys, always including the first and the last key.
+    """
+    count = len(times)
+    if count < 3:
+        return list(range(count))
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+
+    if numpy is not None:
+        times = numpy.asarray(times, dtype=numpy.float64)
+        values = numpy.asarray(values, dtype=numpy.float64)
+
+    # The segments left to split, an explicit stack instead of recursion for long tracks
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        t0, v0, t1, v1 = times[first], values[first], times[last], values[last]
+        slope = (v1 - v0) / (t1 - t0) if t1 != t0 else 0.0
+        if numpy is not None:
+            errors = numpy.abs(values[first + 1:last] - (v0 + (times[first + 1:last] - t0) * slope))
+            index = int(numpy.argmax(errors))
+            error = errors[index]
+            index += first + 1
+        else:
+            error, index = -1.0, first
+            for i in range(first + 1, last):
+                e = abs(values[i] - (v0 + (times[i] - t0) * slope))
+                if e > error:
+                    error, index = e, i
+
+        if error > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [i for i, state in enumerate(keep) if state]
+
+
+def GetTrack(op, descId):
+    """Returns the track of a parameter, the track is created and inserted when it does not exist yet.
+
+    Args:
+        op (c4d.BaseList2D): The animated node.
+        descId (c4d.DescID): The DescID of the parameter.
+
+    Returns:
+        c4d.CTrack: The track.
+    """
+    track = op.FindCTrack(descId)
+    if track is None:
+        track = c4d.CTrack(op, descId)
+        if track is None:
+            raise MemoryError("Failed to create a track.")
+        op.InsertTrackSorted(track)
+    return track
+
+
+def BakeTrack(doc, op, descId, times, values, interpolation=c4d.CINTERPOLATION_SPLINE, tangentMode=None,
+              tolerance=0.0):
+    """Replaces the keys of the track of a parameter with keys for the given times and values.
+
+    Args:
+        doc (c4d.documents.BaseDocument): The document used for the default settings of the keys.
+        op (c4d.BaseList2D): The animated node.
+        descId (c4d.DescID): The DescID of the parameter.
+        times (Sequence[float]): The times of the keys in seconds, sorted ascending.
+        values (Sequence[float]): The values of the keys.
+        interpolation (c4d.CINTERPOLATION_XXX): The interpolation of the keys.
+        tangentMode (Optional[c4d.CAUTOMODE_XXX]): The automatic tangent mode of the keys, the default of the
+            document when None.
+        tolerance (float): The maximum deviation of removed keys, see ReduceKeys(), no key is removed when 0.
+
+    Returns:
+        c4d.CTrack: The track.
+    """
+    if len(times) != len(values):
+        raise ValueError("Expected as many values as times.")
+
+    # Python lists are faster to iterate than arrays
+    times = times.tolist() if hasattr(times, "tolist") else list(times)
+    values = values.tolist() if hasattr(values, "tolist") else list(values)
+    if tolerance > 0.0:
+        indices = ReduceKeys(times, values, tolerance)
+        times, values = [times[i] for i in indices], [values[i] for i in indices]
+
+    track = GetTrack(op, descId)
+    curve = track.GetCurve()
+    curve.FlushKeys()
+    if not times:
+        return track
+
+    # Sets up the first key, it is the template for all other keys
+    keyDict = curve.AddKey(c4d.BaseTime(times[0]))
+    if keyDict is None:
+        raise MemoryError("Failed to create a key")
+    template = keyDict["key"]
+    template.SetValue(curve, values[0])
+    curve.SetKeyDefault(doc, keyDict["nidx"])
+    template.SetInterpolation(curve, interpolation)
+    if tangentMode is not None:
+        template.SetAutomaticTangentMode(curve, tangentMode)
+
+    # Inserts a clone of the template per key, the times are ascending so keys are appended
+    for t, v in zip(times[1:], values[1:]):
+        key = template.GetClone()
+        if key is None:
+            raise MemoryError("Failed to create a key")
+        key.SetTime(curve, c4d.BaseTime(t))
+        key.SetValue(curve, v)
+        if not curve.InsertKey(key):
+            raise MemoryError("Failed to insert a key")
+
+    return track
+
+
+def BakeTracks(doc, op, tracks, interpolation=c4d.CINTERPOLATION_SPLINE, tangentMode=None, tolerance=0.0):
+    """Bakes the tracks of multiple parameters, see BakeTrack().
+
+    Args:
+        doc (c4d.documents.BaseDocument): The document used for the default settings of the keys.
+        op (c4d.BaseList2D): The animated node.
+        tracks (list[tuple[c4d.DescID, Sequence[float], Sequence[float]]]): The DescID, times and values per track.
+        interpolation (c4d.CINTERPOLATION_XXX): The interpolation of the keys.
+        tangentMode (Optional[c4d.CAUTOMODE_XXX]): The automatic tangent mode of the keys.
+        tolerance (float): The maximum deviation of removed keys.
+
+    Returns:
+        list[c4d.CTrack]: The tracks.
+    """
+    return [BakeTrack(doc, op, descId, times, values, interpolation, tangentMode, tolerance)
+            for descId, times, values in tracks]
+
+
+def RunBenchmark(count=10000):
+    """Compares the keys per second of CreateKey() and BakeTrack(), with and without reduction."""
+    fps = doc.GetFps()
+    times = [i / float(fps) for i in range(count)]
+    values = [math.sin(t) * 100.0 for t in times]
+    descId = c4d.DescID(c4d.DescLevel(c4d.ID_BASEOBJECT_REL_POSITION, c4d.DTYPE_VECTOR, 0),
+                        c4d.DescLevel(c4d.VECTOR_Y, c4d.DTYPE_REAL, 0))
+
+    obj = c4d.BaseObject(c4d.Onull)
+    curve = GetTrack(obj, descId).GetCurve()
+    t = time.perf_counter()
+    for kt, kv in zip(times, values):
+        CreateKey(curve, c4d.BaseTime(kt), kv, c4d.CINTERPOLATION_SPLINE)
+    print(f"CreateKey(): {count / (time.perf_counter() - t):.0f} keys/sec.")
+
+    for tolerance in (0.0, 0.01):
+        t = time.perf_counter()
+        curve = BakeTrack(doc, obj, descId, times, values, tolerance=tolerance).GetCurve()
+        print(f"BakeTrack(tolerance={tolerance}): {count / (time.perf_counter() - t):.0f} keys/sec, "
+              f"{curve.GetKeyCount()} keys.")
+
+
 def main():
+    if RUN_BENCHMARK:
+        return RunBenchmark()
+
     # Creates the object in memory
     obj = c4d.BaseObject(c4d.Ocube)
 
@@ -80,6 +275,16 @@ def main():
     # Inserts the track containing the Y curve to the object
     obj.InsertTrackSorted(trackY)
 
+    # Bakes a wave into the X position over 100 frames, removing the keys deviating less than 0.1 from the
+    # linear interpolation of the remaining keys
+    fps = doc.GetFps()
+    times = [frame / float(fps) for frame in range(100)]
+    values = [math.sin(frame * 0.1) * 50.0 for frame in range(100)]
+    trackX = BakeTrack(doc, obj, c4d.DescID(c4d.DescLevel(c4d.ID_BASEOBJECT_REL_POSITION, c4d.DTYPE_VECTOR, 0),
+                                            c4d.DescLevel(c4d.VECTOR_X, c4d.DTYPE_REAL, 0)),
+                       times, values, tolerance=0.1)
+    print("Baked {0} of {1} keys.".format(trackX.GetCurve().GetKeyCount(), len(times)))
+
     # Inserts the object in document
     doc.InsertObject(obj)
 
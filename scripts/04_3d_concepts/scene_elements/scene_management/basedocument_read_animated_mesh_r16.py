@@ -6,106 +6,296 @@ Description:
     - Animates a BaseDocument from frame 5 to 20.
     - Retrieves all the deformed mesh from the selected object.
     - Creates a Null for each frame at the position of point 88 of all deformed mesh.
+    - The caches are walked by a memoized cache_tree.CacheTreeWalker, so that objects whose cache did not change
+      between two frames are not walked again.
+    - AnimatedMeshSampler samples the world space positions of points of the deformed meshes over a frame range into
+      one preallocated (frames, points, 3) array, optionally memory-mapped as an .npy point cache on disk.
+
+Note:
+    - The cache_tree module is located in the 04_3d_concepts/modeling/geometry folder.
+    - AnimatedMeshSampler executes the passes on a document only containing the sampled objects and their dependencies,
+      built with IsolateObjects(), instead of the whole active document. Its time is never changed. Animations of
+      parents or expressions of other objects are not part of that document, they must be sampled as well.
+    - The points are read from the memory of the point tags of the caches, without creating a Vector per point.
+    - When NumPy is not installed, samples are a flat array('d') and no point cache can be written.
 
 Class/method highlighted:
     - BaseObject.GetDeformCache()
+    - BaseList2D.GetDirty()
     - c4d.BaseTime()
     - BaseDocument.SetTime()
     - BaseDocument.ExecutePasses()
+    - c4d.documents.IsolateObjects()
+    - C4DAtom.FindUniqueID()
+    - VariableTag.GetLowlevelDataAddressR()
 
 """
+import array
 import c4d
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The cache-tree walker is shared with other examples, it is located in 04_3d_concepts/modeling/geometry
+GEOMETRY_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "modeling", "geometry")
+if GEOMETRY_DIRECTORY not in sys.path:
+    sys.path.append(GEOMETRY_DIRECTORY)
 
+import cache_tree
 
-def DeformedPolygonCacheIterator(op):
-    """A Python Generator to iterate over all PolygonCache of passed BaseObject.
 
-    Args:
-        op: The BaseObject to retrieve all PolygonObject cache.
+class AnimatedMeshSampler(object):
+    """Samples the world space positions of points of the deformed meshes of objects over a frame range.
+
+    The objects are copied with IsolateObjects() into a minimal document once, and only this document is animated.
+    For each frame the selected points of all visible polygon objects in the caches of the objects, in the order of the
+    objects and their caches, are written into one row of a preallocated (frames, points, 3) float64 array.
     """
-    if not isinstance(op, c4d.BaseObject):
-        raise TypeError("Expected a BaseObject or derived class got {0}".format(op.__class__.__name__))
-
-    # Try to retrieve the deformed cache of the object
-    temp = op.GetDeformCache()
-    if temp is not None:
-        # If there is a deformed cache we iterate over him, a deformed cache can also contain deformed cache
-        # e.g. in case of a nested deformer
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-
-    # Try to retrieve the cache of the Object
-    temp = op.GetCache()
-    if temp is not None:
-        # If there is a cache iterates over its, a cache can also contain deformed cache
-        # e.g. an instance, have a cache of its linked object but if this object is deformed, then you have a deformed cache as well
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-
-    # If op is not a generator / modifier
-    if not op.GetBit(c4d.BIT_CONTROLOBJECT):
-        # If op is a PolygonObject we return it
-        if op.IsInstanceOf(c4d.Opolygon):
-            yield op
-
-    # Then finally iterates over the child of the current object to retrieve all objects
-    # e.g. in a cloner set to Instance mode, all clones is a new object.
-    temp = op.GetDown()
-    while temp:
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-        temp = temp.GetNext()
 
+    def __init__(self, doc, objects, indices=None):
+        """Initializes the sampler.
 
-def main():
-    # Saves current time
-    ctime = doc.GetTime()
+        Args:
+            doc (c4d.documents.BaseDocument): The document hosting the objects.
+            objects (list[c4d.BaseObject]): The objects to sample the deformed meshes of.
+            indices (Optional[Sequence[int]]): The indices of the points sampled in each mesh, all points when None.
+        """
+        if not objects:
+            raise ValueError("At least one object is required.")
 
-    # Retrieves BaseTime of frame 5, 20
-    start = 5
-    end = 20
+        self.doc = doc
+        self.objects = list(objects)
+        self.indices = numpy.asarray(indices, dtype=numpy.int64) if numpy is not None and indices is not None else indices
+        self._isolated = None
+        self._nodes = None
+        self._walker = cache_tree.CacheTreeWalker((cache_tree.IsType(c4d.Opolygon), cache_tree.IsNotControlObject),
+                                                  memoize=True)
 
-    # Marks the state of the document as the initial step of our undo process
-    doc.StartUndo()
+    @staticmethod
+    def GetObjectsById(doc):
+        """Returns all objects of a document by their MAXON_CREATOR_ID, which is kept when an object is copied.
+
+        Args:
+            doc (c4d.documents.BaseDocument): The document to get the objects from.
+
+        Returns:
+            dict[bytes, c4d.BaseObject]: The objects by their id.
+        """
+        objects = {}
+        stack = [doc.GetFirstObject()]
+        while stack:
+            obj = stack.pop()
+            while obj:
+                objects[bytes(obj.FindUniqueID(c4d.MAXON_CREATOR_ID))] = obj
+                if obj.GetDown():
+                    stack.append(obj.GetDown())
+                obj = obj.GetNext()
+        return objects
 
-    # Loops through the frames
-    for frame in range(start, end + 1):
-        # Changes the time of the document
-        doc.SetTime(c4d.BaseTime(frame, doc.GetFps()))
+    def Isolate(self):
+        """Builds the minimal document the passes are executed on.
+
+        Returns:
+            list[c4d.BaseObject]: The copies of the objects in the minimal document.
+        """
+        if self._isolated is None:
+            isolated = c4d.documents.IsolateObjects(self.doc, self.objects)
+            if isolated is None:
+                raise RuntimeError("Failed to isolate objects.")
+            isolated.SetFps(self.doc.GetFps())
+
+            copies = AnimatedMeshSampler.GetObjectsById(isolated)
+            try:
+                self._nodes = [copies[bytes(obj.FindUniqueID(c4d.MAXON_CREATOR_ID))] for obj in self.objects]
+            except KeyError:
+                c4d.documents.KillDocument(isolated)
+                raise RuntimeError("Failed to find the isolated copies of the objects.")
+            self._isolated = isolated
+
+        return self._nodes
+
+    def Free(self):
+        """Frees the minimal document, it is built again by the next call of Sample().
+        """
+        if self._isolated is not None:
+            c4d.documents.KillDocument(self._isolated)
+        self._isolated = self._nodes = None
+        self._walker.ClearMemo()
+
+    def ExecuteFrame(self, frame):
+        """Animates the minimal document to a frame.
+
+        Args:
+            frame (int): The frame to animate to.
+
+        Returns:
+            list[c4d.PolygonObject]: The visible polygon objects in the caches of the objects.
+        """
+        nodes = self.Isolate()
+        self._isolated.SetTime(c4d.BaseTime(frame, self._isolated.GetFps()))
 
-        # Executes the document, so animation, dynamics, expression are calculated and cached are build accordingly
         buildflag = c4d.BUILDFLAGS_NONE if c4d.GetC4DVersion() > 20000 else c4d.BUILDFLAGS_0
-        doc.ExecutePasses(None, True, True, True, buildflag)
+        if not self._isolated.ExecutePasses(None, True, True, True, buildflag):
+            raise RuntimeError("Could not execute the passes for the frame {0}.".format(frame))
+
+        return [item.node for node in nodes for item in self._walker.Walk(node)]
+
+    def GetSampleCount(self, meshes):
+        """Returns the number of points sampled for the meshes of one frame.
+
+        Args:
+            meshes (list[c4d.PolygonObject]): The meshes as returned by ExecuteFrame().
+
+        Returns:
+            int: The number of points.
+        """
+        if self.indices is None:
+            return sum(mesh.GetPointCount() for mesh in meshes)
+        return len(self.indices) * len(meshes)
 
-        # For each cache objects of our current selected object
-        for obj in DeformedPolygonCacheIterator(op):
+    @staticmethod
+    def GetPointBuffer(mesh):
+        """Returns the memory of the points of a mesh, three float64 per point.
 
-            # Calculates the position of the point 88 in world space
-            pos = obj.GetPoint(88) * obj.GetMg()
+        Args:
+            mesh (c4d.PolygonObject): The mesh to get the point memory for.
 
-            # Creates a null for each frame and each cache
-            null = c4d.BaseObject(c4d.Onull)
-            null.SetName(str(frame))
+        Returns:
+            Optional[memoryview]: The memory, None when the mesh has no point tag.
+        """
+        tag = mesh.GetTag(c4d.Tpoint)
+        return tag.GetLowlevelDataAddressR() if tag is not None else None
 
-            # Inserts the objects into the documents
-            doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, null)
-            doc.InsertObject(null)
+    def ReadFrame(self, meshes, out):
+        """Writes the world space positions of the sampled points of the meshes into one row of the samples.
+
+        Args:
+            meshes (list[c4d.PolygonObject]): The meshes as returned by ExecuteFrame().
+            out (numpy.ndarray): The row to write to, a (points, 3) float64 array.
+        """
+        start = 0
+        for mesh in meshes:
+            count = mesh.GetPointCount()
+            buffer = AnimatedMeshSampler.GetPointBuffer(mesh)
+            if buffer is not None:
+                points = numpy.frombuffer(buffer, dtype=numpy.float64, count=count * 3).reshape(count, 3)
+            else:
+                points = numpy.array([(p.x, p.y, p.z) for p in mesh.GetAllPoints()], dtype=numpy.float64)
+            if self.indices is not None:
+                points = points[self.indices]
+
+            # Transforms all points at once, p' = off + p.x * v1 + p.y * v2 + p.z * v3
+            mg = mesh.GetMg()
+            rotation = numpy.array([(v.x, v.y, v.z) for v in (mg.v1, mg.v2, mg.v3)], dtype=numpy.float64)
+            end = start + len(points)
+            numpy.matmul(points, rotation, out=out[start:end])
+            out[start:end] += (mg.off.x, mg.off.y, mg.off.z)
+            start = end
+
+    def ReadFramePython(self, meshes, out, offset):
+        """Writes the world space positions of the sampled points of the meshes into flat samples, without NumPy.
+
+        Args:
+            meshes (list[c4d.PolygonObject]): The meshes as returned by ExecuteFrame().
+            out (array.array): The flat samples.
+            offset (int): The index of the first component of the row to write to.
+        """
+        for mesh in meshes:
+            mg = mesh.GetMg()
+            points = mesh.GetAllPoints()
+            for index in (self.indices if self.indices is not None else range(len(points))):
+                p = mg * points[index]
+                out[offset:offset + 3] = array.array("d", (p.x, p.y, p.z))
+                offset += 3
+
+    def Sample(self, firstFrame, lastFrame, path=None):
+        """Samples the points from #firstFrame to #lastFrame.
+
+        Args:
+            firstFrame (int): The first frame to sample.
+            lastFrame (int): The last frame to sample, inclusive.
+            path (Optional[str]): The .npy file the samples are memory-mapped to, the samples are kept in memory when
+                None. Requires NumPy.
+
+        Returns:
+            Union[numpy.ndarray, array.array]: The samples, a (frames, points, 3) float64 array, or a flat array('d')
+            without NumPy.
+        """
+        if lastFrame < firstFrame:
+            raise ValueError("The last frame must not precede the first frame.")
+        if path is not None and numpy is None:
+            raise RuntimeError("Writing a point cache requires NumPy.")
+
+        frameCount = lastFrame - firstFrame + 1
+        samples = None
+        for row, frame in enumerate(range(firstFrame, lastFrame + 1)):
+            meshes = self.ExecuteFrame(frame)
+            count = self.GetSampleCount(meshes)
+
+            # The samples are allocated once the point count is known, i.e., after the first frame
+            if samples is None:
+                pointCount = count
+                if path is not None:
+                    samples = numpy.lib.format.open_memmap(path, mode="w+", dtype=numpy.float64,
+                                                           shape=(frameCount, pointCount, 3))
+                elif numpy is not None:
+                    samples = numpy.empty((frameCount, pointCount, 3), dtype=numpy.float64)
+                else:
+                    samples = array.array("d", bytes(frameCount * pointCount * 3 * 8))
+            elif count != pointCount:
+                raise RuntimeError("The point count changed from {0} to {1} at frame {2}.".format(pointCount, count,
+                                                                                                  frame))
+
+            if numpy is not None:
+                self.ReadFrame(meshes, samples[row])
+            else:
+                self.ReadFramePython(meshes, samples, row * pointCount * 3)
+
+        if path is not None:
+            samples.flush()
+        return samples
+
+
+def main():
+    # Retrieves BaseTime of frame 5, 20
+    start = 5
+    end = 20
+
+    # Samples the point 88 of all deformed meshes of the selected object, the active document is not animated
+    sampler = AnimatedMeshSampler(doc, [op], indices=[88])
+    samples = sampler.Sample(start, end)
+    sampler.Free()
+
+    if numpy is not None:
+        samples = samples.reshape(-1, 3)
+    else:
+        samples = [samples[i:i + 3] for i in range(0, len(samples), 3)]
+    perFrame = len(samples) // (end - start + 1)
+
+    # Marks the state of the document as the initial step of our undo process
+    doc.StartUndo()
 
-            # Defines the position of the null with the position of the point from the deformed mesh
-            null.SetAbsPos(pos)
+    # Creates a null for each frame and each cache
+    for i, pos in enumerate(samples):
+        null = c4d.BaseObject(c4d.Onull)
+        null.SetName(str(start + i // perFrame))
 
-    # Sets the time back to the original time.
-    doc.SetTime(ctime)
+        # Inserts the objects into the documents
+        doc.AddUndo(c4d.UNDOTYPE_NEWOBJ, null)
+        doc.InsertObject(null)
 
-    # Executes the document, so animation, dynamics, expression are calculated and cached are build accordingly
-    buildflag = c4d.BUILDFLAGS_NONE if c4d.GetC4DVersion() > 20000 else c4d.BUILDFLAGS_0
-    doc.ExecutePasses(None, True, True, True, buildflag)
+        # Defines the position of the null with the position of the point from the deformed mesh
+        null.SetAbsPos(c4d.Vector(float(pos[0]), float(pos[1]), float(pos[2])))
 
     # Marks the state of the document as the final step of our undo process
     doc.EndUndo()
 
     # Pushes an update event to Cinema 4D
-    c4d.EventAdd(c4d.EVENT_ANIMATE)
+    c4d.EventAdd()
 
 
 if __name__ == "__main__":
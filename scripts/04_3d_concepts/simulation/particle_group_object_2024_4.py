@@ -10,6 +10,12 @@ To run this script, create a new particle emitter object in the scene, select th
 particle group object, press play to simulate the particles, and then run the script. The script 
 will print selected particle data and create null objects representing these particles in the scene.
 
+Particle data is accessed over views on the channel buffers, see ParticleChannel, which are
+NumPy arrays when NumPy is installed and memoryview instances otherwise. Set RUN_BENCHMARK to
+compare unpacking five million positions with struct against such view. ParticleSnapshot and
+ParticleSnapshotCache capture all channels of a particle group per frame into memory-mappable .npy
+files and compare frames by joining the sorted particle ids, see RecordSnapshots().
+
 See Also:
     - Python Software Foundation (2024). struct module: Formatting Characters. 
       url: https://docs.python.org/3/library/struct.html#format-characters
@@ -20,23 +26,159 @@ __date__ = "08/04/2024"
 __license__ = "Apache-2.0 License"
 __version__ = "2024.4"
 
+import array
 import c4d
 import maxon
+import os
 import pprint
+import re
 import struct
+import time
+import typing
 import mxutils
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK: bool = False
+
 doc: c4d.documents.BaseDocument  # The currently active document.
 op: c4d.BaseObject | None  # The primary selected object in `doc`. Can be `None`.
 
 
-def GetParticleInfo(op: c4d.ParticleGroupObject, channel: str) -> dict:
+# The names of the particle attribute channels used by this example.
+CHANNEL_UNIQUEID: str = "net.maxon.particles.attribute.uniqueid"
+CHANNEL_POSITIONS: str = "net.maxon.particles.attribute.positions"
+CHANNEL_VELOCITY: str = "net.maxon.particles.attribute.velocity"
+CHANNEL_COLOR: str = "net.maxon.particles.attribute.color"
+CHANNEL_AGE: str = "net.maxon.particles.attribute.age"
+CHANNEL_ALIGNMENTS: str = "net.maxon.particles.attribute.alignments"
+
+# The number of components of the elements in a channel, for channels whose data type does not
+# spell out the number of components. Channels not listed here are scalar.
+CHANNEL_COMPONENTS: dict[str, int] = {
+    CHANNEL_POSITIONS: 3,
+    CHANNEL_VELOCITY: 3,
+    CHANNEL_COLOR: 4,
+    CHANNEL_ALIGNMENTS: 4,
+    "net.maxon.particles.attribute.angularvelocity": 3,
+}
+
+# The methods of ParticleGroupObject returning the writable buffer of a channel.
+CHANNEL_WRITE_BUFFERS: dict[str, str] = {
+    CHANNEL_POSITIONS: "GetParticlePositionsW",
+    CHANNEL_VELOCITY: "GetParticleVelocitiesW",
+    CHANNEL_COLOR: "GetParticleColorsW",
+    CHANNEL_AGE: "GetParticleAgesW",
+    CHANNEL_ALIGNMENTS: "GetParticleAlignmentsW",
+    "net.maxon.particles.attribute.lifetime": "GetParticleLifetimesW",
+    "net.maxon.particles.attribute.radius": "GetParticleRadiiW",
+    "net.maxon.particles.attribute.distancetraversed": "GetParticleDistancesTraveledW",
+    "net.maxon.particles.attribute.angularvelocity": "GetParticleAngularVelocitiesW",
+}
+
+# The channel descriptions of each particle group, see GetChannelDescriptions().
+g_channelDescriptions: dict[int, dict[str, "ParticleChannel"]] = {}
+
+
+class ParticleChannel:
+    """Describes the memory layout of a particle attribute channel and provides views on its data.
+
+    A view is a strided array which points directly into the buffer returned by
+    GetAttributeChannelData() or one of the GetParticle...W() methods, i.e., nothing is copied or
+    unpacked when creating it. When NumPy is installed, views are numpy.ndarray instances of the
+    shape (count, components). Otherwise they are flat memoryview instances over all components of
+    the buffer, padding included, where the j-th component of the i-th particle is found at the
+    index i * step + j.
+    """
+
+    def __init__(self, description: dict) -> None:
+        """Derives the memory layout of a channel from its description.
+
+        Args:
+            description: A channel description as returned by GetAttributeChannelDescriptions().
+        """
+        self.name: str = description["Name"]
+        self.size: int = description["Data Size in bytes"]
+        self.stride: int = description["Data Stride in bytes"]
+        self.dataType: str = description["Data Type"]
+
+        # Get the number of components, either from a data type as "vec<3,float32>" or from the
+        # known channels.
+        match: re.Match | None = re.search(r"<\s*(\d+)", self.dataType)
+        self.components: int = int(match.group(1)) if match else CHANNEL_COMPONENTS.get(self.name, 1)
+
+        # Get the format of a component, the size of a component tells float32 from float64.
+        width: int = self.size // self.components
+        dataType: str = self.dataType.lower()
+        if "int" in dataType:
+            self.format: str = "IQ"[width == 8] if "unsigned" in dataType else "iq"[width == 8]
+        else:
+            self.format: str = "fd"[width == 8]
+
+        self.width: int = struct.calcsize(self.format)
+        if self.width * self.components != self.size or self.stride % self.width:
+            raise ValueError(f"Unsupported memory layout for the channel '{self.name}': {description}")
+
+        # The distance between two particles in components.
+        self.step: int = self.stride // self.width
+
+    def GetCount(self, buffer: memoryview) -> int:
+        """Returns the number of particles in #buffer.
+
+        The last element of a buffer is not necessarily padded to the stride.
+        """
+        length: int = buffer.nbytes
+        return 0 if length < self.size else (length - self.size) // self.stride + 1
+
+    def GetView(self, buffer: memoryview) -> "numpy.ndarray | memoryview":
+        """Returns a zero-copy view on the particle data in #buffer.
+
+        The view is writable when #buffer is writable.
+        """
+        count: int = self.GetCount(buffer)
+        if numpy is not None:
+            return numpy.ndarray(shape=(count, self.components), dtype=numpy.dtype(self.format),
+                                 buffer=buffer, strides=(self.stride, self.width))
+
+        flat: memoryview = buffer.cast("B")
+        return flat[:(flat.nbytes // self.width) * self.width].cast(self.format)
+
+    def GetComponent(self, view: "numpy.ndarray | memoryview", index: int) -> "numpy.ndarray | memoryview":
+        """Returns a zero-copy view on the #index-th component of all particles in #view.
+        """
+        if numpy is not None:
+            return view[:, index]
+
+        return view[index::self.step]
+
+
+def GetChannelDescriptions(op: c4d.ParticleGroupObject, refresh: bool = False) -> dict[str, ParticleChannel]:
+    """Returns the channel descriptions of the particle group #op, cached over the GUID of #op.
+
+    Args:
+        op: The particle group to get the channel descriptions for.
+        refresh: If True, the descriptions are retrieved again, e.g., when a channel has been added.
+    """
+    key: int = op.GetGUID()
+    channels: dict[str, ParticleChannel] | None = g_channelDescriptions.get(key)
+    if channels is None or refresh:
+        channels = {d["Name"]: ParticleChannel(d) for d in op.GetAttributeChannelDescriptions()}
+        g_channelDescriptions[key] = channels
+
+    return channels
+
+
+def GetParticleInfo(op: c4d.ParticleGroupObject, channel: str) -> ParticleChannel:
     """Demonstrates how to access storage conventions for the channel of a particle group.
 
     Doing this is necessary to correctly unpack the data from a particle group channel buffer. Find
-    below a list of the currently existing channels (as of 2024.4) and their associated element 
-    size, stride, and data type. Note that this list might be subject to change in future versions 
-    of Cinema 4D and this list might then be incomplete or outdated. Always check the data with 
+    below a list of the currently existing channels (as of 2024.4) and their associated element
+    size, stride, and data type. Note that this list might be subject to change in future versions
+    of Cinema 4D and this list might then be incomplete or outdated. Always check the data with
     ParticleGroupObject.GetAttributeChannelDescriptions() yourself when in doubt.
 
       Name                                            Size       Stride    Type
@@ -53,12 +195,14 @@ def GetParticleInfo(op: c4d.ParticleGroupObject, channel: str) -> dict:
     - net.maxon.particles.attribute.uniqueid          ( 4 bytes,  4 bytes, uint32)
     - net.maxon.particles.attribute.alignments        (16 bytes, 16 bytes, Quaternion32)
     - net.maxon.particles.attribute.angularvelocity   (12 bytes, 16 bytes, vec<3,float32>)
+
+    The descriptions are retrieved once per particle group and then served from a cache, see
+    GetChannelDescriptions(). They are only retrieved again when a channel is not found.
     """
     # Get the particle data descriptions, they hold information about how each channel for this
     # particle group is stored in memory.
-    descriptions: list[dict] = op.GetAttributeChannelDescriptions()
-
-    # pprint.pprint(descriptions)
+    #
+    # pprint.pprint(op.GetAttributeChannelDescriptions())
     #
     # [{"Data Size in bytes": 4,                           # The size of each element in bytes.
     #   "Data Stride in bytes": 4,                         # The width an element is given in
@@ -69,14 +213,63 @@ def GetParticleInfo(op: c4d.ParticleGroupObject, channel: str) -> dict:
     #
     #  {"Data Size in bytes": 24,
     #   ...
-
-    descriptions: dict[str, dict] = {d["Name"]: d for d in descriptions}
-    if channel not in descriptions.keys():
+    descriptions: dict[str, ParticleChannel] = GetChannelDescriptions(op)
+    if channel not in descriptions:
+        descriptions = GetChannelDescriptions(op, refresh=True)
+    if channel not in descriptions:
         raise ValueError(
             f"The channel '{channel}' does not exist for the particle group {op}.")
     return descriptions[channel]
 
 
+def GetChannelView(op: c4d.ParticleGroupObject, channel: str) -> "numpy.ndarray | memoryview | None":
+    """Returns a read-only, zero-copy view on the data of #channel in #op.
+
+    Returns:
+        The view, see ParticleChannel, or None when the channel holds no data.
+    """
+    buffer: memoryview | None = op.GetAttributeChannelData(channel)
+    if buffer is None:
+        return None
+
+    return GetParticleInfo(op, channel).GetView(buffer)
+
+
+def WriteChannel(op: c4d.ParticleGroupObject, channel: str,
+                 values: "numpy.ndarray | typing.Sequence[typing.Sequence[float]]") -> None:
+    """Writes #values in bulk into the writable buffer of #channel in #op.
+
+    As explained in GetParticleAges(), all write operations are volatile, i.e., are lost the next
+    time the simulation is being updated.
+
+    Args:
+        op: The particle group to write to.
+        channel: The channel to write, it must be listed in CHANNEL_WRITE_BUFFERS.
+        values: The new values, one row of components per particle.
+    """
+    if channel not in CHANNEL_WRITE_BUFFERS:
+        raise ValueError(f"The channel '{channel}' cannot be written.")
+
+    buffer: memoryview | None = getattr(op, CHANNEL_WRITE_BUFFERS[channel])()
+    if buffer is None or buffer.readonly:
+        raise RuntimeError(f"Could not get a writable buffer for the channel '{channel}'.")
+
+    info: ParticleChannel = GetParticleInfo(op, channel)
+    view: "numpy.ndarray | memoryview" = info.GetView(buffer)
+    count: int = info.GetCount(buffer)
+    if len(values) != count:
+        raise ValueError(f"Expected {count} values for the channel '{channel}', got {len(values)}.")
+
+    # Write all values at once, with NumPy as one strided copy, otherwise one component at a time.
+    if numpy is not None:
+        view[:] = numpy.asarray(values, dtype=view.dtype).reshape(count, info.components)
+        return
+
+    for i in range(info.components):
+        info.GetComponent(view, i)[:count] = array.array(
+            info.format, (item[i] if info.components > 1 else item for item in values))
+
+
 def GetParticleAges(op: c4d.ParticleGroupObject) -> list[float]:
     """Unpacks the particle ages.
 
@@ -92,94 +285,77 @@ def GetParticleAges(op: c4d.ParticleGroupObject) -> list[float]:
     # we often must validate the structure of that data, and therefore have to know the chanel name,
     # we can just use the generic `GetParticleInfo` function to get the information we need. But
     # this buffer is always readonly.
-    ageBuffer: memoryview = op.GetAttributeChannelData("net.maxon.particles.attribute.age")
+    ageBuffer: memoryview = op.GetAttributeChannelData(CHANNEL_AGE)
     if ageBuffer is None:
         return []
 
     # Get the channel information for the age channel.
-    info: dict = GetParticleInfo(op, "net.maxon.particles.attribute.age")
+    info: ParticleChannel = GetParticleInfo(op, CHANNEL_AGE)
 
     # Unpack the age data from the buffer into a list of floats. The stride is the distance between
     # each element in the buffer, and the size is the size of each element in the buffer. They do
     # not have to be same, as the buffer might have padding between elements. We do not need the
     # size value as it is explicitly expressed by the character "f" in the unpack_from function.
-    size: int = info["Data Size in bytes"]
-    stride: int = info["Data Stride in bytes"]
-    return [struct.unpack_from("f", ageBuffer, i)[0] for i in range(0, len(ageBuffer), stride)]
+    #
+    # Unpacking particle by particle is fine for a handful of particles, but slow for millions of
+    # them. The other functions in this file therefore use views on the buffer instead, see
+    # ParticleChannel.
+    stride: int = info.stride
+    return [struct.unpack_from("f", ageBuffer, i)[0]
+            for i in range(0, info.GetCount(ageBuffer) * stride, stride)]
 
 
 def GetParticleVelocities(op: c4d.ParticleGroupObject) -> list[c4d.Vector]:
     """Unpacks the particle velocities.
 
-    The velocities are stored as triples of floats, Vec3<float32>, we unpack them here in groups of
-    three floats ("fff") into a singular vector.
+    The velocities are stored as triples of floats, Vec3<float32>, padded to 16 bytes. The view on
+    the channel skips the padding, so that each row of it is a velocity.
     """
-    velBuffer: memoryview = op.GetAttributeChannelData("net.maxon.particles.attribute.velocity")
-    if velBuffer is None:
+    view: "numpy.ndarray | memoryview | None" = GetChannelView(op, CHANNEL_VELOCITY)
+    if view is None:
         return []
 
-    info: dict = GetParticleInfo(op, "net.maxon.particles.attribute.velocity")
-    stride: int = info["Data Stride in bytes"]
-
-    # Unpack the velocity data from the buffer into a list of c4d.Vector instances. Because the
-    # velocities are stored as triples of floats, Vec3<float32>, we unpack them here in groups of
-    # three floats ("fff") into a singular vector.
-    return [c4d.Vector(*struct.unpack_from("fff", velBuffer, i))
-            for i in range(0, len(velBuffer), stride)]
+    return [c4d.Vector(*row) for row in ToRows(view, GetParticleInfo(op, CHANNEL_VELOCITY))]
 
 
 def GetParticlePositions(op: c4d.ParticleGroupObject) -> list[c4d.Vector]:
-    """Unpacks the particle positions. 
+    """Unpacks the particle positions.
 
-    The special case here is that the positions can be stored as either 32bit or 64bit vectors, so 
-    we have to select our unpacking character accordingly.
+    The special case here is that the positions can be stored as either 32bit or 64bit vectors, the
+    view on the channel picks its data type from the channel description accordingly.
     """
-    posBuffer: memoryview = op.GetAttributeChannelData("net.maxon.particles.attribute.positions")
-    if posBuffer is None:
+    view: "numpy.ndarray | memoryview | None" = GetChannelView(op, CHANNEL_POSITIONS)
+    if view is None:
         return []
 
-    info: dict = GetParticleInfo(op, "net.maxon.particles.attribute.positions")
-    stride: int = info["Data Stride in bytes"]
-    size: int = info["Data Size in bytes"]
-    format: str = "fff" if size == 12 else "ddd"
-
-    return [c4d.Vector(*struct.unpack_from(format, posBuffer, i))
-            for i in range(0, len(posBuffer), stride)]
+    return [c4d.Vector(*row) for row in ToRows(view, GetParticleInfo(op, CHANNEL_POSITIONS))]
 
 
-def GetParticleColors(op: c4d.ParticleGroupObject) -> list[c4d.Vector4d]:
-    """Unpacks the particle colors. 
+def GetParticleColors(op: c4d.ParticleGroupObject) -> list[maxon.ColorA]:
+    """Unpacks the particle colors.
 
     More of the same, but here we have a four component vector.
     """
-    colBuffer: memoryview = op.GetAttributeChannelData("net.maxon.particles.attribute.color")
-    if colBuffer is None:
+    view: "numpy.ndarray | memoryview | None" = GetChannelView(op, CHANNEL_COLOR)
+    if view is None:
         return []
 
-    info: dict = GetParticleInfo(op, "net.maxon.particles.attribute.color")
-    stride: int = info["Data Stride in bytes"]
+    return [maxon.ColorA(*row) for row in ToRows(view, GetParticleInfo(op, CHANNEL_COLOR))]
 
-    return [maxon.ColorA(*struct.unpack_from("ffff", colBuffer, i))
-            for i in range(0, len(colBuffer), stride)]
 
-
-def GetParticleAlignments(op: c4d.ParticleGroupObject) -> list[tuple]:
+def GetParticleAlignments(op: c4d.ParticleGroupObject) -> list[c4d.Quaternion]:
     """Unpacks the particle alignments.
 
     The alignments are expressed as maxon.Quaternion32. Note that this type is NOT identical to
     c4d.Quaternion.
     """
-    alignBuffer: memoryview = op.GetAttributeChannelData("net.maxon.particles.attribute.alignments")
-    if alignBuffer is None:
+    view: "numpy.ndarray | memoryview | None" = GetChannelView(op, CHANNEL_ALIGNMENTS)
+    if view is None:
         return []
 
-    info: dict = GetParticleInfo(op, "net.maxon.particles.attribute.alignments")
-    stride: int = info["Data Stride in bytes"]
-
-    # Unpack the quaternion data from the buffer into a list of quadruples.
-    quaternions: list[tuple] = []
-    for i in range(0, len(alignBuffer), stride):
-        x, y, z, w = struct.unpack_from("ffff", alignBuffer, i)
+    # Convert the quadruples of the view into c4d.Quaternion instances.
+    quaternions: list[c4d.Quaternion] = []
+    for x, y, z, w in ToRows(view, GetParticleInfo(op, CHANNEL_ALIGNMENTS)):
         quat: c4d.Quaternion = c4d.Quaternion()
         quat.v = c4d.Vector(x, y, z)
         quat.w = w
@@ -188,12 +364,298 @@ def GetParticleAlignments(op: c4d.ParticleGroupObject) -> list[tuple]:
     return quaternions
 
 
+def ToRows(view: "numpy.ndarray | memoryview", info: ParticleChannel) -> list[list]:
+    """Converts a channel view into a list of rows of Python numbers, one row per particle.
+    """
+    if numpy is not None:
+        return view.tolist()
+
+    return [list(row) for row in zip(*(info.GetComponent(view, i) for i in range(info.components)))]
+
+
+class ParticleDiff(typing.NamedTuple):
+    """The difference between two particle snapshots, see ParticleSnapshot.Diff().
+
+    Attributes:
+        born: The sorted ids of the particles which only exist in the newer snapshot.
+        died: The sorted ids of the particles which only exist in the older snapshot.
+        moved: The sorted ids of the particles which moved further than the threshold.
+        distances: The distances the particles in #moved have moved.
+    """
+    born: "numpy.ndarray"
+    died: "numpy.ndarray"
+    moved: "numpy.ndarray"
+    distances: "numpy.ndarray"
+
+
+class ParticleSnapshot:
+    """Stores all channels of a particle group at one frame as columns indexed by the particle ids.
+
+    Each channel is one contiguous array with one row per particle, and the rows of all channels
+    are sorted by the unique id of their particle. Comparing two snapshots is therefore a join over
+    two sorted id arrays instead of dictionary lookups per particle. Snapshots are saved as one .npy
+    file per channel, so that they can be loaded as memory-mapped arrays. Requires NumPy.
+    """
+
+    def __init__(self, frame: int, channels: dict[str, "numpy.ndarray"]) -> None:
+        """Initializes a snapshot from its channels.
+
+        Args:
+            frame: The frame the snapshot has been taken at.
+            channels: The channels, they must contain the unique id channel and be sorted by it.
+        """
+        if CHANNEL_UNIQUEID not in channels:
+            raise ValueError("A snapshot requires the unique id channel.")
+
+        self.frame: int = frame
+        self.channels: dict[str, "numpy.ndarray"] = channels
+
+    @property
+    def ids(self) -> "numpy.ndarray":
+        """Returns the sorted unique ids of the particles.
+        """
+        return self.channels[CHANNEL_UNIQUEID][:, 0]
+
+    @classmethod
+    def Capture(cls, op: c4d.ParticleGroupObject, frame: int) -> "ParticleSnapshot":
+        """Captures all channels of #op.
+
+        The data is copied, as the channel buffers are only valid until the simulation is being
+        updated.
+
+        Args:
+            op: The particle group to capture.
+            frame: The frame the particle group has been simulated for.
+        """
+        if numpy is None:
+            raise RuntimeError("Particle snapshots require NumPy.")
+
+        views: dict[str, numpy.ndarray] = {}
+        for name in GetChannelDescriptions(op, refresh=True):
+            view: numpy.ndarray | None = GetChannelView(op, name)
+            if view is not None:
+                views[name] = view
+
+        if CHANNEL_UNIQUEID not in views:
+            raise RuntimeError(f"The particle group {op} has no unique id channel.")
+
+        # Sort all channels by the particle ids, indexing with #order copies each channel into a
+        # contiguous array.
+        order: numpy.ndarray = numpy.argsort(views[CHANNEL_UNIQUEID][:, 0], kind="stable")
+        return cls(frame, {name: view[order] for name, view in views.items()})
+
+    @staticmethod
+    def GetFileName(frame: int, channel: str) -> str:
+        """Returns the file name for the data of #channel at #frame.
+        """
+        return f"{frame:06d}_{channel.rsplit('.', 1)[-1]}.npy"
+
+    def Save(self, directory: str) -> None:
+        """Saves the snapshot as one .npy file per channel into #directory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, data in self.channels.items():
+            numpy.save(os.path.join(directory, ParticleSnapshot.GetFileName(self.frame, name)), data)
+
+    @classmethod
+    def Load(cls, directory: str, frame: int, channels: typing.Iterable[str],
+             mmap: bool = True) -> "ParticleSnapshot":
+        """Loads a snapshot saved with Save().
+
+        Args:
+            directory: The directory the snapshot has been saved to.
+            frame: The frame of the snapshot.
+            channels: The names of the channels to load.
+            mmap: If True, the channels are memory-mapped instead of being read.
+        """
+        if numpy is None:
+            raise RuntimeError("Particle snapshots require NumPy.")
+
+        return cls(frame, {name: numpy.load(os.path.join(directory, cls.GetFileName(frame, name)),
+                                            mmap_mode="r" if mmap else None)
+                           for name in channels})
+
+    def Diff(self, other: "ParticleSnapshot", threshold: float = 0.) -> ParticleDiff:
+        """Returns the particles born, died and moved between #other and this snapshot.
+
+        Args:
+            other: The older snapshot to compare against.
+            threshold: The distance a particle must exceed to be considered as moved.
+        """
+        ids, otherIds = self.ids, other.ids
+
+        # Join the sorted ids by binary search, #indices and #otherIndices are the rows of the
+        # common particles. Both id arrays are already sorted, so nothing must be sorted here.
+        otherIndices: numpy.ndarray = numpy.minimum(numpy.searchsorted(otherIds, ids), len(otherIds) - 1)
+        found: numpy.ndarray = (otherIds[otherIndices] == ids) if len(otherIds) else numpy.zeros(len(ids), bool)
+        indices: numpy.ndarray = numpy.flatnonzero(found)
+        otherIndices = otherIndices[found]
+        common: numpy.ndarray = ids[found]
+        born: numpy.ndarray = ids[~found]
+
+        otherFound: numpy.ndarray = numpy.zeros(len(otherIds), dtype=bool)
+        otherFound[otherIndices] = True
+        died: numpy.ndarray = otherIds[~otherFound]
+
+        if CHANNEL_POSITIONS in self.channels and CHANNEL_POSITIONS in other.channels:
+            delta: numpy.ndarray = (self.channels[CHANNEL_POSITIONS][indices].astype(numpy.float64) -
+                                    other.channels[CHANNEL_POSITIONS][otherIndices])
+            distances: numpy.ndarray = numpy.sqrt(numpy.einsum("ij,ij->i", delta, delta))
+            mask: numpy.ndarray = distances > threshold
+            moved, distances = common[mask], distances[mask]
+        else:
+            moved, distances = common[:0], numpy.zeros(0)
+
+        return ParticleDiff(born, died, moved, distances)
+
+
+class ParticleSnapshotCache:
+    """Stores particle snapshots of many frames in a directory.
+
+    The directory holds the .npy files of all snapshots and an index.npz file listing the frames
+    and channels. Snapshots are memory-mapped when they are first accessed and then kept, so that
+    scrubbing through a cache does not read the files again.
+
+    The index is only written by Flush() and Close(), not for each added snapshot. A cache can be
+    used as a context manager, which closes it on exit.
+    """
+
+    INDEX_FILE: str = "index.npz"
+
+    def __init__(self, directory: str) -> None:
+        """Opens the cache in #directory, the directory is created when it does not exist yet.
+        """
+        if numpy is None:
+            raise RuntimeError("Particle snapshots require NumPy.")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory: str = directory
+        self.frames: list[int] = []
+        self.channels: list[str] = []
+        self._snapshots: dict[int, ParticleSnapshot] = {}
+        self._dirty: bool = False
+
+        path: str = os.path.join(directory, ParticleSnapshotCache.INDEX_FILE)
+        if os.path.exists(path):
+            with numpy.load(path) as index:
+                self.frames = index["frames"].tolist()
+                self.channels = index["channels"].tolist()
+
+    def __enter__(self) -> "ParticleSnapshotCache":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.Close()
+
+    def Add(self, snapshot: ParticleSnapshot) -> None:
+        """Saves #snapshot into the cache, the index is written by the next Flush() or Close().
+        """
+        snapshot.Save(self.directory)
+        if snapshot.frame not in self.frames:
+            self.frames = sorted(self.frames + [snapshot.frame])
+        self.channels = sorted(set(self.channels) | set(snapshot.channels))
+        self._snapshots.pop(snapshot.frame, None)
+        self._dirty = True
+
+    def Flush(self) -> None:
+        """Writes the index when snapshots have been added since it has last been written.
+        """
+        if not self._dirty:
+            return
+
+        numpy.savez(os.path.join(self.directory, ParticleSnapshotCache.INDEX_FILE),
+                    frames=numpy.asarray(self.frames, dtype=numpy.int64),
+                    channels=numpy.asarray(self.channels))
+        self._dirty = False
+
+    def Close(self) -> None:
+        """Writes the index and releases the memory-mapped snapshots.
+        """
+        self.Flush()
+        self._snapshots.clear()
+
+    def Get(self, frame: int) -> ParticleSnapshot:
+        """Returns the memory-mapped snapshot for #frame.
+        """
+        snapshot: ParticleSnapshot | None = self._snapshots.get(frame)
+        if snapshot is None:
+            if frame not in self.frames:
+                raise KeyError(f"The frame {frame} is not cached.")
+
+            channels: list[str] = [name for name in self.channels if os.path.exists(
+                os.path.join(self.directory, ParticleSnapshot.GetFileName(frame, name)))]
+            snapshot = ParticleSnapshot.Load(self.directory, frame, channels)
+            self._snapshots[frame] = snapshot
+
+        return snapshot
+
+    def Diff(self, frame: int, otherFrame: int, threshold: float = 0.) -> ParticleDiff:
+        """Returns the particles born, died and moved between #otherFrame and #frame.
+        """
+        return self.Get(frame).Diff(self.Get(otherFrame), threshold)
+
+
+def RecordSnapshots(doc: c4d.documents.BaseDocument, op: c4d.ParticleGroupObject,
+                    cache: ParticleSnapshotCache, firstFrame: int, lastFrame: int) -> None:
+    """Simulates #doc from #firstFrame to #lastFrame and adds a snapshot of #op for each frame.
+
+    The time of #doc is restored and the index of #cache is written once all frames have been
+    recorded, also when recording fails.
+    """
+    fps: int = doc.GetFps()
+    documentTime: c4d.BaseTime = doc.GetTime()
+    try:
+        for frame in range(firstFrame, lastFrame + 1):
+            doc.SetTime(c4d.BaseTime(frame, fps))
+            if not doc.ExecutePasses(None, True, True, True, c4d.BUILDFLAGS_NONE):
+                raise RuntimeError(f"Could not execute the passes for the frame {frame}.")
+
+            cache.Add(ParticleSnapshot.Capture(op, frame))
+    finally:
+        cache.Flush()
+        doc.SetTime(documentTime)
+        doc.ExecutePasses(None, True, True, True, c4d.BUILDFLAGS_NONE)
+
+
+def RunBenchmark(count: int = 5_000_000) -> None:
+    """Compares unpacking particle positions with struct against a view on the buffer.
+
+    The buffer is a synthetic vec<3,float64> position channel of #count particles, so that the
+    benchmark can be run without a particle simulation.
+    """
+    info: ParticleChannel = ParticleChannel({"Name": CHANNEL_POSITIONS, "Data Size in bytes": 24,
+                                             "Data Stride in bytes": 24, "Data Type": "vec<3,float64>"})
+    buffer: memoryview = memoryview(bytes(count * info.stride))
+
+    t: float = time.perf_counter()
+    positions: list[tuple] = [struct.unpack_from("ddd", buffer, i)
+                              for i in range(0, len(buffer), info.stride)]
+    print(f"struct.unpack_from: {len(positions):,} positions in {time.perf_counter() - t:.3f} sec.")
+
+    t = time.perf_counter()
+    view: "numpy.ndarray | memoryview" = info.GetView(buffer)
+    heights: float = sum(info.GetComponent(view, 1)) if numpy is None else view[:, 1].sum()
+    print(f"View ({'NumPy' if numpy is not None else 'memoryview'}): {info.GetCount(buffer):,} "
+          f"positions with a summed height of {heights} in {time.perf_counter() - t:.3f} sec.")
+
+
 def main() -> None:
     """Called by Cinema 4D when the script is being executed.
     """
+    if RUN_BENCHMARK:
+        return RunBenchmark()
+
     if not isinstance(op, c4d.ParticleGroupObject):
         raise ValueError("The selected object is not a ParticleGroupObject.")
 
+    # Views on the channels are the fast way to access the data of many particles, nothing is being
+    # copied when creating them.
+    view: "numpy.ndarray | memoryview | None" = GetChannelView(op, CHANNEL_POSITIONS)
+    if view is not None:
+        info: ParticleChannel = GetParticleInfo(op, CHANNEL_POSITIONS)
+        print(f"\nView on the positions of {info.GetCount(op.GetAttributeChannelData(CHANNEL_POSITIONS))} "
+              f"particles with the format '{info.format}' and {info.components} components.")
+
     # Get and print the particle data for the first five particles.
     ages: list[float] = GetParticleAges(op)
     print("\nParticle ages:")
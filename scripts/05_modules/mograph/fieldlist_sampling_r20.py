@@ -4,15 +4,68 @@ Author: Maxime Adam
 
 Description:
     - Samples arbitrary points from multiple fields with c4d.FieldList and stores the result into a vertex color tag.
+    - The sampled values are written in one call into the memory of the vertex color tag, in Point or Polygon mode,
+      instead of calling SetColor() for each point.
+
+Note:
+    - The colors are written by the vertex_color_buffers module located in the
+      04_3d_concepts/modeling/vertex_color_tag folder of the examples.
 
 Class/method highlighted:
     - c4d.FieldList
     - c4d.modules.mograph.FieldLayer
     - c4d.modules.mograph.FieldInput
     - c4d.modules.mograph.FieldOutput
+    - c4d.VariableTag.GetLowlevelDataAddressW()
 
 """
+import array
 import c4d
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The color buffer helpers are shared with other examples, they are located in the vertex color tag examples.
+VERTEX_COLOR_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                      "04_3d_concepts", "modeling", "vertex_color_tag")
+if VERTEX_COLOR_DIRECTORY not in sys.path:
+    sys.path.append(VERTEX_COLOR_DIRECTORY)
+
+import vertex_color_buffers
+
+
+def SampleFieldListToVertexColors(op, fields, tag):
+    """Samples a FieldList at the points of a polygon object and writes the values as grey colors into a vertex color tag.
+
+    Args:
+        op (c4d.PolygonObject): The polygon object to sample the points of.
+        fields (c4d.FieldList): The fields to sample.
+        tag (c4d.VertexColorTag): The tag to write the colors into, in Point or Polygon mode.
+    """
+    # Samples all the points of the polygon object
+    pointCount = op.GetPointCount()
+    inputField = c4d.modules.mograph.FieldInput(op.GetAllPoints(), pointCount)
+    output = fields.SampleListSimple(op, inputField, c4d.FIELDSAMPLE_FLAG_VALUE)
+    if output is None:
+        raise RuntimeError("Failed to sample the FieldList.")
+
+    # Builds the grey colors of all points, then gathers them for each vertex of each polygon in Polygon mode
+    if numpy is not None:
+        colors = numpy.ones((pointCount, 4), dtype=numpy.float32)
+        colors[:, :3] = numpy.fromiter(output._value, dtype=numpy.float32, count=pointCount)[:, None]
+    else:
+        colors = array.array("f", [c for value in list(output._value)[:pointCount] for c in (value, value, value, 1.)])
+
+    if not tag.IsPerPointColor():
+        polygons = [i for cpoly in op.GetAllPolygons() for i in (cpoly.a, cpoly.b, cpoly.c, cpoly.d)]
+        colors = vertex_color_buffers.PointToPolygonColors(colors, polygons)
+
+    vertex_color_buffers.WriteVertexColors(tag, colors)
+    tag.Message(c4d.MSG_UPDATE)
 
 
 def main():
@@ -72,16 +125,8 @@ def main():
     fields.InsertLayer(linearFieldLayer)
     fields.InsertLayer(randomFieldLayer)
 
-    # Prepares field input with the points to sample
-    inputField = c4d.modules.mograph.FieldInput(op.GetAllPoints(), pointCount)
-
-    # Sample all the points of the polygon object
-    output = fields.SampleListSimple(op, inputField, c4d.FIELDSAMPLE_FLAG_VALUE)
-
-    # Writes field output values to the vertex color data
-    writeData = vertexColor.GetDataAddressW()
-    for pointIndex in range(pointCount):
-        vertexColor.SetColor(writeData, None, None, pointIndex, c4d.Vector(output._value[pointIndex]))
+    # Samples all the points of the polygon object and writes the field output values to the vertex color data
+    SampleFieldListToVertexColors(op, fields, vertexColor)
 
     # Removes fields from the document
     linearField.Remove()
@@ -4,6 +4,21 @@ Author: Maxime Adam
 
 Description:
     - Samples arbitrary points within a random field.
+    - FieldSampler splits the points into chunks and returns values, colors and directions as contiguous arrays. The
+      chunks are sampled on a thread pool when the backend allows it, otherwise one after another on the calling
+      thread.
+    - FieldObjectBackend creates one FieldInfo for all points in Begin(), which is used for all chunks, and samples on
+      the calling thread unless it is created with allowThreads=True.
+    - The per-chunk thread index only reaches the pure Python backends, e.g., for per-thread state. FieldObjectBackend
+      ignores it, as its FieldInfo is created once with the thread index 0.
+    - Pure Python field backends (linear, spherical, random) allow to run and benchmark the sampler without a document.
+
+Note:
+    - When NumPy is installed, results are float32 NumPy arrays, otherwise flat array('f') buffers.
+    - Cinema 4D fields only sample in parallel as far as they release the Python global interpreter lock, chunking
+      still bounds the size of the temporary FieldInput and FieldOutput instances.
+    - Sampling a FieldObject on the worker threads of the sampler must be requested with allowThreads=True, as these
+      are Python threads and not Cinema 4D threads.
 
 Class/method highlighted:
     - c4d.modules.mograph.FieldObject
@@ -12,10 +27,351 @@ Class/method highlighted:
     - c4d.modules.mograph.FieldOutput
 
 """
+import array
 import c4d
+import concurrent.futures
+import math
+import queue
+import random
+import struct
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK = False
+
+
+class FieldSamplerResult(object):
+    """The values, colors and directions of sampled points as contiguous arrays.
+
+    Attributes:
+        value (Union[numpy.ndarray, array.array]): One value per point.
+        color (Union[numpy.ndarray, array.array]): One RGB color per point, (N, 3) or flat.
+        direction (Union[numpy.ndarray, array.array]): One direction per point, (N, 3) or flat.
+    """
+
+    def __init__(self, count):
+        if numpy is not None:
+            self.value = numpy.zeros(count, dtype=numpy.float32)
+            self.color = numpy.zeros((count, 3), dtype=numpy.float32)
+            self.direction = numpy.zeros((count, 3), dtype=numpy.float32)
+        else:
+            self.value = array.array("f", [0.]) * count
+            self.color = array.array("f", [0.]) * (count * 3)
+            self.direction = array.array("f", [0.]) * (count * 3)
+
+    def Write(self, start, values, colors, directions):
+        """Writes the results of a chunk starting at the point start.
+
+        Args:
+            start (int): The index of the first point of the chunk.
+            values (Sequence[float]): The values of the chunk.
+            colors (Sequence[float]): The colors of the chunk, as flat r, g, b components.
+            directions (Sequence[float]): The directions of the chunk, as flat x, y, z components.
+        """
+        end = start + len(values)
+        if numpy is not None:
+            self.value[start:end] = values
+            self.color[start:end] = numpy.asarray(colors, dtype=numpy.float32).reshape(-1, 3)
+            self.direction[start:end] = numpy.asarray(directions, dtype=numpy.float32).reshape(-1, 3)
+        else:
+            self.value[start:end] = array.array("f", values)
+            self.color[start * 3:end * 3] = array.array("f", colors)
+            self.direction[start * 3:end * 3] = array.array("f", directions)
+
+
+class FieldSampler(object):
+    """Samples points with a field backend in chunks on a thread pool.
+
+    A backend implements:
+        - threadSafe: True if SampleChunk() can be called from the worker threads, otherwise all chunks are sampled on
+          the calling thread.
+        - Begin(positions, flags, threadCount): Called once with all positions before the chunks are sampled.
+        - SampleChunk(positions, start, flags, threadIndex): Returns the values, colors and directions of the points of
+          one chunk, positions being flat x, y, z coordinates and start the index of the first point of the chunk.
+          Chunks sampled at the same time never share a thread index.
+        - End(): Called once after all chunks have been sampled.
+    """
+
+    DEFAULT_CHUNK_SIZE = 16384
+
+    def __init__(self, backend, chunkSize=DEFAULT_CHUNK_SIZE, threadCount=0):
+        """Initializes the sampler.
+
+        Args:
+            backend (object): The field backend.
+            chunkSize (int, optional): The number of points sampled at once.
+            threadCount (int, optional): The number of worker threads, 0 for the number of threads of Cinema 4D.
+        """
+        if chunkSize < 1:
+            raise ValueError("The chunk size must be positive.")
+
+        self._backend = backend
+        self._chunkSize = chunkSize
+        self._threadCount = threadCount or c4d.threading.GeGetCurrentThreadCount()
+
+    def Sample(self, positions, flags=c4d.FIELDSAMPLE_FLAG_VALUE):
+        """Samples all positions.
+
+        Args:
+            positions (Union[numpy.ndarray, Sequence[float]]): The points to sample, as flat x, y, z coordinates or (N, 3).
+            flags (int, optional): The FIELDSAMPLE_FLAG for the sampling.
+
+        Returns:
+            FieldSamplerResult: The results for all points.
+        """
+        if numpy is not None:
+            positions = numpy.ascontiguousarray(positions, dtype=numpy.float64).reshape(-1)
+        else:
+            positions = array.array("d", positions)
+        count = len(positions) // 3
+        result = FieldSamplerResult(count)
+
+        chunks = [(start, min(start + self._chunkSize, count)) for start in range(0, count, self._chunkSize)]
+        threadCount = max(1, min(self._threadCount, len(chunks))) if self._backend.threadSafe else 1
+
+        # Thread indices of the workers, a chunk takes an index for the time it is being sampled.
+        freeIndices = queue.Queue()
+        for threadIndex in range(threadCount):
+            freeIndices.put(threadIndex)
+
+        def SampleChunk(start, end):
+            threadIndex = freeIndices.get()
+            try:
+                values, colors, directions = self._backend.SampleChunk(positions[start * 3:end * 3], start, flags,
+                                                                       threadIndex)
+            finally:
+                freeIndices.put(threadIndex)
+            result.Write(start, values, colors, directions)
+
+        self._backend.Begin(positions, flags, threadCount)
+        try:
+            if threadCount == 1:
+                for start, end in chunks:
+                    SampleChunk(start, end)
+            else:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=threadCount) as executor:
+                    for future in [executor.submit(SampleChunk, start, end) for start, end in chunks]:
+                        future.result()
+        finally:
+            self._backend.End()
+
+        return result
+
+
+class FieldObjectBackend(object):
+    """Samples a c4d.modules.mograph.FieldObject.
+
+    The sampling is initialized with one FieldInfo for all points and the thread count of the sampler, each chunk is
+    then sampled with that FieldInfo.
+    """
+
+    def __init__(self, fieldObject, doc, sampleFlags=c4d.FIELDOBJECTSAMPLE_FLAG_DISABLEDIRECTIONFALLOFF,
+                 allowThreads=False):
+        """Initializes the backend.
+
+        Args:
+            fieldObject (c4d.modules.mograph.FieldObject): The field to sample.
+            doc (c4d.documents.BaseDocument): The document of the field.
+            sampleFlags (int, optional): The FIELDOBJECTSAMPLE_FLAG for the sampling.
+            allowThreads (bool, optional): True to sample the chunks on the worker threads of the sampler.
+        """
+        self._field = fieldObject
+        self._doc = doc
+        self._sampleFlags = sampleFlags
+        self._points = None
+        self._inputs = None
+        self._info = None
+        self.threadSafe = allowThreads
+
+    def Begin(self, positions, flags, threadCount):
+        # Creates the FieldInput and FieldInfo of all points and initializes the sampling once for all chunks
+        positions = positions.tolist()
+        self._points = list(map(c4d.Vector, positions[0::3], positions[1::3], positions[2::3]))
+        self._inputs = c4d.modules.mograph.FieldInput(self._points, len(self._points))
+        if self._inputs is None:
+            raise MemoryError("Failed to create a FieldInput.")
+
+        self._info = c4d.modules.mograph.FieldInfo.Create(flags, c4d.threading.GeGetCurrentThread(), self._doc, 0,
+                                                          threadCount, self._inputs)
+        if self._info is None:
+            raise MemoryError("Failed to create a FieldInfo.")
+
+        if not self._field.InitSampling(self._info):
+            self._info = None
+            raise RuntimeError("Failed to initialize the sampling of the field.")
+
+    def SampleChunk(self, positions, start, flags, threadIndex):
+        count = len(positions) // 3
+
+        # Creates the FieldInput and FieldOutput of the chunk, threadIndex is not used as the FieldInfo is shared
+        inputs = c4d.modules.mograph.FieldInput(self._points[start:start + count], count)
+        if inputs is None:
+            raise MemoryError("Failed to create a FieldInput.")
+        output = c4d.modules.mograph.FieldOutput()
+        if output is None:
+            raise MemoryError("Failed to create a FieldOutput.")
+        output.Resize(count, flags)
+
+        self._field.Sample(inputs, output.GetBlock(), self._info, self._sampleFlags)
+        return FieldOutputToChunk(output, count, flags)
+
+    def End(self):
+        if self._info is not None:
+            self._field.FreeSampling(self._info)
+        self._points = self._inputs = self._info = None
+
+
+def FieldOutputToChunk(output, count, flags):
+    """Reads the value, color and direction channels of a FieldOutput.
+
+    Args:
+        output (c4d.modules.mograph.FieldOutput): The sampled output.
+        count (int): The number of sampled points.
+        flags (int): The FIELDSAMPLE_FLAG the output has been sampled with.
+
+    Returns:
+        tuple[list[float], list[float], list[float]]: The values, colors and directions as flat lists.
+    """
+    values = list(output._value)[:count] if flags & c4d.FIELDSAMPLE_FLAG_VALUE else [0.] * count
+    colors = ([c for v in list(output._color)[:count] for c in (v.x, v.y, v.z)]
+              if flags & c4d.FIELDSAMPLE_FLAG_COLOR else [0.] * (count * 3))
+    directions = ([c for v in list(output._direction)[:count] for c in (v.x, v.y, v.z)]
+                  if flags & c4d.FIELDSAMPLE_FLAG_DIRECTION else [0.] * (count * 3))
+    return values, colors, directions
+
+
+class PythonFieldBackend(object):
+    """Base class of the pure Python field backends.
+
+    Subclasses implement Evaluate(x, y, z) which returns the value and direction of one point. The color of a point is
+    its value as grey.
+    """
+
+    threadSafe = True
+
+    def Begin(self, positions, flags, threadCount):
+        pass
+
+    def End(self):
+        pass
+
+    def Evaluate(self, x, y, z):
+        raise NotImplementedError
+
+    def SampleChunk(self, positions, start, flags, threadIndex):
+        if numpy is not None and hasattr(self, "EvaluateArray"):
+            values, directions = self.EvaluateArray(numpy.asarray(positions).reshape(-1, 3))
+            return values, numpy.repeat(values[:, None], 3, axis=1), directions
+
+        values, directions = [], []
+        for i in range(0, len(positions), 3):
+            value, direction = self.Evaluate(positions[i], positions[i + 1], positions[i + 2])
+            values.append(value)
+            directions += direction
+
+        return values, [value for value in values for _ in range(3)], directions
+
+
+class LinearFieldBackend(PythonFieldBackend):
+    """A linear field, the value rises from 0 to 1 along the axis over length units from origin."""
+
+    def __init__(self, origin=(0., 0., 0.), axis=(0., 0., 1.), length=100.):
+        norm = math.sqrt(sum(c * c for c in axis)) or 1.
+        self._origin = origin
+        self._axis = tuple(c / norm for c in axis)
+        self._length = float(length) or 1.
+
+    def Evaluate(self, x, y, z):
+        (ox, oy, oz), (ax, ay, az) = self._origin, self._axis
+        value = ((x - ox) * ax + (y - oy) * ay + (z - oz) * az) / self._length
+        return min(1., max(0., value)), self._axis
+
+    def EvaluateArray(self, points):
+        axis = numpy.asarray(self._axis)
+        values = numpy.clip((points - self._origin) @ axis / self._length, 0., 1.)
+        return values, numpy.broadcast_to(axis, points.shape)
+
+
+class SphericalFieldBackend(PythonFieldBackend):
+    """A spherical field, the value falls from 1 at center to 0 at radius, directions point away from the center."""
+
+    def __init__(self, center=(0., 0., 0.), radius=100.):
+        self._center = center
+        self._radius = float(radius) or 1.
+
+    def Evaluate(self, x, y, z):
+        cx, cy, cz = self._center
+        dx, dy, dz = x - cx, y - cy, z - cz
+        distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+        direction = (dx / distance, dy / distance, dz / distance) if distance else (0., 0., 0.)
+        return min(1., max(0., 1. - distance / self._radius)), direction
+
+    def EvaluateArray(self, points):
+        delta = points - self._center
+        distances = numpy.linalg.norm(delta, axis=1)
+        directions = delta / numpy.where(distances > 0., distances, 1.)[:, None]
+        return numpy.clip(1. - distances / self._radius, 0., 1.), directions
+
+
+class RandomFieldBackend(PythonFieldBackend):
+    """A random field, the value of a point is a hash of its position and the seed, directions are null."""
+
+    GOLDEN = 0x9E3779B97F4A7C15
+    MIX = 0xFF51AFD7ED558CCD
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed=12345):
+        self._seed = seed
+
+    def Evaluate(self, x, y, z):
+        # Hashes the bits of the coordinates, so that a point always gets the same value.
+        h = (self._seed * self.GOLDEN) & self.MASK
+        for bits in struct.unpack("<3Q", struct.pack("<3d", x, y, z)):
+            h ^= (bits + self.GOLDEN + (h << 6) + (h >> 2)) & self.MASK
+        h ^= h >> 33
+        h = (h * self.MIX) & self.MASK
+        h ^= h >> 33
+        return (h >> 11) / float(1 << 53), (0., 0., 0.)
+
+    def EvaluateArray(self, points):
+        # Same hash as Evaluate, with 64 bits unsigned integers wrapping around.
+        bits = numpy.ascontiguousarray(points, dtype=numpy.float64).view(numpy.uint64)
+        golden = numpy.uint64(self.GOLDEN)
+        h = numpy.full(len(points), (self._seed * self.GOLDEN) & self.MASK, dtype=numpy.uint64)
+        for i in range(3):
+            h ^= bits[:, i] + golden + (h << numpy.uint64(6)) + (h >> numpy.uint64(2))
+        h ^= h >> numpy.uint64(33)
+        h *= numpy.uint64(self.MIX)
+        h ^= h >> numpy.uint64(33)
+        return (h >> numpy.uint64(11)).astype(numpy.float64) / float(1 << 53), numpy.zeros_like(points)
+
+
+def RunBenchmark(count=1000000):
+    """Samples count points with the pure Python backends, on one and on all threads."""
+    rnd = random.Random(0)
+    positions = [rnd.uniform(-100., 100.) for _ in range(count * 3)]
+    if numpy is not None:
+        positions = numpy.asarray(positions)
+
+    flags = c4d.FIELDSAMPLE_FLAG_VALUE | c4d.FIELDSAMPLE_FLAG_COLOR | c4d.FIELDSAMPLE_FLAG_DIRECTION
+    for backend in (LinearFieldBackend(), SphericalFieldBackend(), RandomFieldBackend()):
+        for threadCount in (1, 0):
+            sampler = FieldSampler(backend, threadCount=threadCount)
+            t = time.perf_counter()
+            result = sampler.Sample(positions, flags)
+            print(f"{type(backend).__name__} ({threadCount or 'all'} threads): {len(result.value)} points "
+                  f"in {time.perf_counter() - t:.3f} sec.")
 
 
 def main():
+    if RUN_BENCHMARK:
+        return RunBenchmark()
+
     # Checks if the selected object is a random field object
     if op is None:
         raise ValueError("op is none, please select one object.")
@@ -28,36 +384,15 @@ def main():
     positions = []
     offset = 0.0
     for i in range(sampleCount):
-        positions.append(c4d.Vector(offset, 0, 0))
+        positions += [offset, 0., 0.]
         offset += 10.0
 
-    # Creates FieldInput
-    input = c4d.modules.mograph.FieldInput(positions, sampleCount)
-    if input is None:
-        raise MemoryError("Failed to create a FieldInput.")
-
-    # Creates FieldInfo
-    flags = c4d.FIELDSAMPLE_FLAG_VALUE
-    thread = c4d.threading.GeGetCurrentThread()
-    currentThreadIndex = 0
-    threadCount = 1
-    info = c4d.modules.mograph.FieldInfo.Create(flags, thread, doc, currentThreadIndex, threadCount, input)
-    if info is None:
-        raise MemoryError("Failed to create a FieldInfo.")
-
-    # Creates FieldOutput
-    output = c4d.modules.mograph.FieldOutput()
-    if output is None:
-        raise MemoryError("Failed to create a FieldOutput.")
-    output.Resize(sampleCount, c4d.FIELDSAMPLE_FLAG_VALUE)
-
-    # Samples the data
-    op.InitSampling(info)
-    op.Sample(input, output.GetBlock(), info, c4d.FIELDOBJECTSAMPLE_FLAG_DISABLEDIRECTIONFALLOFF)
-    op.FreeSampling(info)
+    # Samples the data, the 10 points are split into chunks of 4 points which are sampled one after another
+    sampler = FieldSampler(FieldObjectBackend(op, doc), chunkSize=4)
+    result = sampler.Sample(array.array("d", positions), c4d.FIELDSAMPLE_FLAG_VALUE)
 
     # Prints the values for the sampled points
-    print(output)
+    print(result.value)
 
 
 if __name__ == '__main__':
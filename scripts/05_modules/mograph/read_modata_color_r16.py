@@ -6,16 +6,128 @@ Description:
     - Retrieves the color or each clone using two ways.
     - First one by accessing directly the Mograph Data.
     - Second one by accessing the polygon cache representation of the Mograph Cloner.
+    - MoDataMirror keeps the last read matrices, colors, weights and flags of the clones in typed buffers and only
+      reads the Mograph Data again when its dirty counter changed, returning the indices of the changed clones.
+
+Note:
+    - The polygon caches are walked by the cache_tree module located in the 04_3d_concepts/modeling/geometry folder.
 
 Class/method highlighted:
     - c4d.modules.mograph.GeGetMoData()
     - c4d.modules.mograph.MoData
     - MoData.GetArray()
+    - MoData.GetDirty()
     - BaseObject.GetCache()
     - BaseObject.GetDeformCache()
 
 """
+import array
 import c4d
+import os
+import sys
+
+# The cache-tree walker is shared with other examples, it is located in 04_3d_concepts/modeling/geometry
+GEOMETRY_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "04_3d_concepts", "modeling", "geometry")
+if GEOMETRY_DIRECTORY not in sys.path:
+    sys.path.append(GEOMETRY_DIRECTORY)
+
+import cache_tree
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MoDataMirror(object):
+    """Mirrors the matrix, color, weight and flags arrays of a MoData in typed buffers.
+
+    Update() only reads the arrays again when the dirty counter of the MoData changed, and then returns the indices of
+    the clones whose data changed since the last update. Consumers running each frame can so process only the changed
+    clones instead of all of them.
+
+    The buffers are NumPy arrays when NumPy is installed, otherwise flat array.array instances:
+        - matrix: 12 float64 per clone, the components of off, v1, v2 and v3.
+        - color: 3 float64 per clone.
+        - weight: 1 float32 per clone.
+        - flags: 1 uint32 per clone.
+    """
+
+    # The MoData arrays mirrored and the number of components per clone
+    CHANNELS = ((c4d.MODATA_MATRIX, "matrix", "d", 12),
+                (c4d.MODATA_COLOR, "color", "d", 3),
+                (c4d.MODATA_WEIGHT, "weight", "f", 1),
+                (c4d.MODATA_FLAGS, "flags", "I", 1))
+
+    def __init__(self):
+        self.count = 0
+        self.dirty = None
+        self.matrix = self.color = self.weight = self.flags = None
+
+    @staticmethod
+    def ToComponents(values, size):
+        """Flattens the values of a MoData array into their components.
+
+        Args:
+            values (list): The values returned by MoData.GetArray().
+            size (int): The number of components per value.
+
+        Returns:
+            list: The flat components.
+        """
+        if size == 12:
+            return [c for m in values for v in (m.off, m.v1, m.v2, m.v3) for c in (v.x, v.y, v.z)]
+        if size == 3:
+            return [c for v in values for c in (v.x, v.y, v.z)]
+        return values
+
+    def Update(self, md):
+        """Updates the mirror from a MoData.
+
+        Args:
+            md (c4d.modules.mograph.MoData): The MoData to mirror.
+
+        Returns:
+            Union[numpy.ndarray, list[int], None]: The sorted indices of the changed clones, None if the MoData did not
+            change since the last update. All clones are changed when the clone count changed.
+        """
+        dirty = md.GetDirty()
+        if dirty == self.dirty:
+            return None
+
+        count = md.GetCount()
+        resized = count != self.count
+        changed = numpy.zeros(count, dtype=bool) if numpy is not None else [resized] * count
+
+        for channel, name, typecode, size in MoDataMirror.CHANNELS:
+            values = md.GetArray(channel) or []
+            if len(values) != count:
+                # The channel is not present, e.g. there are no weights without effectors
+                values = [0] * count if size == 1 else None
+            components = MoDataMirror.ToComponents(values, size) if values is not None else [0.] * (count * size)
+
+            if numpy is not None:
+                data = numpy.asarray(components, dtype=numpy.dtype(typecode)).reshape(count, size)
+                previous = getattr(self, name)
+                if not resized:
+                    # Compares all clones at once
+                    changed |= (data != previous).any(axis=1)
+                setattr(self, name, data)
+            else:
+                data = array.array(typecode, components)
+                previous = getattr(self, name)
+                if not resized:
+                    for i in range(count):
+                        if not changed[i] and data[i * size:(i + 1) * size] != previous[i * size:(i + 1) * size]:
+                            changed[i] = True
+                setattr(self, name, data)
+
+        self.count = count
+        self.dirty = dirty
+
+        if numpy is not None:
+            return numpy.arange(count) if resized else numpy.flatnonzero(changed)
+        return [i for i, state in enumerate(changed) if state]
 
 
 def RetrieveColorWithMoData(op):
@@ -35,54 +147,14 @@ def RetrieveColorWithMoData(op):
     return colorList[offset:]
 
 
-def DeformedPolygonCacheIterator(op):
-    """A Python Generator to iterate over all PolygonCache of passed BaseObject
-
-    Args:
-        op: The BaseObject to retrieve all PolygonObject cache.
-    """
-    if not isinstance(op, c4d.BaseObject):
-        raise TypeError("Expected a BaseObject or derived class got {0}".format(op.__class__.__name__))
-
-    # Try to retrieve the deformed cache of the object
-    temp = op.GetDeformCache()
-    if temp is not None:
-        # If there is a deformed cache we iterate over him, a deformed cache can also contain deformed cache
-        # e.g. in case of a nested deformer
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-
-    # Try to retrieve the cache of the Object
-    temp = op.GetCache()
-    if temp is not None:
-        # If there is a cache iterate over its, a cache can also contain deformed cache
-        # e.g. an instance, have a cache of its linked object but if this object is deformed, then you have a deformed cache as well
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-
-    # If op is not a generator / modifier
-    if not op.GetBit(c4d.BIT_CONTROLOBJECT):
-        # If op is a PolygonObject we return it
-        if op.IsInstanceOf(c4d.Opolygon):
-            yield op
-
-    # Then finally iterates over the child of the current object to retrieve all objects
-    # e.g. in a cloner set to Instance mode, all clones is a new object.
-    temp = op.GetDown()
-    while temp:
-        for obj in DeformedPolygonCacheIterator(temp):
-            yield obj
-        temp = temp.GetNext()
-
-
 def RetrieveColorWithCache(op):
     # Iterates the polygon cache of a cloner (does work only, in case of simple instance mode)
     finalList = []
     # Iterates overs each polygon object cache
-    for i, obj in enumerate(DeformedPolygonCacheIterator(op)):
+    for item in cache_tree.WalkCacheTree(op, cache_tree.IsType(c4d.Opolygon), cache_tree.IsNotControlObject):
 
         # Adds the object information in the list
-        finalList.append(obj[c4d.ID_BASEOBJECT_COLOR])
+        finalList.append(item.node[c4d.ID_BASEOBJECT_COLOR])
 
     return finalList
 
@@ -99,6 +171,13 @@ def main():
     print(RetrieveColorWithMoData(op))
     print(RetrieveColorWithCache(op))
 
+    # Mirrors the MoData, a second update without any change in between reports no changed clone
+    md = c4d.modules.mograph.GeGetMoData(op)
+    if md is not None:
+        mirror = MoDataMirror()
+        print("Changed clones after the first update: {0}".format(len(mirror.Update(md))))
+        print("Changed clones after the second update: {0}".format(mirror.Update(md)))
+
 
 if __name__ == "__main__":
     main()
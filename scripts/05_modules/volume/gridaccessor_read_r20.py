@@ -4,14 +4,29 @@ Author: Maxime Adam
 
 Description:
     - Reads the Float value of the first channel available from a Volume stored in a Volume Builder.
+    - Reads a dense block of voxels around the origin at once, and lists the tiles of the block containing active
+      voxels with the voxel_grid module.
+
+Note:
+    - The voxel_grid module is located next to this script.
 
 Class/method highlighted:
     - maxon.GridAccessorInterface
     - GridAccessorRef.GetValue()
+    - voxel_grid.AccessorVoxelGrid
 
 """
 import c4d
 import maxon
+import os
+import sys
+
+# The bulk voxel access is shared with other examples, it is located next to this script
+VOLUME_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+if VOLUME_DIRECTORY not in sys.path:
+    sys.path.append(VOLUME_DIRECTORY)
+
+import voxel_grid
 
 
 def main():
@@ -47,6 +62,16 @@ def main():
 
     print(value)
 
+    # Reads the 32x32x32 voxels around the origin in one call, the accessor is queried tile by tile
+    grid = voxel_grid.AccessorVoxelGrid(volume, maxon.Float32)
+    origin, shape = (-16, -16, -16), (32, 32, 32)
+    block = grid.ReadBlock(origin, shape)
+    print(block[16][16][16] if voxel_grid.numpy is not None else block[len(block) // 2 + 16 * 32 + 16])
+
+    # Lists the tiles of the block containing voxels not set to the background value
+    for tileOrigin, _ in grid.IterActiveTiles(origin, shape):
+        print("Active tile at", tileOrigin)
+
 
 if __name__ == '__main__':
     main()
@@ -4,19 +4,89 @@ Author: Maxime Adam
 
 Description:
     - Create a volume from scratch and assign values to voxels.
+    - The voxels of the helix are collected first and written in one call with the voxel_grid module.
+    - WriteGradientSphere() writes a gradient sphere as one dense block, into a volume or into a
+      voxel_grid.SparseVoxelGrid, which allows to prototype and benchmark it without a volume.
+
+Note:
+    - The voxel_grid module is located next to this script.
 
 Class/method highlighted:
     - maxon.VolumeToolsInterface.CreateNewFloat32Volume()
     - maxon.GridAccessorInterface
     - GridAccessorRef.SetValue()
-
+    - voxel_grid.AccessorVoxelGrid
+    - voxel_grid.SparseVoxelGrid
 
 """
 import c4d
 import maxon
+import math
+import os
+import sys
+import time
+
+# The bulk voxel access is shared with other examples, it is located next to this script
+VOLUME_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+if VOLUME_DIRECTORY not in sys.path:
+    sys.path.append(VOLUME_DIRECTORY)
+
+import voxel_grid
+
+numpy = voxel_grid.numpy
+
+# Set to True to run RunBenchmark() instead of the example.
+RUN_BENCHMARK = False
+
+
+def WriteGradientSphere(grid, center, radius):
+    """Writes a sphere into a grid, with values falling linearly from 1 at its center to 0 at its surface.
+
+    Args:
+        grid (voxel_grid.VoxelGrid): The grid to write to.
+        center (Sequence[int]): The voxel coordinates of the center of the sphere.
+        radius (int): The radius of the sphere in voxels.
+    """
+    origin = tuple(c - radius for c in center)
+    shape = (radius * 2 + 1,) * 3
+
+    if numpy is not None:
+        # Computes the whole block at once, offsets of the voxels from the center along each axis
+        axis = numpy.arange(-radius, radius + 1, dtype=numpy.float32)
+        distance = numpy.sqrt(axis[:, None, None] ** 2 + axis[None, :, None] ** 2 + axis[None, None, :] ** 2)
+        grid.WriteBlock(origin, numpy.clip(1.0 - distance / radius, 0.0, 1.0))
+        return
+
+    values = []
+    for x in range(-radius, radius + 1):
+        for y in range(-radius, radius + 1):
+            for z in range(-radius, radius + 1):
+                values.append(max(0.0, 1.0 - math.sqrt(x * x + y * y + z * z) / radius))
+    grid.WriteBlock(origin, (values, shape))
+
+
+def RunBenchmark(radius=32):
+    """Writes a gradient sphere into a sparse grid voxel by voxel and as one block, without a volume."""
+    grid = voxel_grid.SparseVoxelGrid()
+    t = time.perf_counter()
+    WriteGradientSphere(grid, (0, 0, 0), radius)
+    print(f"Block: {grid.GetTileCount()} tiles in {time.perf_counter() - t:.3f} sec.")
+
+    single = voxel_grid.SparseVoxelGrid()
+    t = time.perf_counter()
+    for x in range(-radius, radius + 1):
+        for y in range(-radius, radius + 1):
+            for z in range(-radius, radius + 1):
+                value = 1.0 - math.sqrt(x * x + y * y + z * z) / radius
+                if value > 0.0:
+                    single.SetValues([(x, y, z)], [value])
+    print(f"Voxel by voxel: {single.GetTileCount()} tiles in {time.perf_counter() - t:.3f} sec.")
 
 
 def main():
+    if RUN_BENCHMARK:
+        return RunBenchmark()
+
     # Creates VolumeObject
     volumeObj = c4d.BaseObject(c4d.Ovolume)
     if volumeObj is None:
@@ -37,34 +107,30 @@ def main():
     scaleMatrix = maxon.Matrix()
     volume.SetGridTransform(scaleMatrix)
 
-    # Creates accessor
-    access = maxon.GridAccessorInterface.Create(maxon.Float32)
-    if access is None:
-        raise RuntimeError("Failed to retrieve the grid accessor.")
-
-    # Initializes the grid for write access, changed with R21
-    initMethod = access.Init if c4d.GetC4DVersion() < 21000 else access.InitWithWriteAccess
-    initMethod(volume)
+    # Creates accessor, initialized for write access
+    grid = voxel_grid.AccessorVoxelGrid(volume, maxon.Float32, write=True)
 
-    # Sets values in the shape of a helix
+    # Collects the voxels in the shape of a helix
     offset = 0.0
     radius = 100.0
     height = 500.0
     step   = 50.0
     stepSize = height / step
 
+    coords = []
     while offset < step:
         sin, cos = c4d.utils.SinCos(offset)
-        pos = maxon.IntVector32()
-        pos.x = maxon.Int32(sin * radius)
-        pos.y = maxon.Int32(cos * radius)
-        pos.z = maxon.Int32(offset * stepSize)
-
-        # Sets value
-        access.SetValue(pos, 10.0)
+        coords.append((int(sin * radius), int(cos * radius), int(offset * stepSize)))
 
         offset = offset + 0.1
 
+    # Sets all values at once, voxels hit more than once are only written once
+    coords = sorted(set(coords))
+    grid.SetValues(coords, [10.0] * len(coords))
+
+    # Adds a gradient sphere at the start of the helix
+    WriteGradientSphere(grid, (0, int(radius), 0), 10)
+
     # Inserts volume in the VolumeObject
     volumeObj.SetVolume(volume)
 
@@ -0,0 +1,447 @@
+"""
+Copyright: MAXON Computer GmbH
+
+Description:
+    - Module shared by the grid accessor examples, it is not a script. Import it by appending the directory of this
+      file to sys.path.
+    - VoxelGrid is the interface to read and write voxels in bulk, as lists of coordinates or as dense axis-aligned
+      blocks.
+    - AccessorVoxelGrid implements VoxelGrid over a maxon.GridAccessorInterface.
+    - SparseVoxelGrid implements VoxelGrid in Python, storing only the tiles which have been written, so that
+      volume algorithms can be prototyped and benchmarked without the volume module.
+
+Note:
+    - Coordinates are integer voxel coordinates. Blocks are indexed [x][y][z], with a trailing axis of three
+      components for vector grids.
+    - When NumPy is installed, coordinates are (N, 3) int arrays and values and blocks are float32 arrays, otherwise
+      coordinates are sequences of (x, y, z) tuples and values and blocks are flat array('f') with z varying fastest.
+    - A grid accessor can only be queried voxel by voxel. AccessorVoxelGrid sorts coordinates by tile so that the
+      accessor keeps hitting the tile it cached last, and reuses one maxon.IntVector32 for all queries. It cannot
+      enumerate the active voxels of a volume, its active tiles are found by reading a given region.
+
+Class/method highlighted:
+    - maxon.GridAccessorInterface
+    - GridAccessorRef.GetValue()
+    - GridAccessorRef.SetValue()
+
+"""
+import array
+import c4d
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import maxon
+except ImportError:
+    maxon = None
+
+# The edge length in voxels of the tiles grids are partitioned into, the size of an OpenVDB leaf node
+TILE_SIZE = 8
+
+
+def GetBlockCoordinates(origin, shape):
+    """Returns the coordinates of all voxels of a block, z varying fastest.
+
+    Args:
+        origin (Sequence[int]): The coordinates of the first voxel of the block.
+        shape (Sequence[int]): The number of voxels of the block along x, y and z.
+
+    Returns:
+        Union[numpy.ndarray, list[tuple[int, int, int]]]: The coordinates.
+    """
+    if numpy is not None:
+        axes = [numpy.arange(o, o + s, dtype=numpy.int64) for o, s in zip(origin, shape)]
+        return numpy.stack(numpy.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+    return list(itertools.product(*[range(o, o + s) for o, s in zip(origin, shape)]))
+
+
+def GetTileOrder(coords, tileSize=TILE_SIZE):
+    """Returns the order sorting coordinates by the tile they fall into, and by their position inside of the tile.
+
+    Args:
+        coords (Union[numpy.ndarray, Sequence[tuple[int, int, int]]]): The coordinates to sort.
+        tileSize (int): The edge length of the tiles.
+
+    Returns:
+        Union[numpy.ndarray, list[int]]: The indices of the coordinates in sorted order.
+    """
+    if numpy is not None:
+        coords = numpy.asarray(coords, dtype=numpy.int64).reshape(-1, 3)
+        tiles = coords // tileSize
+        # lexsort sorts by the last key first
+        return numpy.lexsort((coords[:, 2], coords[:, 1], coords[:, 0], tiles[:, 2], tiles[:, 1], tiles[:, 0]))
+
+    return sorted(range(len(coords)), key=lambda i: (tuple(c // tileSize for c in coords[i]), tuple(coords[i])))
+
+
+def GetTileRange(origin, shape, tileSize=TILE_SIZE):
+    """Returns the coordinates of the tiles overlapping a block.
+
+    Args:
+        origin (Sequence[int]): The coordinates of the first voxel of the block.
+        shape (Sequence[int]): The number of voxels of the block along x, y and z.
+        tileSize (int): The edge length of the tiles.
+
+    Returns:
+        itertools.product: The tile coordinates.
+    """
+    return itertools.product(*[range(o // tileSize, (o + s - 1) // tileSize + 1) for o, s in zip(origin, shape)])
+
+
+class VoxelGrid(object):
+    """The interface to read and write the voxels of a grid in bulk.
+
+    Implementations must provide GetValues() and SetValues(). The block methods are built on top of them and should be
+    overridden when an implementation can access blocks more efficiently.
+    """
+
+    def __init__(self, background=0.0, components=1):
+        """Initializes the grid.
+
+        Args:
+            background (Union[float, Sequence[float]]): The value of inactive voxels.
+            components (int): The number of components per voxel, 1 for scalar and 3 for vector grids.
+        """
+        if components not in (1, 3):
+            raise ValueError("Only scalar and vector grids are supported.")
+
+        self.components = components
+        self.background = tuple(background) if components == 3 else float(background)
+
+    def GetValues(self, coords):
+        """Returns the values of the voxels at the given coordinates.
+
+        Args:
+            coords (Union[numpy.ndarray, Sequence[tuple[int, int, int]]]): The coordinates.
+
+        Returns:
+            Union[numpy.ndarray, array.array]: The values, (N,) or (N, 3) with NumPy, otherwise flat.
+        """
+        raise NotImplementedError
+
+    def SetValues(self, coords, values):
+        """Sets the values of the voxels at the given coordinates.
+
+        Args:
+            coords (Union[numpy.ndarray, Sequence[tuple[int, int, int]]]): The coordinates.
+            values (Union[numpy.ndarray, Sequence[float]]): The values, (N,) or (N, 3) with NumPy, otherwise flat.
+        """
+        raise NotImplementedError
+
+    def GetBlockShape(self, shape):
+        """Returns the shape of a block of values.
+        """
+        return tuple(shape) + ((3,) if self.components == 3 else ())
+
+    def ReadBlock(self, origin, shape):
+        """Returns the values of a dense block of voxels.
+
+        Args:
+            origin (Sequence[int]): The coordinates of the first voxel of the block.
+            shape (Sequence[int]): The number of voxels of the block along x, y and z.
+
+        Returns:
+            Union[numpy.ndarray, array.array]: The values, a float32 array of GetBlockShape(shape) with NumPy,
+            otherwise flat.
+        """
+        values = self.GetValues(GetBlockCoordinates(origin, shape))
+        return values.reshape(self.GetBlockShape(shape)) if numpy is not None else values
+
+    def WriteBlock(self, origin, block):
+        """Writes the values of a dense block of voxels.
+
+        Voxels of the block set to the background value are not written, so that they do not become active.
+
+        Args:
+            origin (Sequence[int]): The coordinates of the first voxel of the block.
+            block (Union[numpy.ndarray, Sequence[float]]): The values, see ReadBlock(). Without NumPy the block is flat
+                and its shape must be passed as a (values, shape) tuple.
+        """
+        if numpy is not None:
+            block = numpy.asarray(block, dtype=numpy.float32)
+            values = block.reshape(-1, self.components)
+            mask = numpy.any(values != numpy.asarray(self.background, dtype=numpy.float32), axis=1)
+            coords = GetBlockCoordinates(origin, block.shape[:3])[mask]
+            self.SetValues(coords, values[mask] if self.components == 3 else values[mask, 0])
+            return
+
+        block, shape = block
+        background = list(self.background) if self.components == 3 else [self.background]
+        coords, values = [], array.array("f")
+        for i, coord in enumerate(GetBlockCoordinates(origin, shape)):
+            value = block[i * self.components:(i + 1) * self.components]
+            if list(value) != background:
+                coords.append(coord)
+                values.extend(value)
+        self.SetValues(coords, values)
+
+    def IsBackground(self, block):
+        """Returns if all values of a block are the background value.
+        """
+        if numpy is not None:
+            return bool(numpy.all(numpy.asarray(block) == numpy.asarray(self.background, dtype=numpy.float32)))
+
+        background = self.background if self.components == 3 else (self.background,)
+        return all(value == background[i % self.components] for i, value in enumerate(block))
+
+    def IterActiveTiles(self, origin, shape, tileSize=TILE_SIZE):
+        """Yields the tiles of a region which contain at least one voxel not set to the background value.
+
+        Args:
+            origin (Sequence[int]): The coordinates of the first voxel of the region.
+            shape (Sequence[int]): The number of voxels of the region along x, y and z.
+            tileSize (int): The edge length of the tiles.
+
+        Yields:
+            tuple[tuple[int, int, int], Union[numpy.ndarray, array.array]]: The coordinates of the first voxel of the
+            tile and its values, see ReadBlock().
+        """
+        for tile in GetTileRange(origin, shape, tileSize):
+            tileOrigin = tuple(t * tileSize for t in tile)
+            block = self.ReadBlock(tileOrigin, (tileSize,) * 3)
+            if not self.IsBackground(block):
+                yield tileOrigin, block
+
+
+class AccessorVoxelGrid(VoxelGrid):
+    """Implements VoxelGrid over a grid accessor of a maxon.VolumeRef.
+    """
+
+    def __init__(self, volume, dataType=None, write=False):
+        """Initializes the grid.
+
+        Args:
+            volume (maxon.VolumeRef): The volume to access.
+            dataType (Optional[maxon.DataType]): maxon.Float32 or maxon.Vector32, maxon.Float32 when None.
+            write (bool): If the volume is written to.
+        """
+        if maxon is None:
+            raise RuntimeError("AccessorVoxelGrid requires the maxon module.")
+
+        dataType = maxon.Float32 if dataType is None else dataType
+        components = 3 if dataType == maxon.Vector32 else 1
+        super(AccessorVoxelGrid, self).__init__((0.0,) * 3 if components == 3 else 0.0, components)
+
+        self.access = maxon.GridAccessorInterface.Create(dataType)
+        if self.access is None:
+            raise RuntimeError("Failed to retrieve the grid accessor.")
+
+        # Initializes the grid for write access, changed with R21
+        if write and c4d.GetC4DVersion() >= 21000:
+            self.access.InitWithWriteAccess(volume)
+        else:
+            self.access.Init(volume)
+
+    @staticmethod
+    def ToLists(coords, values=None, components=1):
+        """Returns coordinates and values as Python lists, which are faster to iterate than arrays.
+
+        Vector values are returned as one list of three components per voxel.
+        """
+        if numpy is not None:
+            coords = numpy.asarray(coords, dtype=numpy.int64).reshape(-1, 3).tolist()
+            if values is not None:
+                values = numpy.asarray(values, dtype=numpy.float32)
+                values = values.reshape(-1, 3).tolist() if components == 3 else values.reshape(-1).tolist()
+        elif values is not None:
+            values = [values[i:i + 3] for i in range(0, len(values), 3)] if components == 3 else list(values)
+        return coords, values
+
+    def GetValues(self, coords):
+        coords, _ = AccessorVoxelGrid.ToLists(coords)
+        order = GetTileOrder(coords)
+        values = [None] * len(coords)
+
+        # One coordinate object is reused for all voxels
+        pos = maxon.IntVector32()
+        for i in (order.tolist() if numpy is not None else order):
+            pos.x, pos.y, pos.z = coords[i]
+            value = self.access.GetValue(pos)
+            values[i] = (value.x, value.y, value.z) if self.components == 3 else value
+
+        if numpy is not None:
+            return numpy.asarray(values, dtype=numpy.float32)
+        return array.array("f", [c for v in values for c in v] if self.components == 3 else values)
+
+    def SetValues(self, coords, values):
+        coords, values = AccessorVoxelGrid.ToLists(coords, values, self.components)
+        if len(values) != len(coords):
+            raise ValueError("Expected {0} values, received {1}.".format(len(coords), len(values)))
+        order = GetTileOrder(coords)
+
+        pos = maxon.IntVector32()
+        for i in (order.tolist() if numpy is not None else order):
+            pos.x, pos.y, pos.z = coords[i]
+            self.access.SetValue(pos, maxon.Vector32(*values[i]) if self.components == 3 else values[i])
+
+
+class SparseVoxelGrid(VoxelGrid):
+    """Implements VoxelGrid in Python, as a dictionary of the dense tiles which have been written.
+
+    The grid is a stand-in for a volume while prototyping, e.g., to benchmark a volume generator without the volume
+    module. With NumPy, the tiles are float32 arrays and blocks are copied tile by tile, otherwise tiles are flat
+    array('f').
+    """
+
+    def __init__(self, background=0.0, components=1, tileSize=TILE_SIZE):
+        """Initializes the grid.
+
+        Args:
+            background (Union[float, Sequence[float]]): The value of inactive voxels.
+            components (int): The number of components per voxel, 1 for scalar and 3 for vector grids.
+            tileSize (int): The edge length of the tiles.
+        """
+        super(SparseVoxelGrid, self).__init__(background, components)
+        self.tileSize = tileSize
+        self.tiles = {}
+
+    def GetTileCount(self):
+        """Returns the number of tiles stored.
+        """
+        return len(self.tiles)
+
+    def NewTile(self):
+        """Returns a new tile filled with the background value.
+        """
+        if numpy is not None:
+            return numpy.full(self.GetBlockShape((self.tileSize,) * 3), self.background, dtype=numpy.float32)
+
+        background = self.background if self.components == 3 else (self.background,)
+        return array.array("f", background) * (self.tileSize ** 3)
+
+    def GetValues(self, coords):
+        size = self.tileSize
+        if numpy is None:
+            values = array.array("f")
+            background = self.background if self.components == 3 else (self.background,)
+            for x, y, z in coords:
+                tile = self.tiles.get((x // size, y // size, z // size))
+                if tile is None:
+                    values.extend(background)
+                    continue
+                index = (((x % size) * size + y % size) * size + z % size) * self.components
+                values.extend(tile[index:index + self.components])
+            return values
+
+        coords = numpy.asarray(coords, dtype=numpy.int64).reshape(-1, 3)
+        values = numpy.empty((len(coords),) + self.GetBlockShape(()), dtype=numpy.float32)
+        values[...] = self.background
+
+        # Gathers the values of each tile at once
+        for key, indices in self.GroupByTile(coords):
+            tile = self.tiles.get(key)
+            if tile is not None:
+                local = coords[indices] % size
+                values[indices] = tile[local[:, 0], local[:, 1], local[:, 2]]
+        return values
+
+    def SetValues(self, coords, values):
+        size = self.tileSize
+        if numpy is None:
+            for i, (x, y, z) in enumerate(coords):
+                key = (x // size, y // size, z // size)
+                tile = self.tiles.get(key)
+                if tile is None:
+                    tile = self.tiles[key] = self.NewTile()
+                index = (((x % size) * size + y % size) * size + z % size) * self.components
+                tile[index:index + self.components] = array.array(
+                    "f", values[i * self.components:(i + 1) * self.components])
+            return
+
+        coords = numpy.asarray(coords, dtype=numpy.int64).reshape(-1, 3)
+        values = numpy.asarray(values, dtype=numpy.float32).reshape((len(coords),) + self.GetBlockShape(()))
+
+        # Scatters the values of each tile at once
+        for key, indices in self.GroupByTile(coords):
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self.tiles[key] = self.NewTile()
+            local = coords[indices] % size
+            tile[local[:, 0], local[:, 1], local[:, 2]] = values[indices]
+
+    def GroupByTile(self, coords):
+        """Yields the tile keys of coordinates and the indices of the coordinates falling into them. Requires NumPy.
+
+        Args:
+            coords (numpy.ndarray): The (N, 3) coordinates.
+
+        Yields:
+            tuple[tuple[int, int, int], numpy.ndarray]: The key of a tile and the indices of its coordinates.
+        """
+        if not len(coords):
+            return
+        tiles = coords // self.tileSize
+        order = numpy.lexsort((tiles[:, 2], tiles[:, 1], tiles[:, 0]))
+        tiles = tiles[order]
+        starts = numpy.flatnonzero(numpy.r_[True, numpy.any(tiles[1:] != tiles[:-1], axis=1)])
+        for start, end in zip(starts.tolist(), starts[1:].tolist() + [len(order)]):
+            yield tuple(tiles[start].tolist()), order[start:end]
+
+    def GetOverlaps(self, origin, shape):
+        """Yields the overlap of the tiles with a block, as the tile key and the slices into the tile and the block.
+        """
+        size = self.tileSize
+        for key in GetTileRange(origin, shape, size):
+            tileSlices, blockSlices = [], []
+            for t, o, s in zip(key, origin, shape):
+                start, end = max(t * size, o), min((t + 1) * size, o + s)
+                tileSlices.append(slice(start - t * size, end - t * size))
+                blockSlices.append(slice(start - o, end - o))
+            yield key, tuple(tileSlices), tuple(blockSlices)
+
+    def ReadBlock(self, origin, shape):
+        if numpy is None:
+            return super(SparseVoxelGrid, self).ReadBlock(origin, shape)
+
+        block = numpy.empty(self.GetBlockShape(shape), dtype=numpy.float32)
+        block[...] = self.background
+        for key, tileSlices, blockSlices in self.GetOverlaps(origin, shape):
+            tile = self.tiles.get(key)
+            if tile is not None:
+                block[blockSlices] = tile[tileSlices]
+        return block
+
+    def WriteBlock(self, origin, block):
+        if numpy is None:
+            return super(SparseVoxelGrid, self).WriteBlock(origin, block)
+
+        block = numpy.asarray(block, dtype=numpy.float32)
+        for key, tileSlices, blockSlices in self.GetOverlaps(origin, block.shape[:3]):
+            tile = self.tiles.get(key)
+            if tile is None:
+                # Background parts of the block do not allocate tiles
+                if self.IsBackground(block[blockSlices]):
+                    continue
+                tile = self.tiles[key] = self.NewTile()
+            tile[tileSlices] = block[blockSlices]
+
+    def IterActiveTiles(self, origin=None, shape=None, tileSize=None):
+        """Yields the stored tiles which contain at least one voxel not set to the background value.
+
+        Other than for other grids, the region is optional, and only the stored tiles are visited.
+
+        Args:
+            origin (Optional[Sequence[int]]): The coordinates of the first voxel of the region, all tiles when None.
+            shape (Optional[Sequence[int]]): The number of voxels of the region along x, y and z.
+            tileSize (Optional[int]): Must be None or the tile size of the grid.
+
+        Yields:
+            tuple[tuple[int, int, int], Union[numpy.ndarray, array.array]]: The coordinates of the first voxel of the
+            tile and a copy of its values.
+        """
+        if tileSize not in (None, self.tileSize):
+            raise ValueError("The tile size must be the one of the grid.")
+
+        size = self.tileSize
+        for key in sorted(self.tiles):
+            if origin is not None and any(t * size + size <= o or t * size >= o + s
+                                          for t, o, s in zip(key, origin, shape)):
+                continue
+            tile = self.tiles[key]
+            if not self.IsBackground(tile):
+                yield tuple(t * size for t in key), (tile.copy() if numpy is not None else array.array("f", tile))